@@ -0,0 +1,52 @@
+"""
+Runs a GA experiment grid in parallel.
+
+Usage:
+    python -m Experiments [grid.json] [--workers N] [--out results.csv] [--store DIR] [--runs R] [--seed S]
+
+Without a grid file the grid of main.ipynb is run. The grid file is JSON with the
+keys of Experiments.runner.NOTEBOOK_GRID; missing keys take the notebook values.
+With --store, every run is also appended to a columnar results store (see
+Experiments.results_store), which successive grids can share.
+"""
+import argparse
+import json
+import time
+
+from Experiments.results_store import ResultsStore
+from Experiments.runner import ExperimentRunner, write_results_csv
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a GA experiment grid in parallel.")
+    parser.add_argument("grid", nargs="?", help="JSON grid spec (defaults to the notebook grid)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all CPUs)")
+    parser.add_argument("--out", default="fitness_results.csv", help="consolidated results file")
+    parser.add_argument("--store", help="results store directory to append every run to")
+    parser.add_argument("--runs", type=int, help="override the number of runs per config")
+    parser.add_argument("--generations", type=int, help="override the number of generations")
+    parser.add_argument("--seed", type=int, help="override the grid seed")
+    parser.add_argument("--verbose", action="store_true", help="print one line per finished run")
+    args = parser.parse_args(argv)
+
+    spec = {}
+    if args.grid:
+        with open(args.grid) as f:
+            spec = json.load(f)
+    for key in ("runs", "generations", "seed"):
+        if getattr(args, key) is not None:
+            spec[key] = getattr(args, key)
+
+    runner = ExperimentRunner(spec, workers=args.workers)
+    start = time.perf_counter()
+    store = ResultsStore(args.store) if args.store else None
+    results = runner.run(verbose=args.verbose, store=store)
+    write_results_csv(results, args.out)
+    print(f"{len(results)} runs of {len(runner.configs)} configs in {time.perf_counter() - start:.1f}s "
+          f"with {runner.workers} workers -> {args.out}")
+    if store is not None:
+        print(f"{len(store)} runs in {args.store}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+import json
+import os
+import warnings
+from itertools import combinations
+
+import numpy as np
+
+# Version of the on-disk layout
+RESULTS_STORE_FORMAT = 2
+
+# Fixed-width columns of a store: one raw little-endian file per column, one value per run
+COLUMNS = (
+    ("config_index", "<i4"),
+    ("run", "<i4"),
+    ("seed", "<u8"),
+    ("elapsed", "<f8"),
+    ("generations", "<i4"),
+    ("generations_run", "<i4"),
+    ("evaluations", "<i8"),
+    ("best_fitness", "<f8"),
+    ("xo_prob", "<f8"),
+    ("mut_prob", "<f8"),
+    ("elitism", "u1"),
+    ("crossover", "<i4"),
+    ("mutation", "<i4"),
+    ("label", "<i4"),
+    ("stopped_by", "<i4"),
+)
+# Columns holding strings, stored as codes into the store's category lists
+CATEGORICAL = ("crossover", "mutation", "label", "stopped_by")
+
+
+class ResultsStore:
+    """
+    Append-only columnar store of GA runs, queried through memory maps.
+
+    A store is a directory with one fixed-width binary file per column (see COLUMNS),
+    `fitness.<width>.f8` with every run's best fitness per generation and `best_repr.i4`
+    with every run's best league (all runs must share the league shape). The fitness
+    matrix is as wide as the longest trace stored; shorter traces are NaN-padded and
+    their length is kept in the 'generations' column. Appending a longer trace rewrites
+    the matrix once at the new width. Strings (operator names, labels, stop reasons)
+    are stored as codes into lists kept in `meta.json`, which also holds the number of
+    runs and the width. Rewriting `meta.json` (atomically) is what commits an append,
+    so a crash mid-append leaves the store at its last committed run.
+
+    Queries map the files read-only and only touch the rows they select, so filtering
+    and aggregating thousands of runs needs neither pandas nor the whole store in
+    memory.
+    """
+
+    def __init__(self, path):
+        """
+        Opens the store at `path`, creating the directory if needed.
+
+        Args:
+            path (str): Directory of the store.
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                self.meta = json.load(f)
+            if self.meta["format"] != RESULTS_STORE_FORMAT:
+                raise ValueError(f"Unsupported results store format: {self.meta['format']}")
+        else:
+            self.meta = {"format": RESULTS_STORE_FORMAT, "rows": 0, "generations": None, "repr_shape": None,
+                         "categories": {name: [] for name in CATEGORICAL}}
+        self._maps = {}
+
+    def __len__(self):
+        return self.meta["rows"]
+
+    @property
+    def max_generations(self):
+        # Width of the fitness matrix, the longest trace stored (None until the first append)
+        return self.meta["generations"]
+
+    def categories(self, name):
+        """
+        Returns the distinct values of a string column, in code order.
+
+        Args:
+            name (str): One of CATEGORICAL.
+
+        Returns:
+            list[str]: The values.
+        """
+        return list(self.meta["categories"][name])
+
+    def _file(self, name, width=None):
+        if name == "fitness":
+            # The width is part of the name, so widening never touches the committed file
+            width = self.meta["generations"] if width is None else width
+            return os.path.join(self.path, f"fitness.{width}.f8")
+        if name == "best_repr":
+            return os.path.join(self.path, "best_repr.i4")
+        return os.path.join(self.path, f"{name}.col")
+
+    def _code(self, name, value):
+        values = self.meta["categories"][name]
+        value = "" if value is None else str(value)
+        if value not in values:
+            values.append(value)
+        return values.index(value)
+
+    def append(self, results):
+        """
+        Appends runs to the store.
+
+        Args:
+            results (dict or list[dict]): Results of run_task / ExperimentRunner.run.
+        """
+        if isinstance(results, dict):
+            results = [results]
+        if not results:
+            return
+        meta = json.loads(json.dumps(self.meta))  # updated copy, committed at the end
+        old_width = meta["generations"] or 0
+        width = max(old_width, max(len(r["fitness_over_gens"]) for r in results))
+        meta["generations"] = width
+        if meta["repr_shape"] is None:
+            meta["repr_shape"] = list(np.shape(results[0]["best_repr"]))
+        repr_shape = tuple(meta["repr_shape"])
+
+        # Encode the batch column by column
+        previous, self.meta = self.meta, meta
+        try:
+            columns = {}
+            for name, dtype in COLUMNS:
+                if name in CATEGORICAL:
+                    values = [self._code(name, r.get(name)) for r in results]
+                elif name == "generations":
+                    values = [len(r["fitness_over_gens"]) for r in results]
+                else:
+                    values = [r.get(name, 0) for r in results]
+                columns[name] = np.asarray(values).astype(dtype)
+        finally:
+            self.meta = previous
+        fitness = np.full((len(results), width), np.nan, dtype="<f8")
+        for i, r in enumerate(results):
+            fitness[i, :len(r["fitness_over_gens"])] = r["fitness_over_gens"]
+        best_repr = np.asarray([r["best_repr"] for r in results], dtype="<i4")
+        if best_repr.shape[1:] != repr_shape:
+            raise ValueError(f"League of shape {best_repr.shape[1:]} in a store of {repr_shape}")
+        columns["fitness"] = fitness
+        columns["best_repr"] = best_repr
+
+        rows = self.meta["rows"]
+        if width != old_width:
+            self._widen_fitness(rows, old_width, width)
+
+        # Drop whatever an interrupted append left after the committed rows, then append
+        for name, array in columns.items():
+            with open(self._file(name, width), "ab") as f:
+                f.truncate(rows * array[0].nbytes)
+                f.write(array.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+        meta["rows"] = rows + len(results)
+        tmp = os.path.join(self.path, "meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(self.path, "meta.json"))
+        self.meta = meta
+        self._maps = {}
+        if old_width and width != old_width:
+            os.remove(self._file("fitness", old_width))
+
+    def _widen_fitness(self, rows, old_width, width, block=65536):
+        # Writes the committed traces, NaN-padded to the new width, to the file of that width
+        old = None
+        if rows:
+            old = np.memmap(self._file("fitness", old_width), dtype="<f8", mode="r", shape=(rows, old_width))
+        with open(self._file("fitness", width), "wb") as f:
+            for start in range(0, rows, block):
+                stop = min(start + block, rows)
+                widened = np.full((stop - start, width), np.nan, dtype="<f8")
+                widened[:, :old_width] = old[start:stop]
+                f.write(widened.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+    def column(self, name):
+        """
+        Returns a read-only memory map of one column.
+
+        Args:
+            name (str): A name of COLUMNS (codes for the CATEGORICAL ones), 'fitness' (runs x max_generations,
+                        NaN past each run's 'generations') or 'best_repr' (runs x teams x slots).
+
+        Returns:
+            np.ndarray: The column, one row per run.
+        """
+        if name not in self._maps:
+            rows = len(self)
+            if name == "fitness":
+                dtype, shape = np.dtype("<f8"), (rows, self.max_generations or 0)
+            elif name == "best_repr":
+                dtype, shape = np.dtype("<i4"), (rows, *(self.meta["repr_shape"] or (0,)))
+            else:
+                dtype, shape = np.dtype(dict(COLUMNS)[name]), (rows,)
+            if rows == 0:
+                self._maps[name] = np.empty(shape, dtype=dtype)
+            else:
+                self._maps[name] = np.memmap(self._file(name), dtype=dtype, mode="r", shape=shape).view(np.ndarray)
+        return self._maps[name]
+
+    def values(self, name, rows=None):
+        """
+        Returns the values of a column, with strings decoded.
+
+        Args:
+            name (str): A name of COLUMNS.
+            rows (np.ndarray, optional): Row indices or mask. Defaults to every run.
+
+        Returns:
+            np.ndarray: The values.
+        """
+        column = self.column(name)
+        column = column if rows is None else column[rows]
+        if name in CATEGORICAL:
+            return np.asarray(self.categories(name), dtype=object)[column]
+        return column
+
+    def select(self, **filters):
+        """
+        Finds the runs matching every filter.
+
+        Args:
+            **filters: Column name -> value or list of accepted values, e.g.
+                       crossover='crossover_by_position_dual_any', mut_prob=[0.2, 0.4], elitism=True.
+                       Probabilities match to 1e-9.
+
+        Returns:
+            np.ndarray: Indices of the matching runs.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        for name, accepted in filters.items():
+            accepted = list(accepted) if isinstance(accepted, (list, tuple, set)) else [accepted]
+            column = self.column(name)
+            if name in CATEGORICAL:
+                codes = [self.categories(name).index(str(value)) for value in accepted
+                         if str(value) in self.categories(name)]
+                mask &= np.isin(column, codes)
+            elif column.dtype.kind == "f":
+                mask &= np.isclose(column[:, None], np.asarray(accepted, dtype=float)[None, :],
+                                   rtol=0, atol=1e-9).any(axis=1)
+            else:
+                mask &= np.isin(column, np.asarray(accepted).astype(column.dtype))
+        return np.flatnonzero(mask)
+
+    def groups(self, by, rows=None):
+        """
+        Splits runs by the values of one column.
+
+        Args:
+            by (str): A name of COLUMNS, e.g. 'crossover' or 'label'.
+            rows (np.ndarray, optional): Runs to split. Defaults to every run.
+
+        Returns:
+            dict: Value -> indices of its runs, in order of first appearance.
+        """
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows)
+        keys = self.column(by)[rows]
+        unique, first = np.unique(keys, return_index=True)
+        groups = {}
+        for key in unique[np.argsort(first)]:
+            value = self.categories(by)[key] if by in CATEGORICAL else key.item()
+            groups[value] = rows[keys == key]
+        return groups
+
+    def aggregate(self, rows=None, stat="median", by=None):
+        """
+        Aggregates the fitness traces per generation.
+
+        Runs with shorter traces than others only count in the generations they have;
+        generations that no selected run reached are NaN.
+
+        Args:
+            rows (np.ndarray, optional): Runs to aggregate. Defaults to every run.
+            stat (str, optional): 'median', 'mean', 'std', 'min' or 'max'. Defaults to 'median'.
+            by (str, optional): If given, one curve per value of this column (see groups).
+
+        Returns:
+            np.ndarray or dict: The curve (one value per generation), or value -> curve.
+        """
+        reducers = {"median": np.nanmedian, "mean": np.nanmean, "std": np.nanstd, "min": np.nanmin,
+                    "max": np.nanmax}
+        if stat not in reducers:
+            raise ValueError(f"Unknown statistic: {stat} (expected one of {tuple(reducers)})")
+        if by is not None:
+            return {value: self.aggregate(group, stat) for value, group in self.groups(by, rows).items()}
+        fitness = self.column("fitness")
+        with warnings.catch_warnings():
+            # Generations that none of the runs reached are NaN
+            warnings.simplefilter("ignore", RuntimeWarning)
+            return reducers[stat](fitness if rows is None else fitness[rows], axis=0)
+
+    def compare(self, by, rows=None, column="best_fitness", alpha=0.01):
+        """
+        Tests whether a column differs between groups of runs, as main.ipynb does.
+
+        Runs a Kruskal-Wallis H-test over all the groups, then a two-sided Mann-Whitney
+        U test per pair of groups. Needs SciPy.
+
+        Args:
+            by (str): Column defining the groups, e.g. 'crossover', 'mutation' or 'label'.
+            rows (np.ndarray, optional): Runs to compare. Defaults to every run.
+            column (str, optional): Value compared. Defaults to 'best_fitness'.
+            alpha (float, optional): Significance level of the pairwise tests. Defaults to 0.01.
+
+        Returns:
+            dict: 'kruskal' (statistic, p-value) and 'pairs', one dict per pair of groups with
+                  'groups', 'statistic', 'p_value' and 'significant'.
+        """
+        from scipy.stats import kruskal, mannwhitneyu
+
+        samples = {value: np.asarray(self.column(column)[group], dtype=float)
+                   for value, group in self.groups(by, rows).items()}
+        if len(samples) < 2:
+            raise ValueError(f"Need at least two groups of '{by}' to compare")
+        statistic, p_value = kruskal(*samples.values())
+        pairs = []
+        for (first, a), (second, b) in combinations(samples.items(), 2):
+            u, p = mannwhitneyu(a, b, alternative="two-sided")
+            pairs.append({"groups": (first, second), "statistic": float(u), "p_value": float(p),
+                          "significant": bool(p < alpha)})
+        return {"kruskal": (float(statistic), float(p_value)), "pairs": pairs}
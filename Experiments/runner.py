@@ -0,0 +1,344 @@
+import csv
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from Model.FitnessCache import FitnessCache, TeamCache
+from Model.callbacks import StatsCollector
+from Model.LeagueProblem import LeagueProblem
+from Model.exact_solver import solve_league
+from Model.loader import DEFAULT_PLAYERS_CSV, load_player_pool
+from Model.genetic_algorithm import SportsLeagueGASolution, genetic_algorithm
+from Model.Solution import Solution
+from Model.steady_state import steady_state_ga
+from Model.termination import MAX_EVALUATIONS, MAX_GEN, Termination
+from Operators import Crossover, Mutation, Repair, Selection
+
+# The grid studied in main.ipynb: 2 crossovers x 3 mutations x 2 elitism settings x 30 runs
+NOTEBOOK_GRID = {
+    "players": DEFAULT_PLAYERS_CSV,
+    "pop_size": 50,
+    "generations": 100,
+    "runs": 30,
+    "seed": 0,
+    "selection": "tournament_selection",
+    "crossover": [
+        {"function": "standard_crossover_with_position_repair", "xo_prob": 0.8},
+        {"function": "crossover_by_position_dual_any", "xo_prob": 0.8},
+    ],
+    "mutation": [
+        {"function": "player_role_left_shift_mutation", "mut_prob": 0.8},
+        {"function": "role_shuffle_mutation", "mut_prob": 0.4},
+        {"function": "player_swap_mutation", "mut_prob": 0.4},
+    ],
+    "elitism": [True, False],
+    # Early stopping, e.g. {"stagnation": 20, "target_fitness": 0}; keyword arguments of Termination.
+    # "target_fitness": "exact" stops at the exact solver's lower bound (solved once, before the runs)
+    "termination": None,
+    # Fitness cache, e.g. {"max_entries": 100000, "shared": true}: keyword arguments of FitnessCache, plus
+    # "shared" to keep one cache per worker process across runs (cached values may then differ from fresh
+    # ones in the last bits, so runs are only reproducible up to ties)
+    "fitness_cache": None,
+    # Team aggregate cache, e.g. {"max_teams": 100000, "policy": "lru", "shared": true}: keyword arguments
+    # of TeamCache, plus "shared" as above (team sums are exact, so results are unaffected)
+    "team_cache": None,
+    # Steady-state GA instead of the generational one, e.g. {"offspring_per_step": 2, "replacement": "worst"}:
+    # keyword arguments of steady_state_ga. Runs get the evaluations a generational run would nominally make,
+    # pop_size * (generations + 1), and "elitism" is ignored
+    "steady_state": None,
+    # Salary cap handling, e.g. {"repair": "salary_cap_repair", "cap_aware_init": true}: a repair function
+    # applied after crossover and mutation (None keeps the 1e9 penalty) and cap-aware initial leagues. When
+    # set, generational runs also report the share of feasible individuals ("feasible_rate")
+    "feasibility": None,
+}
+
+OPERATOR_MODULES = (Crossover, Mutation, Selection, Repair)
+
+
+def resolve_operator(name):
+    """
+    Finds an operator function of the Operators package by name.
+
+    Args:
+        name (str): Function name, e.g. 'player_swap_mutation'.
+
+    Returns:
+        Callable: The operator.
+    """
+    for module in OPERATOR_MODULES:
+        function = getattr(module, name, None)
+        if callable(function):
+            return function
+    raise ValueError(f"Unknown operator: {name}")
+
+
+def expand_grid(spec):
+    """
+    Lists every configuration of a grid spec.
+
+    Args:
+        spec (dict): Grid spec with 'crossover' and 'mutation' lists of
+                     {'function': name, 'xo_prob'/'mut_prob': p} and an 'elitism' list.
+
+    Returns:
+        list[dict]: One dict per configuration, in the order the notebook iterates them.
+    """
+    configs = []
+    for crossover_cfg, mutation_cfg, elitism in itertools.product(
+            spec["crossover"], spec["mutation"], spec["elitism"]):
+        configs.append({
+            "label": (f"{crossover_cfg['function']}{crossover_cfg['xo_prob']}_"
+                      f"{mutation_cfg['function']}{mutation_cfg['mut_prob']}_elitism={elitism}"),
+            "crossover": crossover_cfg["function"],
+            "xo_prob": crossover_cfg["xo_prob"],
+            "mutation": mutation_cfg["function"],
+            "mut_prob": mutation_cfg["mut_prob"],
+            "elitism": elitism,
+        })
+    return configs
+
+
+def task_seed(base_seed, config_index, run):
+    """
+    Derives the seed of one (config, run) task.
+
+    The seed depends only on the grid seed and the task's position in the grid,
+    so results do not depend on how tasks are spread over workers.
+    """
+    return int(np.random.SeedSequence([base_seed, config_index, run]).generate_state(1)[0])
+
+
+def _fitness_by_generation(history, pop_size, generations):
+    # Best fitness of a steady-state run after every pop_size evaluations, the cost of one generation
+    fitness_over_gens = []
+    step = 0
+    for gen in range(1, generations + 1):
+        while step + 1 < len(history) and history[step + 1][0] <= pop_size * (gen + 1):
+            step += 1
+        fitness_over_gens.append(history[step][1])
+    return fitness_over_gens
+
+
+# Player pool loaded once per worker process by _init_worker, and the caches its runs may share
+_worker_pool = None
+_worker_caches = {}
+
+
+def _init_worker(players_path):
+    global _worker_pool
+    _worker_pool = load_player_pool(players_path)
+    _worker_caches.clear()
+
+
+def _task_cache(cache_class, settings):
+    # The cache of a task: none, a fresh one, or the worker's shared one
+    if not settings:
+        return None
+    options = {key: value for key, value in settings.items() if key != "shared"}
+    if not settings.get("shared"):
+        return cache_class(**options)
+    if cache_class not in _worker_caches:
+        _worker_caches[cache_class] = cache_class(**options)
+    return _worker_caches[cache_class]
+
+
+def run_task(task, player_pool=None, callbacks=None):
+    """
+    Runs genetic_algorithm (or steady_state_ga) once for one (config, run) pair.
+
+    Args:
+        task (dict): Config, run number, seed and GA settings (see ExperimentRunner.tasks).
+        player_pool (PlayerPool, optional): The players. Defaults to the worker's pool (see _init_worker).
+        callbacks (list[GACallback], optional): More observers of a generational run, e.g. progress
+                                                reporting (see Model/callbacks.py). Defaults to None.
+
+    Returns:
+        dict: The task's metadata plus 'best_fitness', 'best_repr', 'fitness_over_gens' (always
+              'generations' long), 'generations_run', 'evaluations' (fitness evaluations made), 'stopped_by',
+              'elapsed' and, with a feasibility setting, 'feasible_rate', with a fitness cache,
+              'cache_hit_rate', with a team cache, 'team_evaluations_avoided_per_gen'.
+    """
+    random.seed(task["seed"])
+    np.random.seed(task["seed"] % 2**32)
+
+    config = task["config"]
+    cache = _task_cache(FitnessCache, task.get("fitness_cache"))
+    team_cache = _task_cache(TeamCache, task.get("team_cache"))
+    hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+    team_hits = team_cache.hits if team_cache is not None else 0
+    feasibility = task.get("feasibility") or {}
+    problem = LeagueProblem(player_pool if player_pool is not None else _worker_pool,
+                            mutation_function=resolve_operator(config["mutation"]),
+                            crossover_function=resolve_operator(config["crossover"]),
+                            fitness_cache=cache,
+                            team_cache=team_cache,
+                            repair_function=feasibility.get("repair") and resolve_operator(feasibility["repair"]),
+                            cap_aware_init=feasibility.get("cap_aware_init", False))
+    # Per-generation stats are only collected to report the feasible share
+    stats = StatsCollector(diversity_every=0) if task.get("feasibility") is not None else None
+
+    termination = Termination(**task["termination"]) if task.get("termination") else None
+
+    initial_population = [SportsLeagueGASolution(problem=problem) for _ in range(task["pop_size"])]
+    evaluations = Solution.fitness_evaluations
+    start = time.perf_counter()
+    if task.get("steady_state") is not None:
+        best, history = steady_state_ga(
+            initial_population,
+            max_evaluations=task["pop_size"] * (task["generations"] + 1),
+            selection_algorithm=resolve_operator(task["selection"]),
+            xo_prob=config["xo_prob"],
+            mut_prob=config["mut_prob"],
+            termination=termination,
+            **task["steady_state"],
+        )
+        elapsed = time.perf_counter() - start
+        stopped_by = termination.fired if termination is not None else MAX_EVALUATIONS
+        fitness_over_gens = _fitness_by_generation(history, task["pop_size"], task["generations"])
+        # Generation equivalents: evaluations beyond the initial population, in population sizes
+        generations_run = -(-history[-1][0] // task["pop_size"]) - 1 if history else 0
+    else:
+        best, fitness_over_gens = genetic_algorithm(
+            initial_population=initial_population,
+            max_gen=task["generations"],
+            selection_algorithm=resolve_operator(task["selection"]),
+            xo_prob=config["xo_prob"],
+            mut_prob=config["mut_prob"],
+            elitism=config["elitism"],
+            termination=termination,
+            callbacks=[callback for callback in (stats, *(callbacks or ())) if callback is not None],
+        )
+        elapsed = time.perf_counter() - start
+        if termination is None:
+            stopped_by, generations_run = MAX_GEN, task["generations"]
+        else:
+            stopped_by, generations_run = termination.fired, termination.generation
+    evaluations = Solution.fitness_evaluations - evaluations
+
+    result = {
+        **config,
+        "config_index": task["config_index"],
+        "run": task["run"],
+        "seed": task["seed"],
+        "elapsed": elapsed,
+        "generations_run": generations_run,
+        "evaluations": evaluations,
+        "stopped_by": stopped_by,
+        "best_fitness": best.fitness(),
+        "best_repr": [[int(pid) for pid in team] for team in best.repr],
+        "fitness_over_gens": [float(f) for f in fitness_over_gens],
+    }
+    if stats is not None and task.get("steady_state") is None:
+        result["feasible_rate"] = stats.summary()["feasible_rate"]
+    if cache is not None:
+        hits, misses = cache.hits - hits, cache.misses - misses
+        result["cache_hit_rate"] = hits / (hits + misses) if hits + misses else 0.0
+    if team_cache is not None:
+        result["team_evaluations_avoided_per_gen"] = (team_cache.hits - team_hits) / max(generations_run, 1)
+    return result
+
+
+class ExperimentRunner:
+    """
+    Runs every (config, run) pair of a grid spec on a process pool.
+
+    Each task gets its own seed derived from the grid seed, so results are
+    bit-reproducible for any number of workers. Workers load the player pool
+    once and receive only small task dicts.
+    """
+
+    def __init__(self, spec, workers=None):
+        """
+        Args:
+            spec (dict): Grid spec, see NOTEBOOK_GRID for the keys.
+            workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+        """
+        self.spec = {**NOTEBOOK_GRID, **spec}
+        self.workers = workers or os.cpu_count() or 1
+        self.configs = expand_grid(self.spec)
+        termination = self.spec["termination"]
+        if termination and termination.get("target_fitness") == "exact":
+            # The optimum (or a bound on it) of the players, so runs stop once they reach it
+            bound = solve_league(load_player_pool(self.spec["players"]))["lower_bound"]
+            self.spec["termination"] = {"tolerance": 1e-9, **termination, "target_fitness": bound}
+
+    def tasks(self):
+        # One task per (config, run) pair, in grid order
+        for config_index, config in enumerate(self.configs):
+            for run in range(self.spec["runs"]):
+                yield {
+                    "config": config,
+                    "config_index": config_index,
+                    "run": run,
+                    "seed": task_seed(self.spec["seed"], config_index, run),
+                    "pop_size": self.spec["pop_size"],
+                    "generations": self.spec["generations"],
+                    "selection": self.spec["selection"],
+                    "termination": self.spec["termination"],
+                    "fitness_cache": self.spec["fitness_cache"],
+                    "team_cache": self.spec["team_cache"],
+                    "steady_state": self.spec["steady_state"],
+                    "feasibility": self.spec["feasibility"],
+                }
+
+    def run(self, verbose=False, store=None):
+        """
+        Runs every task and collects the results in grid order.
+
+        Args:
+            verbose (bool, optional): If True, prints one line per finished task. Defaults to False.
+            store (ResultsStore, optional): If given, every result is appended to it as soon as its task
+                                            finishes, so an interrupted grid keeps its finished runs.
+
+        Returns:
+            list[dict]: One result per task (see run_task).
+        """
+        tasks = list(self.tasks())
+        chunksize = max(1, len(tasks) // (self.workers * 4))
+
+        if self.workers == 1:
+            _init_worker(self.spec["players"])
+            results_iter = map(run_task, tasks)
+        else:
+            executor = ProcessPoolExecutor(max_workers=self.workers,
+                                           initializer=_init_worker,
+                                           initargs=(self.spec["players"],))
+            results_iter = executor.map(run_task, tasks, chunksize=chunksize)
+
+        results = []
+        try:
+            for result in results_iter:
+                if verbose:
+                    print(f"{result['label']} run {result['run']}: {result['best_fitness']:.6f} "
+                          f"({result['elapsed']:.2f}s)")
+                if store is not None:
+                    store.append(result)
+                results.append(result)
+        finally:
+            if self.workers != 1:
+                executor.shutdown()
+        return results
+
+
+def write_results_csv(results, path):
+    """
+    Writes all results to one CSV: one row per run, one 'gen_<n>' column per generation.
+
+    Args:
+        results (list[dict]): Results of ExperimentRunner.run.
+        path (str): Output path.
+    """
+    generations = max((len(r["fitness_over_gens"]) for r in results), default=0)
+    columns = ["label", "crossover", "xo_prob", "mutation", "mut_prob", "elitism",
+               "run", "seed", "elapsed", "generations_run", "evaluations", "stopped_by", "best_fitness", "best_repr"]
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns + [f"gen_{gen}" for gen in range(generations)])
+        for r in results:
+            row = [r[c] for c in columns[:-1]] + [json.dumps(r["best_repr"])]
+            writer.writerow(row + r["fitness_over_gens"])
@@ -0,0 +1,594 @@
+"""
+Local job service: runs league-balancing GA jobs for other tools on a warm process pool.
+
+Usage:
+    python -m Experiments.service [--socket PATH | --host HOST --port PORT] [--workers N]
+                                  [--max-concurrent N] [--max-queued N] [--players CSV]
+
+Clients connect to the Unix socket (or TCP port) and exchange JSON lines. Requests:
+    {"op": "submit", "job": {...}}   queues a job (see JOB_DEFAULTS for its keys)
+    {"op": "cancel", "job": id}      cancels a queued or running job
+    {"op": "status"}                 counts of queued and running jobs
+Every job submitted on a connection streams its events back on it, tagged with the job id:
+'queued', 'started', one 'generation' per generation (best fitness so far), then one of
+'done' (with the run_task result), 'cancelled' or 'error'. Requests that cannot be read
+or are invalid are answered with an 'error' event whose job is null. Jobs still
+unfinished when their connection closes are cancelled.
+
+A worker crash breaks the whole process pool, and with it every job running at the
+time, not only the one whose worker died. The pool is then restarted once, and each of
+those jobs starts over on it ('retrying', then 'generation' events from the start);
+a job caught in a second crash fails with 'error'.
+
+The workers start with the service, import the GA once and keep the player pools they
+have loaded, so a job costs its GA run and a few messages, not a Python start-up, a
+pandas import and a CSV parse.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from Experiments.runner import NOTEBOOK_GRID, resolve_operator, run_task
+from Model.callbacks import GACallback
+from Model.FitnessCache import FitnessCache, TeamCache
+from Model.LeagueSpec import LeagueSpec
+from Model.loader import DEFAULT_PLAYERS_CSV, load_player_pool
+from Model.PlayerPool import POSITION_CODES, POSITIONS, PlayerPool
+from Model.termination import Termination
+
+DEFAULT_SOCKET = "league_service.sock"
+
+# Longest request or event line, in bytes; inline player pools travel in one line
+STREAM_LIMIT = 32 * 2**20
+
+# Times a job is started over after a worker crash broke the pool it ran on
+CRASH_RETRIES = 1
+
+# Keys of a submitted job and their defaults; "players" is a CSV path or inline columns
+# {"skill": [...], "salary": [...], "position": ["GK", ...]}, and "seed" defaults to a random one
+JOB_DEFAULTS = {
+    "players": None,
+    "pop_size": NOTEBOOK_GRID["pop_size"],
+    "generations": NOTEBOOK_GRID["generations"],
+    "seed": None,
+    "selection": NOTEBOOK_GRID["selection"],
+    "crossover": NOTEBOOK_GRID["crossover"][0]["function"],
+    "xo_prob": NOTEBOOK_GRID["crossover"][0]["xo_prob"],
+    "mutation": NOTEBOOK_GRID["mutation"][0]["function"],
+    "mut_prob": NOTEBOOK_GRID["mutation"][0]["mut_prob"],
+    "elitism": True,
+    "termination": None,
+    "fitness_cache": None,
+    "team_cache": None,
+    "feasibility": None,
+    # Send a 'generation' event every that many generations (0: none)
+    "progress_every": 1,
+}
+
+# States of a job
+JOB_STATES = ("queued", "running", "done", "cancelled", "error")
+
+
+class JobCancelled(Exception):
+    """
+    Raised inside a worker to abandon a job whose cancellation was requested.
+    """
+
+
+# Worker state, set by _init_service_worker: progress channel, cancellation flags (one per
+# concurrency slot) and the player pools loaded so far, by CSV path
+_progress = None
+_cancel_flags = None
+_pools = {}
+
+
+def _init_service_worker(progress, cancel_flags, players_path):
+    global _progress, _cancel_flags
+    _progress, _cancel_flags = progress, cancel_flags
+    _pools[players_path] = load_player_pool(players_path)
+
+
+def _ping():
+    # Returns once the worker is up; submitted by JobService.start to spawn every worker
+    return os.getpid()
+
+
+def _job_pool(players):
+    # The player pool of a job: inline columns, or a CSV loaded once per worker
+    if isinstance(players, dict):
+        position = np.array([POSITION_CODES.get(pos, pos) for pos in players["position"]], dtype=np.int8)
+        return PlayerPool.from_columns(np.asarray(players["skill"], dtype=float),
+                                       np.asarray(players["salary"], dtype=float), position)
+    if players not in _pools:
+        _pools[players] = load_player_pool(players)
+    return _pools[players]
+
+
+def _check_job(settings):
+    """
+    Validates the settings of a submitted job, so that bad jobs are rejected before they take a slot.
+
+    Args:
+        settings (dict): The job, see JOB_DEFAULTS for the keys.
+
+    Returns:
+        dict: The settings, completed with JOB_DEFAULTS.
+    """
+    if not isinstance(settings, dict):
+        raise ValueError("A job must be a JSON object")
+    unknown = set(settings) - set(JOB_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown job settings: {sorted(unknown)} (expected some of {tuple(JOB_DEFAULTS)})")
+    settings = {**JOB_DEFAULTS, **settings}
+
+    def is_int(value):
+        return isinstance(value, int) and not isinstance(value, bool)
+
+    for key, low in (("pop_size", 2), ("generations", 1), ("progress_every", 0)):
+        if not is_int(settings[key]) or settings[key] < low:
+            raise ValueError(f"{key} must be an integer of at least {low}, got {settings[key]!r}")
+    if settings["seed"] is not None and (not is_int(settings["seed"]) or settings["seed"] < 0):
+        raise ValueError(f"seed must be a non-negative integer, got {settings['seed']!r}")
+    for key in ("xo_prob", "mut_prob"):
+        value = settings[key]
+        if not isinstance(value, (int, float)) or isinstance(value, bool) or not 0 <= value <= 1:
+            raise ValueError(f"{key} must be a probability, got {value!r}")
+    if not isinstance(settings["elitism"], bool):
+        raise ValueError(f"elitism must be true or false, got {settings['elitism']!r}")
+    for key in ("selection", "crossover", "mutation"):
+        resolve_operator(settings[key])
+
+    # Optional settings are checked by building what the worker will build from them
+    for key, build in (("termination", Termination),
+                       ("fitness_cache", FitnessCache),
+                       ("team_cache", TeamCache)):
+        options = settings[key]
+        if options is None:
+            continue
+        if not isinstance(options, dict):
+            raise ValueError(f"{key} must be a JSON object or null")
+        try:
+            build(**{name: value for name, value in options.items() if name != "shared"})
+        except TypeError as error:
+            raise ValueError(f"Invalid {key}: {error}") from None
+    feasibility = settings["feasibility"]
+    if feasibility is not None:
+        if not isinstance(feasibility, dict) or set(feasibility) - {"repair", "cap_aware_init"}:
+            raise ValueError("feasibility must be a JSON object with 'repair' and 'cap_aware_init'")
+        if feasibility.get("repair") is not None:
+            resolve_operator(feasibility["repair"])
+
+    players = settings["players"]
+    if isinstance(players, str):
+        if not os.path.isfile(players):
+            raise ValueError(f"Players file not found: {players}")
+    elif isinstance(players, dict):
+        if set(players) != {"skill", "salary", "position"}:
+            raise ValueError("Inline players must have exactly the 'skill', 'salary' and 'position' columns")
+        lengths = {len(column) if isinstance(column, list) else None for column in players.values()}
+        if len(lengths) != 1 or None in lengths:
+            raise ValueError("Inline player columns must be lists of the same length")
+        if any(pos not in POSITION_CODES and pos not in range(len(POSITIONS)) for pos in players["position"]):
+            raise ValueError(f"Inline player positions must be one of {POSITIONS} (or their codes)")
+        try:
+            LeagueSpec.for_pool(_job_pool(players))  # enough players for a league
+        except (TypeError, ValueError) as error:
+            raise ValueError(f"Invalid inline players: {error}") from None
+    elif players is not None:
+        raise ValueError("players must be a CSV path, inline columns or null")
+    return settings
+
+
+class _ProgressReporter(GACallback):
+    """
+    Sends a job's best fitness to the service every `every` generations, and stops the
+    job once its cancellation flag is raised.
+    """
+
+    def __init__(self, job_key, slot, every):
+        self.job_key = job_key
+        self.slot = slot
+        self.every = every
+
+    def on_generation_end(self, generation, population, fitness, best, phase_seconds):
+        if _cancel_flags[self.slot]:
+            raise JobCancelled(self.job_key[0])
+        if self.every and generation % self.every == 0:
+            _progress.put((self.job_key, generation, best.fitness()))
+
+
+def _run_job(job_key, slot, task, players, progress_every):
+    # Runs one attempt, (job id, attempt), of a job in a worker; the final (job_key, None, None)
+    # tells the service no more progress follows
+    try:
+        if _cancel_flags[slot]:
+            raise JobCancelled(job_key[0])
+        return run_task(task, _job_pool(players), [_ProgressReporter(job_key, slot, progress_every)])
+    finally:
+        _progress.put((job_key, None, None))
+
+
+async def _read_line(reader):
+    # One line of a stream (b"" at its end), or None for a line longer than STREAM_LIMIT, which is skipped
+    try:
+        return await reader.readuntil(b"\n")
+    except asyncio.IncompleteReadError as error:
+        return error.partial
+    except asyncio.LimitOverrunError as error:
+        consumed = error.consumed
+    # Drop the over-long line up to and including its newline
+    while True:
+        await reader.readexactly(consumed)
+        try:
+            await reader.readuntil(b"\n")
+            return None
+        except asyncio.IncompleteReadError:
+            return b""
+        except asyncio.LimitOverrunError as error:
+            consumed = error.consumed
+
+
+class Job:
+    """
+    A submitted job, as the service tracks it.
+
+    Attributes:
+        id (int): Job id, unique within the service.
+        state (str): One of JOB_STATES.
+        events (asyncio.Queue): Events to stream to the submitting client.
+    """
+
+    def __init__(self, job_id, settings):
+        self.id = job_id
+        self.settings = settings
+        self.state = "queued"
+        self.events = asyncio.Queue()
+        self.slot = None
+        self.task = None
+        # Attempts so far (see CRASH_RETRIES); progress of earlier attempts is ignored
+        self.attempt = 0
+        self.drained = asyncio.Event()
+
+    def emit(self, event, **fields):
+        self.events.put_nowait({"event": event, "job": self.id, **fields})
+
+
+class JobService:
+    """
+    Queues GA jobs onto a warm process pool, with a limit on jobs running at once.
+
+    Jobs wait in submission order for one of `max_concurrent` slots; each slot has a
+    cancellation flag shared with the workers, which a running job checks after every
+    generation. Per-generation progress comes back through one multiprocessing queue.
+    """
+
+    def __init__(self, workers=None, max_concurrent=None, max_queued=1000, players=DEFAULT_PLAYERS_CSV):
+        """
+        Args:
+            workers (int, optional): Worker processes. Defaults to the number of CPUs.
+            max_concurrent (int, optional): Jobs running at once. Defaults to the number of workers.
+            max_queued (int, optional): Jobs allowed to wait for a slot; later submissions are rejected.
+                                        Defaults to 1000.
+            players (str, optional): Players CSV of jobs that do not give theirs, loaded by every worker at
+                                     start-up. Defaults to DEFAULT_PLAYERS_CSV.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_concurrent = max_concurrent or self.workers
+        self.max_queued = max_queued
+        self.players = players
+        self.jobs = {}
+        self._ids = itertools.count(1)
+        self._executor = None
+
+    async def start(self):
+        # Spawns every worker, has it load the default players, and starts forwarding progress
+        context = multiprocessing.get_context()
+        self._progress = context.SimpleQueue()
+        self._cancel_flags = context.RawArray("b", self.max_concurrent)
+        self._free_slots = list(range(self.max_concurrent))
+        self._slot_freed = asyncio.Condition()
+        self._start_executor()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._executor, _ping) for _ in range(self.workers)))
+        self._forwarder = asyncio.create_task(self._forward_progress())
+
+    def _start_executor(self):
+        self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                             initializer=_init_service_worker,
+                                             initargs=(self._progress, self._cancel_flags, self.players))
+
+    async def stop(self):
+        # Cancels every job, waits for them to end, then stops forwarding and the workers
+        tasks = [job.task for job in self.jobs.values()]
+        for job in list(self.jobs.values()):
+            self.cancel(job.id)
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._progress.put(None)
+        await self._forwarder
+        self._executor.shutdown(cancel_futures=True)
+
+    async def _forward_progress(self):
+        # Moves worker progress onto the jobs' event queues until stop() sends None
+        loop = asyncio.get_running_loop()
+        while True:
+            message = await loop.run_in_executor(None, self._progress.get)
+            if message is None:
+                return
+            (job_id, attempt), generation, best_fitness = message
+            job = self.jobs.get(job_id)
+            if job is None or attempt != job.attempt:
+                continue
+            if generation is None:
+                job.drained.set()
+            elif job.state == "running":
+                job.emit("generation", generation=generation, best_fitness=best_fitness)
+
+    def submit(self, settings):
+        """
+        Validates a job and queues it.
+
+        Args:
+            settings (dict): The job, see JOB_DEFAULTS for the keys.
+
+        Returns:
+            Job: The queued job.
+        """
+        settings = _check_job(settings)
+        queued = sum(job.state == "queued" for job in self.jobs.values())
+        if queued >= self.max_queued:
+            raise ValueError(f"Queue full: {queued} jobs waiting")
+
+        job = Job(next(self._ids), settings)
+        self.jobs[job.id] = job
+        job.emit("queued", position=queued)
+        job.task = asyncio.create_task(self._run(job))
+        return job
+
+    async def _run(self, job):
+        settings = job.settings
+        future = None
+        try:
+            # 1. Wait for a free slot
+            async with self._slot_freed:
+                await self._slot_freed.wait_for(lambda: self._free_slots)
+                job.slot = self._free_slots.pop(0)
+            self._cancel_flags[job.slot] = 0
+            job.state = "running"
+            job.emit("started", slot=job.slot)
+
+            # 2. Run it in a worker
+            seed = settings["seed"]
+            if seed is None:
+                seed = int(np.random.SeedSequence().generate_state(1)[0])
+            task = {
+                "config": {
+                    "label": f"job_{job.id}",
+                    "crossover": settings["crossover"],
+                    "xo_prob": settings["xo_prob"],
+                    "mutation": settings["mutation"],
+                    "mut_prob": settings["mut_prob"],
+                    "elitism": settings["elitism"],
+                },
+                "config_index": 0,
+                "run": 0,
+                "seed": seed,
+                **{key: settings[key] for key in ("pop_size", "generations", "selection", "termination",
+                                                  "fitness_cache", "team_cache", "feasibility")},
+            }
+            start = time.perf_counter()
+            while True:
+                job.attempt += 1
+                job.drained = asyncio.Event()
+                executor = self._executor
+                future = asyncio.get_running_loop().run_in_executor(
+                    executor, _run_job, (job.id, job.attempt), job.slot, task,
+                    settings["players"] or self.players, settings["progress_every"])
+                try:
+                    try:
+                        result = await asyncio.shield(future)
+                    except asyncio.CancelledError:
+                        # Cancelled while running: stop the worker, then report as below
+                        self._cancel_flags[job.slot] = 1
+                        result = await future
+                    break
+                except BrokenProcessPool as error:
+                    # A worker died and took the pool, and this job, with it: start over on a new pool
+                    self._restart_pool(executor)
+                    if job.attempt > CRASH_RETRIES:
+                        raise
+                    job.emit("retrying", message=f"Worker failed: {error}")
+            await job.drained.wait()
+            job.state = "done"
+            job.emit("done", result=result, seconds=time.perf_counter() - start)
+        except (asyncio.CancelledError, JobCancelled):
+            if future is not None:
+                await job.drained.wait()
+            job.state = "cancelled"
+            job.emit("cancelled")
+        except BrokenProcessPool as error:
+            job.state = "error"
+            job.emit("error", message=f"Worker failed: {error}")
+        except Exception as error:
+            if future is not None:
+                await job.drained.wait()
+            job.state = "error"
+            job.emit("error", message=f"{type(error).__name__}: {error}")
+        finally:
+            if job.slot is not None:
+                async with self._slot_freed:
+                    self._free_slots.append(job.slot)
+                    self._slot_freed.notify()
+            del self.jobs[job.id]
+
+    def _restart_pool(self, broken):
+        # Replaces a broken pool; only the first of the jobs it failed gets to do it
+        if self._executor is broken:
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._start_executor()
+
+    def cancel(self, job_id):
+        """
+        Cancels a queued or running job; it then reports 'cancelled' (or its result, if it finished first).
+
+        Args:
+            job_id (int): The job.
+
+        Returns:
+            bool: False if no such job is queued or running.
+        """
+        job = self.jobs.get(job_id)
+        if job is None or job.state not in ("queued", "running"):
+            return False
+        job.task.cancel()
+        return True
+
+    def status(self):
+        return {
+            "queued": sum(job.state == "queued" for job in self.jobs.values()),
+            "running": sum(job.state == "running" for job in self.jobs.values()),
+            "workers": self.workers,
+            "max_concurrent": self.max_concurrent,
+        }
+
+    async def handle_client(self, reader, writer):
+        """
+        Serves one connection: reads requests, streams back the events of the jobs it submitted.
+        """
+        outgoing = asyncio.Queue()
+        own_jobs = {}
+
+        async def stream(job):
+            # Copies a job's events to the connection until it ends
+            while True:
+                event = await job.events.get()
+                await outgoing.put(event)
+                if event["event"] in ("done", "cancelled", "error"):
+                    own_jobs.pop(job.id, None)
+                    return
+
+        async def send():
+            while True:
+                message = await outgoing.get()
+                writer.write(json.dumps(message).encode() + b"\n")
+                await writer.drain()
+
+        sender = asyncio.create_task(send())
+        streams = set()
+        try:
+            while (line := await _read_line(reader)) != b"":
+                try:
+                    if line is None:
+                        raise ValueError(f"Request longer than {STREAM_LIMIT} bytes")
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("A request must be a JSON object")
+                    op = request.get("op")
+                    if op == "submit":
+                        job = self.submit(request.get("job") or {})
+                        own_jobs[job.id] = job
+                        streams.add(asyncio.create_task(stream(job)))
+                    elif op == "cancel":
+                        await outgoing.put({"event": "cancel", "job": request.get("job"),
+                                            "ok": self.cancel(request.get("job"))})
+                    elif op == "status":
+                        await outgoing.put({"event": "status", **self.status()})
+                    else:
+                        raise ValueError(f"Unknown op: {op} (expected one of ('submit', 'cancel', 'status'))")
+                except (ValueError, TypeError) as error:
+                    await outgoing.put({"event": "error", "job": None, "message": str(error)})
+        except ConnectionError:
+            pass
+        finally:
+            # The client is gone: its unfinished jobs are cancelled
+            for job_id in list(own_jobs):
+                self.cancel(job_id)
+            for task in (*streams, sender):
+                task.cancel()
+            writer.close()
+
+
+async def request_job(job, socket_path=DEFAULT_SOCKET, host=None, port=None):
+    """
+    Submits one job to a running service and yields its events as they come.
+
+    Args:
+        job (dict): The job, see JOB_DEFAULTS.
+        socket_path (str, optional): Unix socket of the service. Defaults to DEFAULT_SOCKET.
+        host (str, optional): TCP host of the service, used instead of the socket when given.
+        port (int, optional): TCP port of the service.
+
+    Yields:
+        dict: The job's events, ending with 'done', 'cancelled' or 'error'.
+    """
+    if host is not None:
+        reader, writer = await asyncio.open_connection(host, port, limit=STREAM_LIMIT)
+    else:
+        reader, writer = await asyncio.open_unix_connection(socket_path, limit=STREAM_LIMIT)
+    try:
+        writer.write(json.dumps({"op": "submit", "job": job}).encode() + b"\n")
+        await writer.drain()
+        while line := await reader.readline():
+            event = json.loads(line)
+            yield event
+            if event["event"] in ("done", "cancelled", "error"):
+                return
+    finally:
+        writer.close()
+
+
+async def serve(service, socket_path=DEFAULT_SOCKET, host=None, port=None):
+    """
+    Starts a service and serves clients until cancelled.
+
+    Args:
+        service (JobService): The service.
+        socket_path (str, optional): Unix socket to listen on. Defaults to DEFAULT_SOCKET.
+        host (str, optional): TCP host to listen on instead of the socket.
+        port (int, optional): TCP port.
+    """
+    await service.start()
+    if host is not None:
+        server = await asyncio.start_server(service.handle_client, host, port, limit=STREAM_LIMIT)
+    else:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = await asyncio.start_unix_server(service.handle_client, socket_path, limit=STREAM_LIMIT)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+        if host is None and os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve league-balancing GA jobs on a warm process pool.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket to listen on")
+    parser.add_argument("--host", help="listen on TCP instead of the socket")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port (with --host)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all CPUs)")
+    parser.add_argument("--max-concurrent", type=int, default=None, help="jobs running at once (default: workers)")
+    parser.add_argument("--max-queued", type=int, default=1000, help="jobs allowed to wait for a slot")
+    parser.add_argument("--players", default=DEFAULT_PLAYERS_CSV, help="default players CSV")
+    args = parser.parse_args(argv)
+
+    service = JobService(args.workers, args.max_concurrent, args.max_queued, args.players)
+    print(f"Serving on {f'{args.host}:{args.port}' if args.host else args.socket} "
+          f"with {service.workers} workers")
+    try:
+        asyncio.run(serve(service, args.socket, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
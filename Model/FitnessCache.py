@@ -0,0 +1,286 @@
+import sys
+from collections import OrderedDict
+
+import numpy as np
+
+# Size of a league hash, in bytes (two 64-bit lanes)
+KEY_SIZE = 16
+
+
+def _mix(values):
+    # splitmix64 finalizer: a bijective scramble of uint64 values (wraps around like C)
+    values = values + np.uint64(0x9E3779B97F4A7C15)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+# Two independent 64-bit hashes of every player id, one row per lane. A player's hashes
+# only depend on its id, so one table serves every pool; it grows on demand and never shrinks.
+_player_table = np.empty((2, 0), dtype=np.uint64)
+
+
+def _player_hashes(num_ids):
+    # The hash table, covering at least ids 0 .. num_ids - 1
+    global _player_table
+    if _player_table.shape[1] < num_ids:
+        # Doubling keeps the rebuilds rare when ids grow a few at a time
+        first = _mix(np.arange(max(num_ids, 2 * _player_table.shape[1]), dtype=np.uint64))
+        table = np.stack([first, _mix(first)])
+        table.setflags(write=False)
+        _player_table = table
+    return _player_table
+
+
+def league_keys(leagues):
+    """
+    Returns a canonical hash of every league of a population.
+
+    The fitness of a league only depends on which players each team holds, so
+    leagues that differ in the order of their teams, or in the order of the players
+    within a team (e.g. its two defenders), get the same key. No sorting is needed:
+    every player has a fixed pseudo-random 128-bit value, a team hashes to a
+    scramble of the sum of its players' values and a league to the sum of its
+    teams' hashes, all modulo 2**64 per 64-bit lane. The key is stable across
+    processes (unlike hash()), so it can also identify a league on disk.
+
+    Args:
+        leagues (array-like of int): Non-negative player ids, shaped (pop_size, num_teams, team_size).
+
+    Returns:
+        list[bytes]: The KEY_SIZE-byte key of each league.
+    """
+    leagues = np.asarray(leagues)
+    if len(leagues) == 0:
+        return []
+    table = _player_hashes(int(leagues.max()) + 1)
+    keys = np.empty((len(leagues), 2), dtype="<u8")
+    for lane in range(2):
+        team_sums = table[lane][leagues].sum(axis=2, dtype=np.uint64)
+        keys[:, lane] = _mix(team_sums).sum(axis=1, dtype=np.uint64)
+    return [row.tobytes() for row in keys]
+
+
+def league_key(league):
+    """
+    Returns the canonical hash of one league (see league_keys).
+
+    Args:
+        league (list[list[int]] or np.ndarray): Non-negative player ids, one row per team.
+
+    Returns:
+        bytes: The KEY_SIZE-byte key.
+    """
+    return league_keys(np.asarray(league)[np.newaxis])[0]
+
+
+class FitnessCache:
+    """
+    Bounded LRU cache of league fitness values, keyed by league_key.
+
+    Attached to a LeagueProblem (its `fitness_cache`), it is shared by every
+    solution of the run. Copies of a solution already carry its memoized fitness;
+    the shared cache also catches leagues rebuilt independently, e.g. by crossovers
+    in another team order or by mutations that undo each other. It can be shared by
+    several runs on the same players and spec, e.g. every run of an experiment grid
+    in one worker process.
+
+    A key costs about as much to compute as the fitness of this problem (one gather
+    and sum per team), so the cache pays off when the fitness gets more expensive or
+    the hit rate is high; stats() reports it.
+
+    A value served from the cache was computed on an equivalent league, so it may
+    differ from a fresh evaluation in the last bits of the float.
+    """
+
+    # Approximate bytes held per entry: the key, the float and the LRU bookkeeping
+    ENTRY_BYTES = sys.getsizeof(bytes(KEY_SIZE)) + sys.getsizeof(0.0) + 100
+
+    def __init__(self, max_entries=100_000, max_bytes=None):
+        """
+        Args:
+            max_entries (int, optional): Most leagues kept. Defaults to 100000.
+            max_bytes (int, optional): Memory limit; lowers max_entries to what fits (see ENTRY_BYTES).
+        """
+        if max_bytes is not None:
+            max_entries = min(max_entries, max_bytes // self.ENTRY_BYTES)
+        if max_entries < 1:
+            raise ValueError("A fitness cache must hold at least one entry")
+        self.max_entries = max_entries
+        self._values = OrderedDict()
+        self._owner = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def bind(self, problem):
+        """
+        Checks that the cache only serves problems with the same players and league spec.
+
+        Args:
+            problem (LeagueProblem): A problem the cache is attached to.
+        """
+        if self._owner is None:
+            self._owner = (problem.player_pool, problem.spec)
+            return
+        pool, spec = self._owner
+        same_players = pool is problem.player_pool or all(
+            np.array_equal(getattr(pool, name), getattr(problem.player_pool, name))
+            for name in ("ids", "skill", "salary", "position"))
+        if not same_players or spec != problem.spec:
+            raise ValueError("A fitness cache can only be shared by problems with the same players and spec")
+
+    def get(self, key):
+        # Cached fitness of a league key, or None; a hit makes the entry the most recently used
+        value = self._values.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._values.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._values[key] = value
+        self._values.move_to_end(key)
+        if len(self._values) > self.max_entries:
+            self._values.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._values.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._values)
+
+    def stats(self):
+        """
+        Returns the cache's counters.
+
+        Returns:
+            dict: 'hits', 'misses', 'hit_rate', 'evictions', 'entries' and approximate 'bytes'.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._values),
+            "bytes": len(self._values) * self.ENTRY_BYTES,
+        }
+
+
+# Eviction policies of TeamCache
+TEAM_CACHE_POLICIES = ("lru", "fifo")
+
+
+class TeamCache:
+    """
+    Bounded cache of team aggregates, keyed by team composition.
+
+    Crossovers copy whole teams from the parents, so most teams of a new league
+    have been seen before. The cache maps the frozenset of a team's player ids to
+    its salary sum, skill sum and whether it fits under the salary cap, and a
+    league's aggregates are only computed for the teams it does not know. The hits
+    are team evaluations avoided; StatsCollector records them per generation.
+
+    Attached to a LeagueProblem (its `team_cache`); like FitnessCache it can be
+    shared by problems on the same players and spec. Sums are exact integers when
+    the skills and salaries are, so cached and fresh aggregates are identical.
+
+    A lookup (building the frozenset and probing the dict) costs more than summing
+    seven values with NumPy, so with this problem's aggregates the cache saves team
+    evaluations but not time; it is meant for costlier team statistics and for
+    measuring how much of each generation is new.
+    """
+
+    def __init__(self, max_teams=100_000, policy="lru"):
+        """
+        Args:
+            max_teams (int, optional): Most teams kept. Defaults to 100000.
+            policy (str, optional): Which team is evicted when full: 'lru' (least recently used)
+                                    or 'fifo' (oldest, cheaper on hits). Defaults to 'lru'.
+        """
+        if policy not in TEAM_CACHE_POLICIES:
+            raise ValueError(f"Unknown eviction policy: {policy} (expected one of {TEAM_CACHE_POLICIES})")
+        if max_teams < 1:
+            raise ValueError("A team cache must hold at least one team")
+        self.max_teams = max_teams
+        self.policy = policy
+        self._values = OrderedDict()
+        self._owner = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Same sharing rule as FitnessCache
+    bind = FitnessCache.bind
+
+    def team_totals(self, teams, player_pool, salary_cap):
+        """
+        Returns the aggregates of a list of teams, computing only the unknown ones.
+
+        Args:
+            teams (list[list[int]] or np.ndarray): Player ids of each team.
+            player_pool (PlayerPool): The players.
+            salary_cap (float): Maximum total salary of a team.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Salary sums and skill sums, aligned with `teams`.
+        """
+        values = self._values
+        keys = [frozenset(team) for team in teams]
+        found = [values.get(key) for key in keys]
+        missing = [i for i, value in enumerate(found) if value is None]
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+        if self.policy == "lru" and len(missing) < len(keys):
+            for key, value in zip(keys, found):
+                if value is not None:
+                    values.move_to_end(key)
+
+        if missing:
+            # All unknown teams in one vectorized pass
+            ids = np.array([teams[i] for i in missing])
+            salaries = player_pool.salary[ids].sum(axis=1).tolist()
+            skills = player_pool.skill[ids].sum(axis=1).tolist()
+            for i, salary, skill in zip(missing, salaries, skills):
+                found[i] = (salary, skill, salary <= salary_cap)
+                values[keys[i]] = found[i]
+            excess = len(values) - self.max_teams
+            for _ in range(max(excess, 0)):
+                values.popitem(last=False)
+            self.evictions += max(excess, 0)
+
+        return np.array([value[0] for value in found]), np.array([value[1] for value in found])
+
+    def is_feasible(self, team):
+        # Whether a known team fits under the salary cap, or None if the team is not cached
+        value = self._values.get(frozenset(team))
+        return None if value is None else value[2]
+
+    def clear(self):
+        self._values.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._values)
+
+    def stats(self):
+        """
+        Returns the cache's counters.
+
+        Returns:
+            dict: 'hits' (team evaluations avoided), 'misses' (teams computed), 'hit_rate',
+                  'evictions' and 'teams' held.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "teams": len(self._values),
+        }
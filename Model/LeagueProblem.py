@@ -0,0 +1,115 @@
+from Model.PlayerPool import as_player_pool
+from Model.LeagueSpec import LeagueSpec
+
+
+class LeagueProblem:
+    """
+    Read-only context shared by every solution of a run.
+
+    Solutions keep a reference to the problem instead of owning the player
+    table, operators and constraints, so copying a solution only duplicates
+    its representation.
+
+    Attributes:
+        players_df (pd.DataFrame or None): The players table the problem was built from, if any.
+        player_pool (PlayerPool): Array-backed view of the players table.
+        mutation_function (Callable or None): Mutation operator used by SportsLeagueGASolution.mutation.
+        crossover_function (Callable or None): Crossover operator used by SportsLeagueGASolution.crossover.
+        spec (LeagueSpec): Number of teams, formation and salary cap of the league.
+        fitness_cache (FitnessCache or None): Fitness values shared by every solution of the problem, if any.
+        team_cache (TeamCache or None): Team aggregates shared by every solution of the problem, if any.
+        repair_function (Callable or None): Repair applied by SportsLeagueGASolution after crossover and mutation.
+        cap_aware_init (bool): Whether random leagues are dealt under the salary cap.
+    """
+
+    __slots__ = ("players_df", "player_pool", "mutation_function", "crossover_function", "spec",
+                 "fitness_cache", "team_cache", "repair_function", "cap_aware_init")
+
+    def __init__(self, players, mutation_function=None, crossover_function=None, salary_cap=None, spec=None,
+                 fitness_cache=None, team_cache=None, repair_function=None, cap_aware_init=False):
+        """
+        Args:
+            players (pd.DataFrame or PlayerPool): The players table.
+            mutation_function (Callable, optional): Mutation operator. Defaults to None.
+            crossover_function (Callable, optional): Crossover operator. Defaults to None.
+            salary_cap (float, optional): Maximum total salary of a team; overrides the spec's. Defaults to the spec's.
+            spec (LeagueSpec, optional): League shape and constraints. Defaults to as many teams of the
+                                         default formation as the players fill, with a 750 cap.
+            fitness_cache (FitnessCache, optional): LRU cache of fitness values by canonical league, shared
+                                                    by the solutions (and possibly by other problems on the
+                                                    same players and spec). Defaults to None.
+            team_cache (TeamCache, optional): Cache of team aggregates by team composition, shared the same
+                                              way. Defaults to None.
+            repair_function (Callable, optional): Repair of new leagues, e.g. salary_cap_repair (see
+                                                  Operators/Repair.py). Defaults to None.
+            cap_aware_init (bool, optional): If True, random leagues are dealt under the salary cap (see
+                                             generate_league). Defaults to False.
+        """
+        pool = as_player_pool(players)
+        if spec is None:
+            spec = LeagueSpec.for_pool(pool)
+        if salary_cap is not None and salary_cap != spec.salary_cap:
+            spec = spec.replace(salary_cap=salary_cap)
+        object.__setattr__(self, "players_df", None if players is pool else players)
+        object.__setattr__(self, "player_pool", pool)
+        object.__setattr__(self, "mutation_function", mutation_function)
+        object.__setattr__(self, "crossover_function", crossover_function)
+        object.__setattr__(self, "spec", spec)
+        object.__setattr__(self, "fitness_cache", fitness_cache)
+        object.__setattr__(self, "team_cache", team_cache)
+        object.__setattr__(self, "repair_function", repair_function)
+        object.__setattr__(self, "cap_aware_init", cap_aware_init)
+        for cache in (fitness_cache, team_cache):
+            if cache is not None:
+                cache.bind(self)
+
+    @property
+    def salary_cap(self):
+        return self.spec.salary_cap
+
+    def __setattr__(self, name, value):
+        raise AttributeError("LeagueProblem is read-only")
+
+    # Copies of a solution share its problem
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        # Only the compiled pool travels; the DataFrame and the caches are left behind
+        return (LeagueProblem, (self.player_pool, self.mutation_function,
+                                self.crossover_function, None, self.spec, None, None,
+                                self.repair_function, self.cap_aware_init))
+
+    def __repr__(self):
+        return (f"LeagueProblem(player_pool={self.player_pool!r}, "
+                f"mutation_function={getattr(self.mutation_function, '__name__', None)}, "
+                f"crossover_function={getattr(self.crossover_function, '__name__', None)}, "
+                f"repair_function={getattr(self.repair_function, '__name__', None)}, "
+                f"cap_aware_init={self.cap_aware_init}, spec={self.spec!r})")
+
+    def with_operators(self, mutation_function=None, crossover_function=None):
+        """
+        Returns a problem sharing this one's players and constraints but using other operators.
+
+        Args:
+            mutation_function (Callable, optional): Mutation operator. Defaults to this problem's.
+            crossover_function (Callable, optional): Crossover operator. Defaults to this problem's.
+
+        Returns:
+            LeagueProblem: The new problem.
+        """
+        problem = LeagueProblem(
+            self.player_pool,
+            mutation_function=mutation_function or self.mutation_function,
+            crossover_function=crossover_function or self.crossover_function,
+            spec=self.spec,
+            fitness_cache=self.fitness_cache,
+            team_cache=self.team_cache,
+            repair_function=self.repair_function,
+            cap_aware_init=self.cap_aware_init,
+        )
+        object.__setattr__(problem, "players_df", self.players_df)
+        return problem
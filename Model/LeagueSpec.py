@@ -0,0 +1,135 @@
+from Model.PlayerPool import POSITIONS, POSITION_CODES
+
+# Position expected at each slot of a team, as used throughout main.ipynb
+DEFAULT_FORMATION = ("GK", "DEF", "DEF", "MID", "MID", "FWD", "FWD")
+DEFAULT_NUM_TEAMS = 5
+DEFAULT_SALARY_CAP = 750
+
+
+class LeagueSpec:
+    """
+    Immutable shape and constraints of a league: how many teams, which position
+    each slot of a team holds, and the salary cap of a team.
+
+    Every module that used to hard-code 5 teams, the 7-slot formation or the 750
+    cap reads them from a spec instead.
+
+    Attributes:
+        num_teams (int): Number of teams in the league.
+        formation (tuple[str]): Position expected at each slot of a team.
+        salary_cap (float): Maximum total salary of a team.
+        slot_codes (tuple[int]): Position code (see PlayerPool.POSITIONS) of each slot.
+        role_slots (tuple[tuple[int]]): Slot indices of each role, in formation order,
+                                        e.g. ((0,), (1, 2), (3, 4), (5, 6)).
+        role_of_slot (tuple[int]): Index into role_slots of each slot.
+    """
+
+    __slots__ = ("num_teams", "formation", "salary_cap", "slot_codes", "role_slots", "role_of_slot")
+
+    def __init__(self, num_teams=DEFAULT_NUM_TEAMS, formation=DEFAULT_FORMATION, salary_cap=DEFAULT_SALARY_CAP):
+        """
+        Args:
+            num_teams (int, optional): Number of teams. Defaults to 5.
+            formation (sequence of str, optional): Position of each slot of a team. Defaults to DEFAULT_FORMATION.
+            salary_cap (float, optional): Maximum total salary of a team. Defaults to 750.
+        """
+        formation = tuple(formation)
+        unknown = [pos for pos in formation if pos not in POSITION_CODES]
+        if unknown:
+            raise ValueError(f"Unknown positions in formation: {unknown} (expected one of {POSITIONS})")
+        if num_teams < 2:
+            raise ValueError("A league needs at least 2 teams")
+
+        # dict keeps first-seen order, so roles follow the formation
+        groups = {}
+        for slot, pos in enumerate(formation):
+            groups.setdefault(pos, []).append(slot)
+        role_slots = tuple(tuple(slots) for slots in groups.values())
+        role_of_slot = [0] * len(formation)
+        for role, slots in enumerate(role_slots):
+            for slot in slots:
+                role_of_slot[slot] = role
+
+        object.__setattr__(self, "num_teams", int(num_teams))
+        object.__setattr__(self, "formation", formation)
+        object.__setattr__(self, "salary_cap", salary_cap)
+        object.__setattr__(self, "slot_codes", tuple(POSITION_CODES[pos] for pos in formation))
+        object.__setattr__(self, "role_slots", role_slots)
+        object.__setattr__(self, "role_of_slot", tuple(role_of_slot))
+
+    @classmethod
+    def for_pool(cls, player_pool, formation=DEFAULT_FORMATION, salary_cap=DEFAULT_SALARY_CAP):
+        """
+        Returns the spec with as many teams as the pool can fill with the given formation.
+
+        The 35 players of `Data/players(in).csv` give the notebook's 5 teams.
+
+        Args:
+            player_pool (PlayerPool): The players.
+            formation (sequence of str, optional): Position of each slot of a team. Defaults to DEFAULT_FORMATION.
+            salary_cap (float, optional): Maximum total salary of a team. Defaults to 750.
+
+        Returns:
+            LeagueSpec: The spec.
+        """
+        per_team = {}
+        for pos in formation:
+            per_team[pos] = per_team.get(pos, 0) + 1
+        num_teams = min(len(player_pool.ids_by_position[POSITION_CODES[pos]]) // count
+                        for pos, count in per_team.items())
+        return cls(num_teams, formation, salary_cap)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("LeagueSpec is read-only")
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (LeagueSpec, (self.num_teams, self.formation, self.salary_cap))
+
+    def __eq__(self, other):
+        return (isinstance(other, LeagueSpec)
+                and (self.num_teams, self.formation, self.salary_cap)
+                == (other.num_teams, other.formation, other.salary_cap))
+
+    def __hash__(self):
+        return hash((self.num_teams, self.formation, self.salary_cap))
+
+    def __repr__(self):
+        return (f"LeagueSpec(num_teams={self.num_teams}, formation={list(self.formation)}, "
+                f"salary_cap={self.salary_cap})")
+
+    @property
+    def team_size(self):
+        return len(self.formation)
+
+    @property
+    def num_players(self):
+        # Players placed in a full league
+        return self.num_teams * len(self.formation)
+
+    def players_per_position(self):
+        """
+        Counts the slots of each position in one team.
+
+        Returns:
+            dict: Position -> number of slots, in formation order, e.g. {'GK': 1, 'DEF': 2, 'MID': 2, 'FWD': 2}.
+        """
+        return {self.formation[slots[0]]: len(slots) for slots in self.role_slots}
+
+    def replace(self, num_teams=None, formation=None, salary_cap=None):
+        """
+        Returns a copy of the spec with some fields changed.
+
+        Returns:
+            LeagueSpec: The new spec.
+        """
+        return LeagueSpec(
+            self.num_teams if num_teams is None else num_teams,
+            self.formation if formation is None else formation,
+            self.salary_cap if salary_cap is None else salary_cap,
+        )
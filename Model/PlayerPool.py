@@ -0,0 +1,171 @@
+import weakref
+import numpy as np
+
+# Positions in the order used to sort the players table (see main.ipynb)
+POSITIONS = ("GK", "DEF", "MID", "FWD")
+POSITION_CODES = {pos: code for code, pos in enumerate(POSITIONS)}
+
+
+class PlayerPool:
+    """
+    Immutable, array-backed view of the players table.
+
+    The pool stores skill, salary and an integer position code in contiguous
+    NumPy arrays indexed directly by player id, so scoring a league is a single
+    fancy-indexing operation instead of a series of `DataFrame.loc` lookups.
+    Ids that do not belong to any player have position code -1.
+
+    Attributes:
+        ids (np.ndarray): Player ids, in the row order of the source table.
+        skill (np.ndarray): Skill of each player, indexed by player id.
+        salary (np.ndarray): Salary of each player, indexed by player id.
+        position (np.ndarray): Position code (index into POSITIONS) of each player, indexed by player id.
+        ids_by_position (tuple[np.ndarray]): Player ids of each position code, in table row order.
+    """
+
+    __slots__ = ("ids", "skill", "salary", "position", "ids_by_position", "__weakref__")
+
+    def __init__(self, ids, skill, salary, position):
+        """
+        Args:
+            ids (array-like of int): Player ids.
+            skill (array-like): Skill of each player, aligned with `ids`.
+            salary (array-like): Salary of each player, aligned with `ids`.
+            position (array-like of str): Position name of each player, aligned with `ids`.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        skill = np.asarray(skill)
+        salary = np.asarray(salary)
+        codes = np.array([POSITION_CODES[pos] for pos in position], dtype=np.int8)
+
+        if len(ids) and ids.min() < 0:
+            raise ValueError("Player ids must be non-negative integers")
+        if len(np.unique(ids)) != len(ids):
+            raise ValueError("Player ids must be unique")
+
+        # Scatter the per-row values into arrays indexed by player id
+        size = int(ids.max()) + 1 if len(ids) else 0
+        skill_by_id = np.zeros(size, dtype=skill.dtype)
+        salary_by_id = np.zeros(size, dtype=salary.dtype)
+        position_by_id = np.full(size, -1, dtype=np.int8)
+        skill_by_id[ids] = skill
+        salary_by_id[ids] = salary
+        position_by_id[ids] = codes
+
+        ids_by_position = tuple(ids[codes == code] for code in range(len(POSITIONS)))
+
+        for array in (ids, skill_by_id, salary_by_id, position_by_id, *ids_by_position):
+            array.setflags(write=False)
+
+        object.__setattr__(self, "ids", ids)
+        object.__setattr__(self, "skill", skill_by_id)
+        object.__setattr__(self, "salary", salary_by_id)
+        object.__setattr__(self, "position", position_by_id)
+        object.__setattr__(self, "ids_by_position", ids_by_position)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PlayerPool is immutable")
+
+    # The pool is immutable, so copies can share it
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (_rebuild_pool, (self.ids, self.skill[self.ids], self.salary[self.ids],
+                                [POSITIONS[code] for code in self.position[self.ids]]))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __repr__(self):
+        return f"PlayerPool(n_players={len(self)})"
+
+    @classmethod
+    def from_dataframe(cls, players_df):
+        """
+        Builds a pool from a players DataFrame.
+
+        Args:
+            players_df (pd.DataFrame): DataFrame with 'skill', 'salary' and 'position' columns.
+                                       Player ids are taken from the 'id' column if present,
+                                       otherwise from the index.
+
+        Returns:
+            PlayerPool: The compiled pool.
+        """
+        ids = players_df["id"] if "id" in players_df.columns else players_df.index
+        return cls(
+            ids=np.asarray(ids),
+            skill=players_df["skill"].to_numpy(),
+            salary=players_df["salary"].to_numpy(),
+            position=players_df["position"].tolist(),
+        )
+
+    @classmethod
+    def from_columns(cls, skill, salary, position):
+        """
+        Wraps arrays already laid out by player id, without copying them.
+
+        Player i is row i of every column, so the ids are 0..n-1; the columns may be
+        read-only memory maps (see Model/loader.py). The pool holds read-only views of
+        the columns, so it cannot be edited through them.
+
+        Args:
+            skill (np.ndarray): Skill of each player.
+            salary (np.ndarray): Salary of each player.
+            position (np.ndarray): Position code (index into POSITIONS) of each player.
+
+        Returns:
+            PlayerPool: The pool.
+        """
+        pool = object.__new__(cls)
+        skill, salary, position = (np.asarray(column).view() for column in (skill, salary, position))
+        ids = np.arange(len(skill), dtype=np.int64)
+        ids_by_position = tuple(np.flatnonzero(position == code) for code in range(len(POSITIONS)))
+        for array in (ids, skill, salary, position, *ids_by_position):
+            array.setflags(write=False)
+        object.__setattr__(pool, "ids", ids)
+        object.__setattr__(pool, "skill", skill)
+        object.__setattr__(pool, "salary", salary)
+        object.__setattr__(pool, "position", position)
+        object.__setattr__(pool, "ids_by_position", ids_by_position)
+        return pool
+
+
+# Pools compiled from DataFrames, keyed by id() of the frame and dropped when the frame is collected
+_pool_cache = {}
+
+
+def as_player_pool(players):
+    """
+    Returns the PlayerPool for a players table, compiling it on first use.
+
+    DataFrames are compiled once and the result is reused for every later call
+    with the same object, so the frame must not be modified afterwards.
+
+    Args:
+        players (PlayerPool or pd.DataFrame): The players table.
+
+    Returns:
+        PlayerPool: The compiled pool.
+    """
+    if isinstance(players, PlayerPool):
+        return players
+
+    key = id(players)
+    cached = _pool_cache.get(key)
+    if cached is not None and cached[0]() is players:
+        return cached[1]
+
+    pool = PlayerPool.from_dataframe(players)
+    _pool_cache[key] = (weakref.ref(players), pool)
+    weakref.finalize(players, _pool_cache.pop, key, None)
+    return pool
+
+
+def _rebuild_pool(ids, skill, salary, position):
+    # Used by pickle, since PlayerPool blocks attribute assignment
+    return PlayerPool(ids, skill, salary, position)
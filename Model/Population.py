@@ -0,0 +1,323 @@
+import inspect
+from itertools import chain
+import numpy as np
+from Model.Solution import SportsLeagueSolution, generate_league, league_fitness
+from Model.FitnessCache import league_keys
+
+
+def evaluate_leagues(leagues, player_pool, salary_cap=750):
+    """
+    Scores a whole population of leagues in one vectorized pass.
+
+    Computes every team's salary sum and average skill at once, masks the leagues
+    with a team over the salary cap and takes the std of team average skills per
+    league. Results are identical to calling SportsLeagueSolution.fitness on each league.
+
+    Args:
+        leagues (array-like of int): Player ids, shaped (pop_size, num_teams, team_size).
+        player_pool (PlayerPool): The players table.
+        salary_cap (float, optional): Maximum total salary of a team. Defaults to 750.
+
+    Returns:
+        np.ndarray: Fitness of each league, shaped (pop_size,).
+    """
+    leagues = np.asarray(leagues)
+    team_salaries, team_skills = team_totals(leagues, player_pool)
+    return league_fitness(team_salaries, team_skills, leagues.shape[2], salary_cap)
+
+
+def team_totals(leagues, player_pool):
+    """
+    Computes the total salary and total skill of every team of every league.
+
+    Args:
+        leagues (np.ndarray): Player ids, shaped (pop_size, num_teams, team_size).
+        player_pool (PlayerPool): The players table.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Team salary sums and team skill sums, each shaped (pop_size, num_teams).
+    """
+    return player_pool.salary[leagues].sum(axis=2), player_pool.skill[leagues].sum(axis=2)
+
+
+def evaluate_population(population):
+    """
+    Returns the fitness of every individual of a population as a vector.
+
+    Individuals whose fitness is already cached are not re-scored. When the rest are
+    SportsLeagueSolutions sharing one problem context they are scored together: from
+    their cached team aggregates when known, otherwise from their player ids as in
+    `evaluate_leagues`. The values are stored in each individual's fitness cache.
+    Any other population falls back to calling each individual's fitness().
+
+    Args:
+        population (list[Solution]): The population.
+
+    Returns:
+        np.ndarray: Fitness of each individual, aligned with the population.
+    """
+    fitness = np.empty(len(population), dtype=float)
+    pending = []
+    for i, ind in enumerate(population):
+        if ind.has_cached_fitness():
+            fitness[i] = ind.fitness()
+        else:
+            pending.append(i)
+
+    if not pending:
+        return fitness
+
+    problem = getattr(population[pending[0]], "problem", None)
+    batchable = all(
+        isinstance(population[i], SportsLeagueSolution) and population[i].problem is problem
+        for i in pending
+    )
+    if not batchable:
+        for i in pending:
+            fitness[i] = population[i].fitness()
+        return fitness
+
+    # Leagues equivalent to ones already scored are served by the problem's shared cache
+    cache = problem.fitness_cache
+    keys = {}
+    if cache is not None:
+        try:
+            pending_keys = league_keys(np.array([population[i].repr for i in pending]))
+        except ValueError:
+            pending_keys = None  # ragged leagues are left to each individual's fitness()
+        if pending_keys is not None:
+            missed = []
+            for i, key in zip(pending, pending_keys):
+                value = cache.get(key)
+                if value is None:
+                    keys[i] = key
+                    missed.append(i)
+                else:
+                    population[i].cache_fitness(value, evaluated=False)
+                    fitness[i] = value
+            pending = missed
+
+    # Individuals whose team aggregates are already known (e.g. updated incrementally by a mutation)
+    # only need the final std; the rest are scored from their player ids
+    known = {i: population[i].cached_team_totals() for i in pending}
+    derived = [i for i in pending if known[i] is not None]
+    fresh = [i for i in pending if known[i] is None]
+
+    leagues = None
+    if fresh:
+        try:
+            leagues = np.array([population[i].repr for i in fresh])
+        except ValueError:
+            leagues = None  # ragged leagues can't be stacked
+        if leagues is None or leagues.ndim != 3:
+            for i in fresh:
+                fitness[i] = population[i].fitness()
+            fresh, leagues = [], None
+
+    if derived:
+        team_salaries = np.array([known[i][0] for i in derived])
+        team_skills = np.array([known[i][1] for i in derived])
+        team_size = len(population[derived[0]].repr[0])
+        values = league_fitness(team_salaries, team_skills, team_size, problem.salary_cap)
+        for i, value in zip(derived, np.atleast_1d(values).tolist()):
+            population[i].cache_fitness(value)
+            fitness[i] = value
+
+    if fresh:
+        if problem.team_cache is not None:
+            # Only teams never seen before are summed
+            num_teams = leagues.shape[1]
+            team_salaries, team_skills = problem.team_cache.team_totals(
+                leagues.reshape(-1, leagues.shape[2]).tolist(), problem.player_pool, problem.salary_cap)
+            team_salaries = team_salaries.reshape(-1, num_teams)
+            team_skills = team_skills.reshape(-1, num_teams)
+        else:
+            team_salaries, team_skills = team_totals(leagues, problem.player_pool)
+        values = league_fitness(team_salaries, team_skills, leagues.shape[2], problem.salary_cap)
+        for row, (i, value) in enumerate(zip(fresh, values.tolist())):
+            # Keep the team aggregates too, so mutations of this individual can be scored incrementally
+            population[i].cache_team_totals(team_salaries[row], team_skills[row])
+            population[i].cache_fitness(value)
+            fitness[i] = value
+
+    for i, key in keys.items():
+        cache.put(key, float(fitness[i]))
+    return fitness
+
+
+def pack_leagues(leagues, dtype=np.int64):
+    """
+    Stacks leagues into one integer array.
+
+    Args:
+        leagues (array-like of int): Player ids, shaped (pop_size, num_teams, team_size).
+        dtype (np.dtype, optional): Integer type of the result. Defaults to np.int64.
+
+    Returns:
+        np.ndarray: The ids, shaped (pop_size, num_teams, team_size).
+    """
+    if isinstance(leagues, list) and leagues and isinstance(leagues[0], list):
+        # Flattening nested lists directly is about twice as fast as np.asarray on them
+        shape = (len(leagues), len(leagues[0]), len(leagues[0][0]))
+        flat = np.fromiter(chain.from_iterable(chain.from_iterable(leagues)), dtype=dtype)
+        return flat.reshape(shape)  # raises ValueError for ragged leagues
+    return np.asarray(leagues, dtype=dtype)
+
+
+def population_diversity(leagues):
+    """
+    Measures how different the leagues of a population are.
+
+    Returns the expected fraction of slots at which two individuals drawn at random
+    (with replacement) hold different players: 0 when all leagues are identical,
+    close to 1 when every slot varies widely. Computed from each slot's player
+    counts (the Gini-Simpson index, averaged over slots) by sorting every slot
+    column once, so it costs O(pop_size * log(pop_size) * slots) instead of
+    comparing every pair of leagues.
+
+    Args:
+        leagues (array-like of int): Player ids, shaped (pop_size, num_teams, team_size).
+
+    Returns:
+        float: The diversity, in [0, 1).
+    """
+    leagues = pack_leagues(leagues)
+    pop_size = len(leagues)
+    if pop_size == 0:
+        return 0.0
+    columns = np.sort(leagues.reshape(pop_size, -1), axis=0).T  # one sorted row per slot
+    # Runs of equal ids within a slot are the slot's player counts
+    new_run = np.ones(columns.shape, dtype=bool)
+    new_run[:, 1:] = columns[:, 1:] != columns[:, :-1]
+    run_lengths = np.bincount(np.cumsum(new_run.ravel()) - 1)
+    same = (run_lengths.astype(float) ** 2).sum() / (columns.shape[0] * pop_size * pop_size)
+    return float(1.0 - same)
+
+
+class LeaguePopulation:
+    """
+    A population of leagues stored as a single integer array.
+
+    Every league lives in one row of `leagues`, shaped (pop_size, num_teams, team_size),
+    so the whole population can be scored, ranked and summarised with array operations
+    instead of one Python call per individual.
+
+    Attributes:
+        leagues (np.ndarray): Player ids, shaped (pop_size, num_teams, team_size).
+        problem (LeagueProblem): The shared problem context.
+    """
+
+    __slots__ = ("leagues", "problem", "_fitness")
+
+    def __init__(self, leagues, problem):
+        self.leagues = np.asarray(leagues, dtype=np.int64)
+        if self.leagues.ndim != 3:
+            raise ValueError("leagues must be shaped (pop_size, num_teams, team_size)")
+        self.problem = problem
+        self._fitness = None
+
+    def __len__(self):
+        return len(self.leagues)
+
+    @classmethod
+    def random(cls, problem, pop_size):
+        """
+        Creates a population of randomly generated leagues.
+
+        Args:
+            problem (LeagueProblem): The shared problem context.
+            pop_size (int): Number of leagues.
+
+        Returns:
+            LeaguePopulation: The new population.
+        """
+        return cls([generate_league(problem.player_pool, problem.spec) for _ in range(pop_size)], problem)
+
+    @classmethod
+    def from_solutions(cls, solutions):
+        """
+        Stacks the representations of solutions sharing one problem context.
+
+        Args:
+            solutions (list[SportsLeagueSolution]): The solutions.
+
+        Returns:
+            LeaguePopulation: The population.
+        """
+        return cls([ind.repr for ind in solutions], solutions[0].problem)
+
+    def to_solutions(self, solution_class=SportsLeagueSolution):
+        """
+        Converts every league back into a solution object.
+
+        Args:
+            solution_class (type, optional): Class of the solutions to build. Defaults to SportsLeagueSolution.
+
+        Returns:
+            list[Solution]: One solution per league, in population order.
+        """
+        solutions = []
+        for league, value in zip(self.leagues.tolist(), self.fitness.tolist()):
+            ind = solution_class(repr=league, problem=self.problem)
+            ind.cache_fitness(value)
+            solutions.append(ind)
+        return solutions
+
+    @property
+    def fitness(self):
+        # Fitness vector, computed once per population
+        if self._fitness is None:
+            self._fitness = evaluate_leagues(self.leagues, self.problem.player_pool, self.problem.salary_cap)
+        return self._fitness
+
+    def mutated(self, batch_mutation, mut_prob, rng=None):
+        """
+        Applies a batched mutation operator (see Operators/BatchMutation.py) to the population.
+
+        Each league mutates independently with probability `mut_prob`.
+
+        Args:
+            batch_mutation (Callable): Batched operator taking (leagues, mask, rng).
+            mut_prob (float): Probability of mutating each league.
+            rng (np.random.Generator, optional): Random generator. Defaults to a new unseeded one.
+
+        Returns:
+            LeaguePopulation: The mutated population.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        mask = rng.random(len(self)) < mut_prob
+        if "position_slots" in inspect.signature(batch_mutation).parameters:
+            # Role-based operators follow the problem's formation
+            return LeaguePopulation(batch_mutation(self.leagues, mask, rng, position_slots=self.problem.spec.formation),
+                                    self.problem)
+        return LeaguePopulation(batch_mutation(self.leagues, mask, rng), self.problem)
+
+    def best_index(self, maximization=False):
+        """
+        Returns the index of the best league (first one on ties, as in get_best_ind).
+
+        Args:
+            maximization (bool, optional): If True, higher fitness is better. Defaults to False.
+
+        Returns:
+            int: Row of the best league.
+        """
+        return int(np.argmax(self.fitness) if maximization else np.argmin(self.fitness))
+
+    def stats(self, maximization=False):
+        """
+        Summarises the fitness of the population.
+
+        Args:
+            maximization (bool, optional): If True, higher fitness is better. Defaults to False.
+
+        Returns:
+            dict: 'best', 'mean' and 'std' of the fitness vector, and the population's diversity.
+        """
+        fitness = self.fitness
+        return {
+            "best": float(fitness.max() if maximization else fitness.min()),
+            "mean": float(fitness.mean()),
+            "std": float(fitness.std()),
+            "diversity": population_diversity(self.leagues),
+        }
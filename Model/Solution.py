@@ -1,47 +1,190 @@
 import numpy as np
 import random
-from collections import defaultdict
+from bisect import bisect_right
+from functools import wraps
 from abc import ABC, abstractmethod
+from Model.PlayerPool import POSITION_CODES, as_player_pool
+from Model.LeagueProblem import LeagueProblem
+from Model.LeagueSpec import LeagueSpec
+from Model.FitnessCache import league_key
+from Operators.Repair import salary_cap_repair
 
-def generate_league(df):    
-    num_teams=5
-    available_ids = df.index.tolist()
-    random.shuffle(available_ids)
+# Fitness of a league with a team over the salary cap
+INFEASIBLE_FITNESS = 1e9
 
-    league = []
 
-    for _ in range(num_teams):
-        pos_map = defaultdict(list)
+def generate_league(df, spec=None, cap_aware=False, max_attempts=20):
+    """
+    Builds a random league: every slot of every team gets a distinct player of the slot's position.
 
-        # Build position map using current available players
-        for i in available_ids:
-            pos = df.loc[i, "position"]
-            pos_map[pos].append(i)
+    Each position's players are sampled once, in random order, and dealt to the teams'
+    slots in turn, so the league is built in O(number of players).
 
-        # Check we have enough players left per role
-        if (len(pos_map["GK"]) < 1 or
-            len(pos_map["DEF"]) < 2 or
-            len(pos_map["MID"]) < 2 or
-            len(pos_map["FWD"]) < 2):
+    With `cap_aware`, players are dealt slot by slot, to the team with the least budget
+    left first, each drawn uniformly among the players its team can still afford: its
+    remaining budget minus the cheapest players left for its unfilled slots. A team
+    left with nobody affordable gets the cheapest player, and a deal that ends over the
+    cap goes through salary_cap_repair; deals are retried until one fits, up to
+    `max_attempts` times (the last one is returned either way).
+
+    Args:
+        df (pd.DataFrame or PlayerPool): The players table.
+        spec (LeagueSpec, optional): Number of teams and formation. Defaults to as many teams of the
+                                     default formation as the players fill.
+        cap_aware (bool, optional): If True, keeps every team under the salary cap. Defaults to False.
+        max_attempts (int, optional): Cap-aware deals tried before giving up. Defaults to 20.
+
+    Returns:
+        list of list of int: One list of player ids per team, in formation order.
+    """
+    pool = as_player_pool(df)
+    if spec is None:
+        spec = LeagueSpec.for_pool(pool)
+
+    if cap_aware:
+        # One attempt is enough when even the cheapest players cannot fit under every cap
+        cheapest = sum(np.sort(pool.salary[pool.ids_by_position[POSITION_CODES[pos]]])[:count * spec.num_teams].sum()
+                       for pos, count in spec.players_per_position().items())
+        if cheapest > spec.salary_cap * spec.num_teams:
+            max_attempts = 1
+        for _ in range(max_attempts):
+            league, fits = _deal_under_cap(pool, spec)
+            if not fits:
+                league = salary_cap_repair(league, pool, spec)
+                fits = (pool.salary[np.asarray(league)].sum(axis=1) <= spec.salary_cap).all()
+            if fits:
+                break
+        return league
+
+    # Random order of the players each position needs
+    dealt = {}
+    for pos, count in spec.players_per_position().items():
+        candidates = pool.ids_by_position[POSITION_CODES[pos]].tolist()
+        # Check we have enough players per role
+        if len(candidates) < count * spec.num_teams:
             raise ValueError("Not enough players left to form a full team")
+        dealt[pos] = iter(random.sample(candidates, count * spec.num_teams))
+
+    # Deal them to the teams, slot by slot
+    return [[next(dealt[pos]) for pos in spec.formation] for _ in range(spec.num_teams)]
+
+
+def _deal_under_cap(pool, spec):
+    # One cap-aware deal (see generate_league) and whether every team stayed under the cap
+    salary = dict(zip(pool.ids.tolist(), pool.salary.tolist()))
+    # Players left per position, cheapest first, with their salaries alongside for bisection
+    left, salaries = {}, {}
+    for pos, count in spec.players_per_position().items():
+        candidates = sorted(pool.ids_by_position[POSITION_CODES[pos]].tolist(), key=salary.__getitem__)
+        if len(candidates) < count * spec.num_teams:
+            raise ValueError("Not enough players left to form a full team")
+        left[pos], salaries[pos] = candidates, [salary[pid] for pid in candidates]
+
+    league = [[None] * spec.team_size for _ in range(spec.num_teams)]
+    budgets = [spec.salary_cap] * spec.num_teams
+    for slot, pos in enumerate(spec.formation):
+        later = spec.formation[slot + 1:]
+        # Keep enough budget for the cheapest players of a team's later slots
+        reserve = sum(sum(salaries[other][:later.count(other)]) for other in set(later))
+        # Poorest team first (random among equals), while cheap players are left
+        for team in sorted(random.sample(range(spec.num_teams), spec.num_teams), key=budgets.__getitem__):
+            affordable = max(bisect_right(salaries[pos], budgets[team] - reserve), 1)
+            pick = random.randrange(affordable)
+            league[team][slot] = left[pos].pop(pick)
+            budgets[team] -= salaries[pos].pop(pick)
+    return league, min(budgets) >= 0
+
+
+def _freeze(repr):
+    """
+    Returns an immutable snapshot of a representation, used to detect in-place changes.
+
+    Lists of teams become tuples of tuples, NumPy arrays become their raw bytes.
+    """
+    if isinstance(repr, np.ndarray):
+        return (repr.shape, repr.tobytes())
+    if isinstance(repr, (list, tuple)):
+        if repr and isinstance(repr[0], list):
+            return tuple(map(tuple, repr))  # fast path for the usual list of teams
+        if repr and isinstance(repr[0], (tuple, np.ndarray)):
+            return tuple(map(_freeze, repr))
+        return tuple(repr)
+    return repr
+
 
-        # Select players for the team
-        team = []
-        team += random.sample(pos_map["GK"], 1)
-        team += random.sample(pos_map["DEF"], 2)
-        team += random.sample(pos_map["MID"], 2)
-        team += random.sample(pos_map["FWD"], 2)
+def _memoize_fitness(fitness):
+    """
+    Wraps a `fitness` implementation so its value is cached on the solution.
 
-        # Remove them from pool
-        for idx in team:
-            available_ids.remove(idx)
+    The cached value is reused while the representation is unchanged. Reassigning
+    `repr` clears the cache, and in-place edits are caught by comparing a snapshot
+    of the representation taken when the value was computed. Values are also looked
+    up in, and added to, the solution's shared_fitness_cache() when it has one and
+    canonical_key() returns a key.
+    """
+    @wraps(fitness)
+    def cached_fitness(self):
+        key = _freeze(self._repr)
+        if self._fitness_key is not None and key == self._fitness_key:
+            Solution.fitness_cache_hits += 1
+            return self._fitness_value
 
-        league.append(team)
+        # Equivalent leagues scored by other solutions are served by the shared cache, if any;
+        # a representation without a canonical key bypasses it
+        shared = self.shared_fitness_cache()
+        canonical = self.canonical_key() if shared is not None else None
+        if canonical is not None:
+            value = shared.get(canonical)
+            if value is not None:
+                Solution.fitness_cache_hits += 1
+                self._fitness_key = key
+                self._fitness_value = value
+                return value
 
-    return league
+        value = fitness(self)
+        Solution.fitness_evaluations += 1
+        self._fitness_key = key
+        self._fitness_value = value
+        if canonical is not None:
+            shared.put(canonical, value)
+        return value
+
+    cached_fitness.is_memoized = True
+    return cached_fitness
+
+
+def _copy_repr(repr):
+    # Duplicates the nested list/array structure of a representation, leaving the ids themselves shared
+    if isinstance(repr, np.ndarray):
+        return repr.copy()
+    if isinstance(repr, list):
+        if repr and isinstance(repr[0], list):
+            return [team[:] for team in repr]  # fast path for the usual list of teams
+        if repr and isinstance(repr[0], np.ndarray):
+            return [_copy_repr(item) for item in repr]
+        return repr[:]
+    return repr
 
 
 class Solution(ABC):
+    # Solutions are kept lightweight: no per-instance __dict__
+    __slots__ = ("_repr", "_fitness_key", "_fitness_value")
+
+    # Counters shared by all solutions: real fitness evaluations vs. values served from cache,
+    # and copies made (every deepcopy of a solution goes through copy())
+    fitness_evaluations = 0
+    fitness_cache_hits = 0
+    copies = 0
+
+    def __init_subclass__(cls, **kwargs):
+        # Every concrete fitness() defined by a subclass is memoized automatically
+        super().__init_subclass__(**kwargs)
+        fitness = cls.__dict__.get("fitness")
+        if (fitness is not None
+                and not getattr(fitness, "__isabstractmethod__", False)
+                and not getattr(fitness, "is_memoized", False)):
+            cls.fitness = _memoize_fitness(fitness)
+
     def __init__(self, repr=None):
         # To initialize a solution we need to know it's representation.
         # If no representation is given, a representation is randomly initialized.
@@ -50,10 +193,97 @@ class Solution(ABC):
         # Attributes
         self.repr = repr
 
+    @property
+    def repr(self):
+        return self._repr
+
+    @repr.setter
+    def repr(self, value):
+        # A new representation invalidates the cached fitness
+        self._repr = value
+        self._fitness_key = None
+        self._fitness_value = None
+
     # Method that is called when we run print(object of the class)
     def __repr__(self):
         return str(self.repr)
 
+    def copy(self):
+        """
+        Returns a copy of the solution that duplicates only its representation.
+
+        Every other attribute (e.g. the shared problem context) is referenced, not copied,
+        and the cached fitness carries over since the representation is identical.
+        """
+        clone = object.__new__(type(self))
+        for cls in type(self).__mro__:
+            slots = cls.__dict__.get("__slots__", ())
+            for name in ((slots,) if isinstance(slots, str) else slots):
+                if hasattr(self, name):
+                    object.__setattr__(clone, name, getattr(self, name))
+        if hasattr(self, "__dict__"):
+            clone.__dict__.update(self.__dict__)
+        clone._repr = _copy_repr(self._repr)
+        Solution.copies += 1
+        return clone
+
+    # deepcopy(solution) is used throughout the operators; route it to the cheap copy
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def has_cached_fitness(self):
+        # True if fitness() would be served from cache
+        return self._fitness_key is not None and _freeze(self._repr) == self._fitness_key
+
+    def cache_fitness(self, value, evaluated=True):
+        """
+        Stores a fitness value computed elsewhere (e.g. by a batched evaluator) for the current representation.
+
+        Counts as one real evaluation, or as a cache hit when `evaluated` is False.
+        """
+        self._fitness_key = _freeze(self._repr)
+        self._fitness_value = value
+        if evaluated:
+            Solution.fitness_evaluations += 1
+        else:
+            Solution.fitness_cache_hits += 1
+
+    def shared_fitness_cache(self):
+        # Cache of fitness values shared between solutions (see Model/FitnessCache.py), if any
+        return None
+
+    def canonical_key(self):
+        # Key of the representation in the shared fitness cache; None keeps the solution out of it
+        return None
+
+    @classmethod
+    def fitness_stats(cls):
+        """
+        Returns the fitness counters accumulated since the last reset.
+
+        Returns:
+            dict: 'evaluations' (real fitness computations), 'cache_hits'
+                  (calls served from cache), 'hit_rate' and 'copies' (solution copies made).
+        """
+        evaluations = Solution.fitness_evaluations
+        hits = Solution.fitness_cache_hits
+        total = evaluations + hits
+        return {
+            "evaluations": evaluations,
+            "cache_hits": hits,
+            "hit_rate": hits / total if total else 0.0,
+            "copies": Solution.copies,
+        }
+
+    @classmethod
+    def reset_fitness_stats(cls):
+        Solution.fitness_evaluations = 0
+        Solution.fitness_cache_hits = 0
+        Solution.copies = 0
+
     # Other methods that must be implemented in subclasses
     @abstractmethod
     def fitness(self):
@@ -66,40 +296,133 @@ class Solution(ABC):
 
 
 
+def league_fitness(team_salaries, team_skills, team_size, salary_cap):
+    """
+    Computes the league fitness from per-team aggregates.
+
+    Works on a single league (1-D aggregates) or on a batch of leagues (2-D aggregates,
+    one row per league), so every evaluation path shares the same arithmetic.
+
+    Args:
+        team_salaries (np.ndarray): Total salary of each team.
+        team_skills (np.ndarray): Total skill of each team.
+        team_size (int): Number of players per team.
+        salary_cap (float): Maximum total salary of a team.
+
+    Returns:
+        float or np.ndarray: Std of team average skills, or INFEASIBLE_FITNESS when a team is over the cap.
+    """
+    over_cap = (team_salaries > salary_cap).any(axis=-1)
+    balance = np.std(team_skills / team_size, axis=-1)
+    if np.ndim(balance) == 0:
+        return INFEASIBLE_FITNESS if over_cap else float(balance)
+    return np.where(over_cap, INFEASIBLE_FITNESS, balance)
+
+
 class SportsLeagueSolution(Solution):
-    def __init__(self, repr=None, players_df=None):
-        self.players_df = players_df
+    __slots__ = ("problem", "_team_totals", "_team_totals_key")
+
+    # When True, every incremental update of the team aggregates is checked against a full re-evaluation
+    delta_check = False
+
+    def __init__(self, repr=None, players_df=None, problem=None):
+        # Players and constraints live in a shared, read-only problem context
+        if problem is None:
+            problem = LeagueProblem(players_df)
+        self.problem = problem
+        self._team_totals = None
+        self._team_totals_key = None
         super().__init__(repr=repr)
 
+    @property
+    def players_df(self):
+        return self.problem.players_df
+
+    @property
+    def player_pool(self):
+        # Array-backed view of the players table, shared by all solutions
+        return self.problem.player_pool
+
     
     def random_initial_representation(self):
-        self.repr = generate_league(self.players_df)
+        return generate_league(self.player_pool, self.problem.spec, cap_aware=self.problem.cap_aware_init)
 
-        # Reset the 'team' column
-        self.players_df["team"] = -1
+    def _compute_team_totals(self):
+        team_cache = self.problem.team_cache
+        if team_cache is not None:
+            # Only teams never seen before are summed
+            return team_cache.team_totals(self._repr, self.player_pool, self.problem.spec.salary_cap)
+        league = np.asarray(self.repr)
+        # Salary and skill of every player, laid out as (teams, slots), summed per team
+        return (self.player_pool.salary[league].sum(axis=1),
+                self.player_pool.skill[league].sum(axis=1))
 
-        # Assign team number to each player
-        for team_idx, team in enumerate(self.repr):
-            self.players_df.loc[team, "team"] = team_idx
+    def team_totals(self):
+        """
+        Returns the total salary and total skill of every team.
 
-        return self.repr
+        The aggregates are computed once per representation and reused until it changes.
 
-    def fitness(self):
-        team_avg_skills = []
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Team salary sums and team skill sums.
+        """
+        key = _freeze(self._repr)
+        if self._team_totals is None or key != self._team_totals_key:
+            self._team_totals = self._compute_team_totals()
+            self._team_totals_key = key
+        return self._team_totals
+
+    def cached_team_totals(self):
+        # Team aggregates if they are known for the current representation, else None
+        if self._team_totals is not None and _freeze(self._repr) == self._team_totals_key:
+            return self._team_totals
+        return None
+
+    def cache_team_totals(self, team_salaries, team_skills):
+        # Stores aggregates computed elsewhere (e.g. by a batched evaluator) for the current representation
+        self._team_totals = (team_salaries, team_skills)
+        self._team_totals_key = _freeze(self._repr)
 
-        # Reset team column (optional safety)
-        self.players_df["team"] = -1
+    def derive_team_totals(self, parent, changes):
+        """
+        Sets this solution's team aggregates from its parent's, in O(number of changed players).
 
-        for team_idx, team in enumerate(self.repr):
-            self.players_df.loc[team, "team"] = team_idx
-            team_df = self.players_df.loc[team]
+        Must be called after `repr` holds the edited league. The parent must still hold
+        the league the edit started from.
 
-            total_salary = team_df["salary"].sum()
-            if total_salary > 750:
-                return 1e9  # Penalize invalid solution
+        Args:
+            parent (SportsLeagueSolution): The solution that was edited.
+            changes (list[tuple[int, int, int]]): (team index, old player id, new player id)
+                                                  for every slot whose player changed.
+        """
+        team_salaries, team_skills = parent.team_totals()
+        team_salaries, team_skills = team_salaries.copy(), team_skills.copy()
 
-            avg_skill = team_df["skill"].mean()
-            team_avg_skills.append(avg_skill)
+        if changes:
+            teams, old_ids, new_ids = (np.asarray(column) for column in zip(*changes))
+            pool = self.player_pool
+            np.add.at(team_salaries, teams, pool.salary[new_ids] - pool.salary[old_ids])
+            np.add.at(team_skills, teams, pool.skill[new_ids] - pool.skill[old_ids])
+
+        if SportsLeagueSolution.delta_check:
+            full_salaries, full_skills = self._compute_team_totals()
+            if not (np.allclose(team_salaries, full_salaries) and np.allclose(team_skills, full_skills)):
+                raise AssertionError(
+                    f"Incremental team aggregates diverged from full evaluation: "
+                    f"{team_salaries}, {team_skills} != {full_salaries}, {full_skills}"
+                )
+
+        self.cache_team_totals(team_salaries, team_skills)
+
+    def shared_fitness_cache(self):
+        return self.problem.fitness_cache
+
+    def canonical_key(self):
+        # Same key for leagues that differ only in team order or in player order within teams
+        return league_key(self._repr)
+
+    def fitness(self):
+        team_salaries, team_skills = self.team_totals()
 
-        # Minimize std deviation of team avg skills → balanced league
-        return float(np.std(team_avg_skills))
+        # Minimize std deviation of team avg skills → balanced league (1e9 if a team is over the salary cap)
+        return league_fitness(team_salaries, team_skills, self.problem.spec.team_size, self.problem.spec.salary_cap)
@@ -0,0 +1,240 @@
+import time
+
+import numpy as np
+
+from Model.Solution import INFEASIBLE_FITNESS, Solution
+from Model.Population import population_diversity
+
+
+# Phases timed by the GA, in the order they happen within a generation
+PHASES = ("elitism", "selection", "crossover", "mutation", "evaluation")
+
+# Hooks fired once per elitism, selection, crossover or mutation (rather than once per generation)
+EVENT_HOOKS = ("on_elitism", "on_selection", "on_crossover", "on_mutation")
+
+
+class GACallback:
+    """
+    Observer of a genetic_algorithm run.
+
+    Subclasses override the hooks they need; every hook is a no-op by default.
+    Phase hooks receive the wall-clock seconds the phase took, and
+    on_generation_end receives the seconds spent in each phase of the generation
+    (see PHASES). Nothing is timed when no callback is attached, and the
+    per-event hooks are only called when a callback overrides one of them.
+    """
+
+    def listens_to_events(self):
+        # True if any per-event hook is overridden; otherwise the GA only times the phases
+        return any(getattr(type(self), name) is not getattr(GACallback, name) for name in EVENT_HOOKS)
+
+    def on_run_start(self, population):
+        pass
+
+    def on_generation_start(self, generation, population):
+        pass
+
+    def on_elitism(self, elite, seconds):
+        pass
+
+    def on_selection(self, parents, seconds):
+        pass
+
+    def on_crossover(self, parents, offspring, applied, seconds):
+        # applied: False when the parents were replicated instead of crossed over
+        pass
+
+    def on_mutation(self, individual, mutated, seconds):
+        pass
+
+    def on_evaluation(self, population, fitness, seconds):
+        pass
+
+    def on_generation_end(self, generation, population, fitness, best, phase_seconds):
+        pass
+
+    def on_run_end(self, best, best_fitness_over_gens):
+        pass
+
+
+class CallbackList(GACallback):
+    """
+    Fans every hook out to several callbacks, in order.
+    """
+
+    def __init__(self, callbacks):
+        self.callbacks = list(callbacks)
+
+    def listens_to_events(self):
+        return any(callback.listens_to_events() for callback in self.callbacks)
+
+    def on_run_start(self, population):
+        for callback in self.callbacks:
+            callback.on_run_start(population)
+
+    def on_generation_start(self, generation, population):
+        for callback in self.callbacks:
+            callback.on_generation_start(generation, population)
+
+    def on_elitism(self, elite, seconds):
+        for callback in self.callbacks:
+            callback.on_elitism(elite, seconds)
+
+    def on_selection(self, parents, seconds):
+        for callback in self.callbacks:
+            callback.on_selection(parents, seconds)
+
+    def on_crossover(self, parents, offspring, applied, seconds):
+        for callback in self.callbacks:
+            callback.on_crossover(parents, offspring, applied, seconds)
+
+    def on_mutation(self, individual, mutated, seconds):
+        for callback in self.callbacks:
+            callback.on_mutation(individual, mutated, seconds)
+
+    def on_evaluation(self, population, fitness, seconds):
+        for callback in self.callbacks:
+            callback.on_evaluation(population, fitness, seconds)
+
+    def on_generation_end(self, generation, population, fitness, best, phase_seconds):
+        for callback in self.callbacks:
+            callback.on_generation_end(generation, population, fitness, best, phase_seconds)
+
+    def on_run_end(self, best, best_fitness_over_gens):
+        for callback in self.callbacks:
+            callback.on_run_end(best, best_fitness_over_gens)
+
+
+def as_callback(callbacks):
+    """
+    Normalizes the `callbacks` argument of genetic_algorithm.
+
+    Args:
+        callbacks (GACallback, list[GACallback] or None): The callbacks.
+
+    Returns:
+        GACallback or None: A single callback (a CallbackList for several), or None when there are none.
+    """
+    if callbacks is None or isinstance(callbacks, GACallback):
+        return callbacks
+    callbacks = list(callbacks)
+    if not callbacks:
+        return None
+    return callbacks[0] if len(callbacks) == 1 else CallbackList(callbacks)
+
+
+class StatsCollector(GACallback):
+    """
+    Low-overhead collector of per-generation statistics.
+
+    Each record holds the generation number, the seconds spent in every phase
+    (see PHASES) and in the whole generation, the fitness evaluations and solution
+    copies made during the generation, the team aggregates computed and served by
+    the problem's TeamCache (None without one), the best/mean/std of the
+    population's fitness, the share of feasible individuals (fitness below
+    INFEASIBLE_FITNESS) and its diversity (see population_diversity).
+
+    Only the per-generation hooks are used, so the GA's inner loop is not slowed
+    down by per-event calls. Each record is reduced to scalars when its generation
+    ends, so memory grows with the number of generations only, never with the
+    population size.
+    """
+
+    def __init__(self, diversity_every=10):
+        """
+        Args:
+            diversity_every (int, optional): Measures the diversity every that many generations
+                                             (and on the last one); other records hold None.
+                                             0 disables it. Defaults to 10.
+        """
+        self.diversity_every = diversity_every
+        self._records = []
+        self._last_population = None
+        self._team_cache = None
+
+    def on_run_start(self, population):
+        # Team aggregate cache of the run's problem, if any (see Model/FitnessCache.py)
+        problem = getattr(population[0], "problem", None) if population else None
+        self._team_cache = getattr(problem, "team_cache", None)
+
+    def on_generation_start(self, generation, population):
+        self._evaluations = Solution.fitness_evaluations
+        self._copies = Solution.copies
+        if self._team_cache is not None:
+            self._team_hits, self._team_misses = self._team_cache.hits, self._team_cache.misses
+        self._start = time.perf_counter()
+
+    def on_generation_end(self, generation, population, fitness, best, phase_seconds):
+        elapsed = time.perf_counter() - self._start
+        team_counts = None
+        if self._team_cache is not None:
+            team_counts = (self._team_cache.misses - self._team_misses, self._team_cache.hits - self._team_hits)
+        team_evaluations, team_evaluations_avoided = team_counts or (None, None)
+        diversity = None
+        if self.diversity_every and generation % self.diversity_every == 0:
+            diversity = self._diversity(population)
+        fitness = np.asarray(fitness, dtype=float)
+        self._records.append({
+            "generation": generation,
+            "seconds": elapsed,
+            **{f"{phase}_seconds": phase_seconds.get(phase, 0.0) for phase in PHASES},
+            "evaluations": Solution.fitness_evaluations - self._evaluations,
+            "copies": Solution.copies - self._copies,
+            "team_evaluations": team_evaluations,
+            "team_evaluations_avoided": team_evaluations_avoided,
+            "best": float(best.fitness()),
+            "mean": float(fitness.mean()),
+            "std": float(fitness.std()),
+            "feasible_rate": float((fitness < INFEASIBLE_FITNESS).mean()),
+            "diversity": diversity,
+        })
+        self._last_population = population
+
+    def on_run_end(self, best, best_fitness_over_gens):
+        # The final population's diversity is always recorded
+        if self.diversity_every and self._records and self._records[-1]["diversity"] is None:
+            self._records[-1]["diversity"] = self._diversity(self._last_population)
+        self._last_population = None
+
+    @staticmethod
+    def _diversity(population):
+        try:
+            return population_diversity([ind.repr for ind in population])
+        except ValueError:
+            return None  # representations that don't stack into one array
+
+    @property
+    def records(self):
+        """
+        list[dict]: One record per generation, in order.
+        """
+        return self._records
+
+    def summary(self):
+        """
+        Totals over all recorded generations.
+
+        Returns:
+            dict: 'generations', total 'seconds', '<phase>_seconds' and the share of time of each
+                  phase ('<phase>_share'), total 'evaluations' and 'copies' (and 'team_evaluations' and
+                  'team_evaluations_avoided' with a TeamCache), the mean 'feasible_rate', and the last
+                  generation's 'best' fitness and 'diversity'.
+        """
+        records = self.records
+        if not records:
+            return {"generations": 0}
+        total = sum(record["seconds"] for record in records)
+        summary = {"generations": len(records), "seconds": total}
+        for phase in PHASES:
+            seconds = sum(record[f"{phase}_seconds"] for record in records)
+            summary[f"{phase}_seconds"] = seconds
+            summary[f"{phase}_share"] = seconds / total if total else 0.0
+        summary["evaluations"] = sum(record["evaluations"] for record in records)
+        summary["copies"] = sum(record["copies"] for record in records)
+        if records[-1]["team_evaluations"] is not None:
+            summary["team_evaluations"] = sum(record["team_evaluations"] for record in records)
+            summary["team_evaluations_avoided"] = sum(record["team_evaluations_avoided"] for record in records)
+        summary["feasible_rate"] = sum(record["feasible_rate"] for record in records) / len(records)
+        summary["best"] = records[-1]["best"]
+        summary["diversity"] = records[-1]["diversity"]
+        return summary
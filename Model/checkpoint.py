@@ -0,0 +1,202 @@
+import json
+import os
+import random
+
+import numpy as np
+
+from Model.Population import evaluate_population, pack_leagues
+from Model.genetic_algorithm import SportsLeagueGASolution, genetic_algorithm, get_best_ind
+
+# Bumped whenever the layout of the file changes
+CHECKPOINT_FORMAT = 1
+
+
+class Checkpoint:
+    """
+    The state of a genetic_algorithm run after a generation, as stored on disk.
+
+    Only numbers are stored: the leagues as one packed integer array, the fitness
+    history, the generation counter and the states of Python's and NumPy's global
+    random generators. The players and the operators are not; they come from the
+    LeagueProblem given when resuming.
+
+    Attributes:
+        leagues (np.ndarray): Player ids of the population, shaped (pop_size, num_teams, team_size).
+        fitness_history (np.ndarray): Best fitness of each generation evolved so far.
+        generation (int): Generations evolved so far.
+        maximization (bool): Whether the run maximizes the fitness.
+        stopped_by (str or None): The termination criterion that ended the run, if one did.
+        termination (dict or None): Progress of the run's Termination (see Termination.state).
+        metadata (dict): Everything else, e.g. the league spec and the operators' names.
+    """
+
+    __slots__ = ("leagues", "fitness_history", "generation", "maximization", "stopped_by", "termination",
+                 "metadata", "python_rng_state", "numpy_rng_state")
+
+    def restore_rng(self):
+        # Puts both global generators back where they were when the checkpoint was written
+        random.setstate(self.python_rng_state)
+        np.random.set_state(self.numpy_rng_state)
+
+    def population(self, problem):
+        """
+        Rebuilds the population on a problem.
+
+        Args:
+            problem (LeagueProblem): Players and operators of the run.
+
+        Returns:
+            list[SportsLeagueGASolution]: The individuals, in their original order.
+        """
+        spec = self.metadata.get("spec")
+        if spec is not None and (spec["num_teams"], tuple(spec["formation"])) != \
+                (problem.spec.num_teams, problem.spec.formation):
+            raise ValueError(f"Checkpoint leagues do not match the problem: {spec} vs {problem.spec}")
+        return [SportsLeagueGASolution(repr=league, problem=problem) for league in self.leagues.tolist()]
+
+
+def save_checkpoint(path, population, fitness_history, maximization=False, termination=None):
+    """
+    Writes the state of a run to `path` atomically.
+
+    The file is written next to `path` and then renamed over it, so a crash while
+    writing leaves the previous checkpoint intact. It is an uncompressed .npz
+    archive holding only integer and float arrays (no pickles).
+
+    Args:
+        population (list[Solution]): The current population.
+        fitness_history (list[float]): Best fitness of each generation evolved so far.
+        maximization (bool, optional): Whether the run maximizes the fitness. Defaults to False.
+        termination (Termination, optional): The run's termination criteria, whose progress is saved.
+    """
+    problem = population[0].problem
+    ids = problem.player_pool.ids
+    # Smallest integer type holding every player id, e.g. uint16 for pools of up to 65536 players
+    dtype = np.result_type(np.min_scalar_type(int(ids.min())), np.min_scalar_type(int(ids.max())))
+    leagues = pack_leagues([ind.repr for ind in population], dtype=dtype)
+
+    version, python_state, gauss_next = random.getstate()
+    name, keys, pos, has_gauss, cached_gaussian = np.random.get_state()
+    metadata = {
+        "format": CHECKPOINT_FORMAT,
+        "generation": len(fitness_history),
+        "maximization": bool(maximization),
+        "stopped_by": termination.fired if termination is not None else None,
+        "termination": termination.state() if termination is not None else None,
+        "spec": {"num_teams": problem.spec.num_teams, "formation": list(problem.spec.formation),
+                 "salary_cap": problem.spec.salary_cap},
+        "operators": {"mutation": getattr(problem.mutation_function, "__name__", None),
+                      "crossover": getattr(problem.crossover_function, "__name__", None)},
+        "python_rng": {"version": version, "gauss_next": gauss_next},
+        "numpy_rng": {"name": name, "pos": int(pos), "has_gauss": int(has_gauss),
+                      "cached_gaussian": float(cached_gaussian)},
+    }
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f,
+                 leagues=leagues,
+                 fitness_history=np.asarray(fitness_history, dtype=np.float64),
+                 python_rng=np.asarray(python_state, dtype=np.uint32),
+                 numpy_rng=keys,
+                 metadata=np.frombuffer(json.dumps(metadata).encode(), dtype=np.uint8))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path):
+    """
+    Reads a checkpoint written by save_checkpoint.
+
+    Returns:
+        Checkpoint: The saved state.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        metadata = json.loads(data["metadata"].tobytes())
+        if metadata.get("format") != CHECKPOINT_FORMAT:
+            raise ValueError(f"Unsupported checkpoint format: {metadata.get('format')}")
+        checkpoint = Checkpoint()
+        checkpoint.leagues = data["leagues"]
+        checkpoint.fitness_history = data["fitness_history"]
+        python_state = tuple(int(word) for word in data["python_rng"])
+        numpy_keys = data["numpy_rng"]
+
+    checkpoint.generation = metadata.pop("generation")
+    checkpoint.maximization = metadata.pop("maximization")
+    checkpoint.stopped_by = metadata.pop("stopped_by")
+    checkpoint.termination = metadata.pop("termination")
+    python_rng, numpy_rng = metadata.pop("python_rng"), metadata.pop("numpy_rng")
+    checkpoint.python_rng_state = (python_rng["version"], python_state, python_rng["gauss_next"])
+    checkpoint.numpy_rng_state = (numpy_rng["name"], numpy_keys, numpy_rng["pos"],
+                                  numpy_rng["has_gauss"], numpy_rng["cached_gaussian"])
+    checkpoint.metadata = metadata
+    return checkpoint
+
+
+class Checkpointer:
+    """
+    Periodic checkpoints of a genetic_algorithm run, passed as its `checkpoint` argument.
+
+    A checkpoint is written every `every` generations, on the last generation and
+    when a termination criterion stops the run, always to the same file.
+    """
+
+    def __init__(self, path, every=10):
+        """
+        Args:
+            path (str): The checkpoint file; overwritten by every checkpoint.
+            every (int, optional): Generations between checkpoints. Defaults to 10.
+        """
+        self.path = path
+        self.every = every
+
+    def due(self, generation):
+        return self.every > 0 and generation % self.every == 0
+
+    def save(self, population, fitness_history, maximization=False, termination=None):
+        save_checkpoint(self.path, population, fitness_history, maximization, termination)
+
+
+def resume_genetic_algorithm(path, problem, selection_algorithm, max_gen, maximization=None, termination=None,
+                             **kwargs):
+    """
+    Continues a genetic_algorithm run from its last checkpoint.
+
+    Given the same problem, operators and settings as the original run, the result
+    is bit-identical to a run that was never interrupted.
+
+    Args:
+        path (str): The checkpoint file.
+        problem (LeagueProblem): Players and operators of the run.
+        selection_algorithm (Callable): Function used for selecting individuals.
+        max_gen (int): Total number of generations of the run, those already evolved included.
+        maximization (bool, optional): Defaults to the value saved in the checkpoint.
+        termination (Termination, optional): Early-stopping criteria; continues from the saved progress.
+        **kwargs: Other arguments of genetic_algorithm (xo_prob, mut_prob, elitism, verbose,
+                  callbacks, checkpoint).
+
+    Returns:
+        Same as genetic_algorithm.
+    """
+    checkpoint = load_checkpoint(path)
+    if maximization is None:
+        maximization = checkpoint.maximization
+    population = checkpoint.population(problem)
+    # Scored before the run restarts, so the evaluations are not counted twice against a budget
+    fitness = evaluate_population(population)
+    history = checkpoint.fitness_history.tolist()
+
+    if checkpoint.stopped_by is not None:
+        # The run had already stopped: there is nothing left to evolve
+        best = get_best_ind(population, maximization, fitness)
+        if termination is None:
+            return best, history
+        termination.fired = checkpoint.stopped_by
+        return best, termination.finish(history, max_gen)
+
+    checkpoint.restore_rng()
+    if termination is not None and checkpoint.termination is not None:
+        termination.restore(checkpoint.termination)
+    return genetic_algorithm(population, max_gen, selection_algorithm, maximization, termination=termination,
+                             start_generation=checkpoint.generation, fitness_history=history, **kwargs)
@@ -0,0 +1,205 @@
+import math
+import time
+from bisect import bisect_left, bisect_right
+from itertools import combinations
+
+import numpy as np
+
+from Model.PlayerPool import POSITION_CODES, as_player_pool
+from Model.LeagueSpec import LeagueSpec
+
+
+def _balanced_deviation(total, teams, num_teams, league_total):
+    """
+    Smallest sum of (num_teams * S - league_total)**2 over `teams` integer team sums S adding up to `total`.
+
+    Spreading the total as evenly as possible is optimal since the terms are convex.
+    """
+    if teams == 0:
+        return 0
+    q, r = divmod(total, teams)
+    return r * (num_teams * (q + 1) - league_total) ** 2 + (teams - r) * (num_teams * q - league_total) ** 2
+
+
+def solve_league(players, spec=None, time_budget=10.0):
+    """
+    Finds the most balanced league by branch-and-bound, or a lower bound on it within a time budget.
+
+    Solves the model scored by SportsLeagueSolution.fitness: every team fills the
+    formation with distinct players of the right positions and stays under the
+    salary cap, and the fitness is the std of the teams' average skills. The pool
+    must hold exactly the players of the league (e.g. the 35 players of
+    `Data/players(in).csv` for 5 teams), so every league has the same total skill
+    and balance only depends on how it is split. Skills must be integers (floats
+    holding whole numbers are accepted), since the bounds split skill sums into integers.
+
+    Teams are built one at a time. Symmetry is broken by giving each team the lowest
+    remaining player of the formation's first position (its goalkeeper by default),
+    and players of one position are chosen as sorted combinations. A partial league
+    is pruned when the deviation of its teams plus the most even integer split of
+    the remaining skill cannot beat the best league found, and candidate teams are
+    tried closest-to-average first. The search stops as soon as a league meets the
+    root bound (the most even integer split of the total skill).
+
+    The returned lower bound can be given to the GA as a target fitness, e.g.
+    `Termination(target_fitness=result['lower_bound'], tolerance=1e-9)`; the tolerance
+    absorbs float rounding between team orders.
+
+    Args:
+        players (pd.DataFrame or PlayerPool): The players table.
+        spec (LeagueSpec, optional): Number of teams, formation and salary cap. Defaults to as many
+                                     teams of the default formation as the players fill.
+        time_budget (float, optional): Seconds after which the search stops. Defaults to 10.
+
+    Returns:
+        dict: 'league' (best league found, one list of player ids per team in formation order, or
+              None), 'fitness' (its fitness), 'lower_bound' (no league has a lower fitness; equals
+              'fitness' when 'optimal'), 'optimal' (True if the search completed or met the bound),
+              'nodes' (partial leagues explored) and 'seconds'.
+    """
+    start = time.perf_counter()
+    pool = as_player_pool(players)
+    if spec is None:
+        spec = LeagueSpec.for_pool(pool)
+    num_teams, team_size, cap = spec.num_teams, spec.team_size, spec.salary_cap
+
+    # One role per position of the formation: its player count and available players
+    roles = [(spec.formation[slots[0]], len(slots)) for slots in spec.role_slots]
+    # The bounds split skill sums into integers, so skills must be whole numbers (floats holding
+    # whole numbers, as inline or CSV pools may, are cast)
+    if not np.array_equal(pool.skill, np.round(pool.skill)):
+        raise ValueError("The exact solver needs integer skills")
+    skill = dict(zip(pool.ids.tolist(), pool.skill.astype(np.int64).tolist()))
+    salary = dict(zip(pool.ids.tolist(), pool.salary.tolist()))
+    available = []
+    for pos, count in roles:
+        ids = sorted(pool.ids_by_position[POSITION_CODES[pos]].tolist())
+        if len(ids) != count * num_teams:
+            raise ValueError(f"The exact solver needs exactly {count * num_teams} {pos} players, got {len(ids)}")
+        available.append(ids)
+    league_total = sum(skill[pid] for ids in available for pid in ids)
+
+    # Squared deviations are kept as integers: (num_teams * team_skill - league_total) ** 2
+    def to_fitness(deviation):
+        return math.sqrt(deviation / num_teams ** 3) / team_size
+
+    root_bound = _balanced_deviation(league_total, num_teams, num_teams, league_total)
+    best = {"deviation": math.inf, "league": None}
+    nodes = 0
+    timed_out = False
+
+    def combos_of(ids, count):
+        # (skill, salary, players) of every way to pick `count` of `ids`, sorted by skill
+        combos = [(sum(skill[p] for p in c), sum(salary[p] for p in c), c) for c in combinations(ids, count)]
+        combos.sort(key=lambda combo: combo[0])
+        return combos
+
+    def candidate_teams(remaining, lo, hi):
+        """
+        Lists the teams (skill, salary, players per role) that can be built from the remaining
+        players with a skill sum in [lo, hi] and a salary within the cap.
+        """
+        # The first role's lowest remaining player is forced (symmetry breaking)
+        anchor_count = roles[0][1]
+        first = remaining[0][0]
+        anchor_combos = [(skill[first] + s, salary[first] + c, (first,) + combo)
+                         for s, c, combo in combos_of(remaining[0][1:], anchor_count - 1)]
+        role_combos = [anchor_combos] + [combos_of(remaining[r], roles[r][1]) for r in range(1, len(roles))]
+        # Skill range still reachable by the roles after each one, and their cheapest salary
+        min_after = [0] * (len(roles) + 1)
+        max_after = [0] * (len(roles) + 1)
+        cheapest_after = [0] * (len(roles) + 1)
+        for r in range(len(roles) - 1, -1, -1):
+            min_after[r] = min_after[r + 1] + role_combos[r][0][0]
+            max_after[r] = max_after[r + 1] + role_combos[r][-1][0]
+            cheapest_after[r] = cheapest_after[r + 1] + min(combo[1] for combo in role_combos[r])
+
+        teams = []
+
+        def extend(r, team_skill, team_salary, chosen):
+            if r == len(roles) - 1:
+                # Last role: only the combos landing in the window
+                combos = role_combos[r]
+                keys = [combo[0] for combo in combos]
+                for s, c, combo in combos[bisect_left(keys, lo - team_skill):bisect_right(keys, hi - team_skill)]:
+                    if team_salary + c <= cap:
+                        teams.append((team_skill + s, team_salary + c, chosen + [combo]))
+                return
+            for s, c, combo in role_combos[r]:
+                total_skill, total_salary = team_skill + s, team_salary + c
+                if total_skill + min_after[r + 1] > hi:
+                    break  # combos are sorted by skill: the next ones overshoot too
+                if total_skill + max_after[r + 1] < lo or total_salary + cheapest_after[r + 1] > cap:
+                    continue
+                extend(r + 1, total_skill, total_salary, chosen + [combo])
+
+        extend(0, 0, 0, [])
+        return teams
+
+    def search(remaining, teams, deviation, remaining_skill):
+        nonlocal nodes, timed_out
+        nodes += 1
+        if time.perf_counter() - start > time_budget:
+            timed_out = True
+            return
+        left = num_teams - len(teams)
+        # Every remaining player is placed, so their salaries must fit under the remaining caps
+        if sum(salary[p] for ids in remaining for p in ids) > cap * left:
+            return
+
+        if left == 1:
+            # The last team takes every remaining player
+            team_salary = sum(salary[p] for ids in remaining for p in ids)
+            total = deviation + (num_teams * remaining_skill - league_total) ** 2
+            if team_salary <= cap and total < best["deviation"]:
+                best["deviation"] = total
+                best["league"] = teams + [[tuple(ids) for ids in remaining]]
+            return
+
+        # Team sums S that can still beat the incumbent: (n*S - T)**2 + bound(rest) < best - deviation
+        budget = best["deviation"] - deviation
+        lowest = sum(sum(sorted(skill[p] for p in ids)[:count]) for ids, (_, count) in zip(remaining, roles))
+        highest = sum(sum(sorted(skill[p] for p in ids)[-count:]) for ids, (_, count) in zip(remaining, roles))
+        allowed = [s for s in range(lowest, highest + 1)
+                   if (num_teams * s - league_total) ** 2
+                   + _balanced_deviation(remaining_skill - s, left - 1, num_teams, league_total) < budget]
+        if not allowed:
+            return
+
+        candidates = candidate_teams(remaining, allowed[0], allowed[-1])
+        # Most balanced teams first, so good leagues (and tight bounds) are found early
+        candidates.sort(key=lambda team: abs(num_teams * team[0] - league_total))
+        for team_skill, _, chosen in candidates:
+            team_deviation = (num_teams * team_skill - league_total) ** 2
+            rest_bound = _balanced_deviation(remaining_skill - team_skill, left - 1, num_teams, league_total)
+            if deviation + team_deviation + rest_bound >= best["deviation"]:
+                continue
+            rest = [[p for p in ids if p not in combo] for ids, combo in zip(remaining, chosen)]
+            search(rest, teams + [chosen], deviation + team_deviation, remaining_skill - team_skill)
+            if timed_out or best["deviation"] <= root_bound:
+                return
+
+    search(available, [], 0, league_total)
+
+    optimal = not timed_out or best["deviation"] <= root_bound
+    league = None
+    fitness = None
+    if best["league"] is not None:
+        # Back to one list of player ids per team, in formation order
+        league = []
+        for team in best["league"]:
+            by_pos = {pos: list(combo) for (pos, _), combo in zip(roles, team)}
+            league.append([by_pos[pos].pop(0) for pos in spec.formation])
+        fitness = to_fitness(best["deviation"])
+    if optimal:
+        lower_bound = fitness if fitness is not None else math.inf
+    else:
+        lower_bound = to_fitness(root_bound)
+    return {
+        "league": league,
+        "fitness": fitness,
+        "lower_bound": lower_bound,
+        "optimal": optimal,
+        "nodes": nodes,
+        "seconds": time.perf_counter() - start,
+    }
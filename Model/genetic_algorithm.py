@@ -1,150 +1,445 @@
 import random
+import inspect
+import time
 from copy import deepcopy
+from functools import lru_cache
 from typing import Callable
 from Model.Solution import SportsLeagueSolution
 from Model.Solution import Solution
+from Model.LeagueProblem import LeagueProblem
+from Model.Population import evaluate_population
+from Model.callbacks import as_callback
+from Model.termination import Termination
+from Operators.Selection import linear_ranking
 
 
 
-def get_best_ind(population: list[Solution], maximization: bool):
-    fitness_list = [ind.fitness() for ind in population]
+def get_best_ind(population: list[Solution], maximization: bool, fitness_list=None):
+    # fitness_list: optional precomputed fitness of each individual, aligned with the population
+    if fitness_list is None:
+        fitness_list = [ind.fitness() for ind in population]
+    else:
+        fitness_list = list(fitness_list)
     if maximization:
         return population[fitness_list.index(max(fitness_list))]
     else:
         return population[fitness_list.index(min(fitness_list))]
 
-def genetic_algorithm(
-    initial_population: list[Solution],
-    max_gen: int,
+def next_generation(
+    population: list[Solution],
+    fitness,
     selection_algorithm: Callable,
     maximization: bool = False,
     xo_prob: float = 0.9,
     mut_prob: float = 0.2,
     elitism: bool = True,
     verbose: bool = False,
+    callbacks=None,
+    phase_seconds=None,
 ):
     """
-    Executes a genetic algorithm to optimize a population of solutions.
+    Builds the next population from the current one (one generation of the GA).
 
     Args:
-        initial_population (list[Solution]): The starting population of solutions.
-        max_gen (int): The maximum number of generations to evolve.
-        selection_algorithm (Callable): Function used for selecting individuals.
+        population (list[Solution]): The current population.
+        fitness (sequence of float): Fitness of each individual of the current population.
+        selection_algorithm (Callable): Function used for selecting individuals, or a SelectionEngine
+                                        whose `select` draws all the parents in one call.
         maximization (bool, optional): If True, maximizes the fitness function; otherwise, minimizes. Defaults to False.
         xo_prob (float, optional): Probability of applying crossover. Defaults to 0.9.
         mut_prob (float, optional): Probability of applying mutation. Defaults to 0.2.
         elitism (bool, optional): If True, carries the best individual to the next generation. Defaults to True.
         verbose (bool, optional): If True, prints detailed logs for debugging. Defaults to False.
+        callbacks (GACallback, optional): Notified of every elitism, selection, crossover and mutation
+                                          with the seconds it took (see Model/callbacks.py). Defaults to None.
+        phase_seconds (dict, optional): If given, the seconds spent in the 'elitism', 'selection',
+                                        'crossover' and 'mutation' phases are added to it. Defaults to None.
 
     Returns:
-        Solution: The best solution found on the last population after evolving for max_gen generations.
-        list[float]: The fitness of the best individual over the generations
+        list[Solution]: The new population, of the same size.
     """
-    best_fitness_over_gens = []
+    # Selection functions that accept a precomputed fitness vector (or ranking) get the generation's one
+    parameters = inspect.signature(selection_algorithm).parameters
+    selection_takes_fitness = "fitness" in parameters
+    selection_kwargs = {"fitness": fitness}
+    # Phases are only timed when someone listens; per-event hooks only fire for callbacks that define them
+    timer = time.perf_counter if callbacks is not None or phase_seconds is not None else None
+    events = callbacks if callbacks is not None and callbacks.listens_to_events() else None
+    elitism_time = selection_time = crossover_time = mutation_time = 0.0
+    # Each phase ends where the next one starts, so only one clock read per phase
+    now = timer and timer()
 
-    # 1. Initialize a population with N individuals
-    population = initial_population
+    # 2.1. Create an empty population P'
+    new_population = []
 
-    # 2. Repeat until termination condition
-    for gen in range(1, max_gen + 1):
-        if verbose:
-            print(f'-------------- Generation: {gen} --------------')
+    # 2.2. If using elitism, insert best individual from P into P'
+    if elitism:
+        elite = deepcopy(get_best_ind(population, maximization, fitness))
+        new_population.append(elite)
+        if timer:
+            start, now = now, timer()
+            elitism_time = now - start
+            if events:
+                events.on_elitism(elite, elitism_time)
+    
+    # Selection engines (see Operators/BatchSelection.py) draw every parent of the generation at once
+    parents = None
+    if hasattr(selection_algorithm, "select"):
+        pairs = (len(population) - len(new_population) + 1) // 2
+        parents = iter(selection_algorithm.select(population, maximization, fitness, 2 * pairs))
+        if timer:
+            start, now = now, timer()
+            selection_time += now - start
+    elif "ranking" in parameters:
+        # Rankers sort the generation once, not once per parent
+        selection_kwargs["ranking"] = linear_ranking(fitness, maximization)
+        if timer:
+            start, now = now, timer()
+            selection_time += now - start
 
-        # 2.1. Create an empty population P'
-        new_population = []
+    # 2.3. Repeat until P' contains N individuals
+    while len(new_population) < len(population):
+        start = now
 
-        # 2.2. If using elitism, insert best individual from P into P'
-        if elitism:
-            new_population.append(deepcopy(get_best_ind(population, maximization)))
-        
-        # 2.3. Repeat until P' contains N individuals
-        while len(new_population) < len(population):
-            # 2.3.1. Choose 2 individuals from P using a selection algorithm
+        # 2.3.1. Choose 2 individuals from P using a selection algorithm
+        if parents is not None:
+            first_ind, second_ind = next(parents), next(parents)
+        elif selection_takes_fitness:
+            first_ind = selection_algorithm(population, maximization, **selection_kwargs)
+            second_ind = selection_algorithm(population, maximization, **selection_kwargs)
+        else:
             first_ind = selection_algorithm(population, maximization)
             second_ind = selection_algorithm(population, maximization)
 
-            if verbose:
-                print(f'Selected individuals:\n{first_ind}\n{second_ind}')
+        if timer:
+            now = timer()
+            selection_time += now - start
+            if events:
+                events.on_selection((first_ind, second_ind), now - start)
+            start = now
 
-            # 2.3.2. Choose an operator between crossover and replication
-            # 2.3.3. Apply the operator to generate the offspring
-            if random.random() < xo_prob:
-                offspring1, offspring2 = first_ind.crossover(second_ind)
-                if verbose:
-                    print(f'Applied crossover')
-            else:
-                offspring1, offspring2 = deepcopy(first_ind), deepcopy(second_ind)
-                if verbose:
-                    print(f'Applied replication')
-            
-            if verbose:
-                print(f'Offspring:\n{offspring1}\n{offspring2}')
-            
-            # 2.3.4. Apply mutation to the offspring
-            first_new_ind = offspring1.mutation(mut_prob)
-            # 2.3.5. Insert the mutated individuals into P'
-            new_population.append(first_new_ind)
+        if verbose:
+            print(f'Selected individuals:\n{first_ind}\n{second_ind}')
 
+        # 2.3.2. Choose an operator between crossover and replication
+        # 2.3.3. Apply the operator to generate the offspring
+        applied = random.random() < xo_prob
+        if applied:
+            offspring1, offspring2 = first_ind.crossover(second_ind)
             if verbose:
-                print(f'First mutated individual: {first_new_ind}')
-            
-            if len(new_population) < len(population):
-                second_new_ind = offspring2.mutation(mut_prob)
-                new_population.append(second_new_ind)
-                if verbose:
-                    print(f'Second mutated individual: {second_new_ind}')
+                print(f'Applied crossover')
+        else:
+            offspring1, offspring2 = deepcopy(first_ind), deepcopy(second_ind)
+            if verbose:
+                print(f'Applied replication')
+
+        if timer:
+            now = timer()
+            crossover_time += now - start
+            if events:
+                events.on_crossover((first_ind, second_ind), (offspring1, offspring2), applied, now - start)
+            start = now
         
-        # 2.4. Replace P with P'
-        population = new_population
+        if verbose:
+            print(f'Offspring:\n{offspring1}\n{offspring2}')
+        
+        # 2.3.4. Apply mutation to the offspring
+        first_new_ind = offspring1.mutation(mut_prob)
+        if timer:
+            now = timer()
+            mutation_time += now - start
+            if events:
+                events.on_mutation(offspring1, first_new_ind, now - start)
+            start = now
+        # 2.3.5. Insert the mutated individuals into P'
+        new_population.append(first_new_ind)
 
         if verbose:
-            print(f'Final best individual in generation: {get_best_ind(population, maximization).fitness()}')
+            print(f'First mutated individual: {first_new_ind}')
         
-        best_ind = get_best_ind(population, maximization)
-        best_fitness_over_gens.append(best_ind.fitness())
+        if len(new_population) < len(population):
+            second_new_ind = offspring2.mutation(mut_prob)
+            if timer:
+                now = timer()
+                mutation_time += now - start
+                if events:
+                    events.on_mutation(offspring2, second_new_ind, now - start)
+            new_population.append(second_new_ind)
+            if verbose:
+                print(f'Second mutated individual: {second_new_ind}')
+
+    if phase_seconds is not None:
+        for phase, seconds in (("elitism", elitism_time), ("selection", selection_time),
+                               ("crossover", crossover_time), ("mutation", mutation_time)):
+            phase_seconds[phase] = phase_seconds.get(phase, 0.0) + seconds
+
+    return new_population
+
+
+def evolve(
+    initial_population: list[Solution],
+    max_gen: int,
+    selection_algorithm: Callable,
+    maximization: bool = False,
+    xo_prob: float = 0.9,
+    mut_prob: float = 0.2,
+    elitism: bool = True,
+    verbose: bool = False,
+    callbacks=None,
+    termination: Termination = None,
+    checkpoint=None,
+    start_generation: int = 0,
+    fitness_history: list[float] = None,
+    refine: Callable = None,
+):
+    """
+    Runs the genetic algorithm as a generator, yielding a small record after every generation.
+
+    Nothing is kept from one generation to the next but the population, so records
+    can be streamed to disk or drawn as they come. Breaking out of the loop stops
+    the run after the generation just yielded. Takes the same arguments as
+    genetic_algorithm, which is a wrapper collecting the records.
+
+    Yields:
+        dict: 'generation', 'best_fitness', 'mean_fitness', 'best' (the best individual, not a copy),
+              'best_repr' (its representation), 'seconds' spent on the generation, and 'stopped_by'
+              (the termination criterion that fired on this generation, else None).
+
+    Returns:
+        Solution: The best individual of the last population (the value of StopIteration).
+    """
+    callbacks = as_callback(callbacks)
+    # The history is only kept for the callbacks and checkpoints that need it
+    best_fitness_over_gens = None
+    if callbacks is not None or checkpoint is not None:
+        best_fitness_over_gens = list(fitness_history) if fitness_history is not None else []
+
+    # 1. Initialize a population with N individuals
+    population = initial_population
+    if termination is not None:
+        termination.start(maximization)
+    if callbacks is not None:
+        callbacks.on_run_start(population)
+    # Whole population scored in one batched call; reused until the population is replaced
+    fitness = evaluate_population(population)
+    best_ind = None
+
+    # 2. Repeat until termination condition
+    try:
+        for gen in range(start_generation + 1, max_gen + 1):
+            gen_start = time.perf_counter()
+            if verbose:
+                print(f'-------------- Generation: {gen} --------------')
+            # Seconds spent in each phase of this generation, only measured for callbacks
+            phase_seconds = None
+            if callbacks is not None:
+                callbacks.on_generation_start(gen, population)
+                phase_seconds = {}
+
+            # 2.1 - 2.3. Build P' with elitism, selection, crossover/replication and mutation
+            new_population = next_generation(population, fitness, selection_algorithm, maximization,
+                                              xo_prob, mut_prob, elitism, verbose, callbacks, phase_seconds)
+
+            # 2.4. Replace P with P'
+            population = new_population
+            if callbacks is not None:
+                start = time.perf_counter()
+                fitness = evaluate_population(population)
+                phase_seconds["evaluation"] = time.perf_counter() - start
+                callbacks.on_evaluation(population, fitness, phase_seconds["evaluation"])
+            else:
+                fitness = evaluate_population(population)
+
+            # 2.4.1. Refine some individuals in place, e.g. the best ones with local search
+            if refine is not None:
+                fitness = refine(population, fitness, maximization)
+
+            best_ind = get_best_ind(population, maximization, fitness)
+            best_fitness = best_ind.fitness()
+
+            if verbose:
+                print(f'Final best individual in generation: {best_fitness}')
+
+            if best_fitness_over_gens is not None:
+                best_fitness_over_gens.append(best_fitness)
+            if callbacks is not None:
+                callbacks.on_generation_end(gen, population, fitness, best_ind, phase_seconds)
+
+            # 2.5. Stop early if a termination criterion holds
+            stop = termination is not None and termination.check(gen, best_fitness)
+            # 2.6. Checkpoint every few generations, on the last one and when stopping early
+            if checkpoint is not None and (stop or gen == max_gen or checkpoint.due(gen)):
+                checkpoint.save(population, best_fitness_over_gens, maximization, termination)
+
+            yield {
+                "generation": gen,
+                "best_fitness": best_fitness,
+                "mean_fitness": float(fitness.mean()),
+                "best": best_ind,
+                "best_repr": best_ind.repr,
+                "seconds": time.perf_counter() - gen_start,
+                "stopped_by": termination.fired if stop else None,
+            }
+
+            if stop:
+                if verbose:
+                    print(f'Stopping at generation {gen}: {termination.fired}')
+                break
+    except GeneratorExit:
+        # The caller stopped iterating: the run ends on the last generation yielded
+        if callbacks is not None:
+            callbacks.on_run_end(best_ind, best_fitness_over_gens)
+        raise
 
-    # 3. Return the best individual in P + the best individual fitness over generations
-    return get_best_ind(population, maximization), best_fitness_over_gens
+    # 3. Return the best individual in P
+    if best_ind is None:
+        best_ind = get_best_ind(population, maximization, fitness)
+    if callbacks is not None:
+        callbacks.on_run_end(best_ind, best_fitness_over_gens)
+    return best_ind
 
 
+def genetic_algorithm(
+    initial_population: list[Solution],
+    max_gen: int,
+    selection_algorithm: Callable,
+    maximization: bool = False,
+    xo_prob: float = 0.9,
+    mut_prob: float = 0.2,
+    elitism: bool = True,
+    verbose: bool = False,
+    callbacks=None,
+    termination: Termination = None,
+    checkpoint=None,
+    start_generation: int = 0,
+    fitness_history: list[float] = None,
+    refine: Callable = None,
+):
+    """
+    Executes a genetic algorithm to optimize a population of solutions.
+
+    Collects the records of evolve (see there to stream them instead).
+
+    Args:
+        initial_population (list[Solution]): The starting population of solutions.
+        max_gen (int): The maximum number of generations to evolve.
+        selection_algorithm (Callable): Function used for selecting individuals.
+        maximization (bool, optional): If True, maximizes the fitness function; otherwise, minimizes. Defaults to False.
+        xo_prob (float, optional): Probability of applying crossover. Defaults to 0.9.
+        mut_prob (float, optional): Probability of applying mutation. Defaults to 0.2.
+        elitism (bool, optional): If True, carries the best individual to the next generation. Defaults to True.
+        verbose (bool, optional): If True, prints detailed logs for debugging. Defaults to False.
+        callbacks (GACallback or list[GACallback], optional): Observers of the run, e.g. a StatsCollector
+                                                              (see Model/callbacks.py). Defaults to None.
+        termination (Termination, optional): Early-stopping criteria (stagnation, target fitness, fitness
+                                             evaluations, wall-clock budget) checked after every generation,
+                                             on top of max_gen (see Model/termination.py); the criterion that
+                                             stopped the run is then its `fired`. Defaults to None.
+        checkpoint (Checkpointer, optional): Writes the state of the run to disk every few generations
+                                             (see Model/checkpoint.py). Defaults to None.
+        start_generation (int, optional): Generations already evolved, when continuing a run; the initial
+                                          population is then that generation's. Defaults to 0.
+        fitness_history (list[float], optional): Best fitness of those generations. Defaults to None.
+        refine (Callable, optional): Called as refine(population, fitness, maximization) after every
+                                     evaluation; may replace individuals and returns the updated fitness
+                                     vector, e.g. a MemeticRefinement (see Model/local_search.py).
+                                     Defaults to None.
+
+    Returns:
+        Solution: The best solution found on the last population after evolving for max_gen generations.
+        list[float]: The fitness of the best individual over the generations; with a termination, padded
+                     to max_gen entries unless it was created with pad_history=False
+    """
+    best_fitness_over_gens = list(fitness_history) if fitness_history is not None else []
+    run = evolve(initial_population, max_gen, selection_algorithm, maximization, xo_prob, mut_prob, elitism,
+                 verbose, callbacks, termination, checkpoint, start_generation, fitness_history, refine)
+    while True:
+        try:
+            record = next(run)
+        except StopIteration as stop:
+            best = stop.value
+            break
+        best_fitness_over_gens.append(record["best_fitness"])
+
+    if termination is not None:
+        best_fitness_over_gens = termination.finish(best_fitness_over_gens, max_gen)
+    return best, best_fitness_over_gens
+
+
+@lru_cache(maxsize=None)
+def _takes_spec(operator):
+    # Operators with a `spec` parameter are given the league spec of the problem
+    try:
+        return "spec" in inspect.signature(operator).parameters
+    except (TypeError, ValueError):
+        return False
+
 
 class SportsLeagueGASolution(SportsLeagueSolution):
+    __slots__ = ()
 
-    def __init__(self, mutation_function, crossover_function, players_df, repr = None): # mutation_function: Callable, crossover_function: Callable
-        super().__init__(players_df=players_df, repr=repr)
-        self.players_df = players_df 
+    def __init__(self, mutation_function=None, crossover_function=None, players_df=None, repr=None, problem=None): # mutation_function: Callable, crossover_function: Callable
+        # Operators are stored on the shared problem context, not on each solution
+        if problem is None:
+            problem = LeagueProblem(players_df,
+                                    mutation_function=mutation_function,
+                                    crossover_function=crossover_function)
+        super().__init__(repr=repr, problem=problem)
 
-        # Save as attributes for access in methods
-        self.mutation_function = mutation_function
-        self.crossover_function = crossover_function
+    @property
+    def mutation_function(self):
+        return self.problem.mutation_function
+
+    @property
+    def crossover_function(self):
+        return self.problem.crossover_function
 
 
     # crossover
     def crossover(self, other_solution):
         # Apply crossover function to self representation and other solution representation
-        offspring1_repr, offspring2_repr = self.crossover_function(self.repr, other_solution.repr, self.players_df)
+        if _takes_spec(self.crossover_function):
+            offspring1_repr, offspring2_repr = self.crossover_function(self.repr, other_solution.repr, self.player_pool,
+                                                                       spec=self.problem.spec)
+        else:
+            offspring1_repr, offspring2_repr = self.crossover_function(self.repr, other_solution.repr, self.player_pool)
+
+        if self.problem.repair_function is not None:
+            offspring1_repr, offspring2_repr = self._repair(offspring1_repr), self._repair(offspring2_repr)
 
         return (
-            SportsLeagueGASolution(repr=offspring1_repr,
-                                   mutation_function=self.mutation_function,
-                                   crossover_function=self.crossover_function,
-                                   players_df=self.players_df),
-            SportsLeagueGASolution(repr=offspring2_repr,
-                                   mutation_function=self.mutation_function,
-                                   crossover_function=self.crossover_function,
-                                   players_df=self.players_df)
+            SportsLeagueGASolution(repr=offspring1_repr, problem=self.problem),
+            SportsLeagueGASolution(repr=offspring2_repr, problem=self.problem)
         )
 
+    def _repair(self, league):
+        # Applies the problem's repair function to a new league
+        repair = self.problem.repair_function
+        if _takes_spec(repair):
+            return repair(league, self.player_pool, spec=self.problem.spec)
+        return repair(league, self.player_pool)
+
 
     # mutation
     def mutation(self, mut_prob):
         if random.random() < mut_prob:
              # Perform some actual mutation on self.repr
-             mutated_repr = self.mutation_function(self)
-             return SportsLeagueGASolution(repr=mutated_repr.repr,
-                                          mutation_function=self.mutation_function,
-                                          crossover_function=self.crossover_function,
-                                          players_df=self.players_df)
+             mutated = self.mutation_function(self)
+             if not (isinstance(mutated, SportsLeagueGASolution) and mutated.problem is self.problem):
+                 mutated = SportsLeagueGASolution(repr=mutated.repr, problem=self.problem)
+             # Otherwise keep the operator's copy: it carries incrementally updated team aggregates
         else:
-             return deepcopy(self)
-        
+             # Only the representation is copied; the problem context is shared
+             mutated = self.copy()
+        if self.problem.repair_function is not None:
+             self._repair_in_place(mutated)
+        return mutated
+
+    def _repair_in_place(self, solution):
+        # Known aggregates tell feasible leagues apart without calling the repair function
+        totals = solution.cached_team_totals()
+        if totals is not None and (totals[0] <= self.problem.spec.salary_cap).all():
+             return
+        repaired = self._repair(solution.repr)
+        if repaired is not solution.repr:
+             solution.repr = repaired
@@ -0,0 +1,310 @@
+import pickle
+import queue
+import random
+import time
+import traceback
+import multiprocessing as mp
+from contextlib import contextmanager
+
+import numpy as np
+
+from Model.LeagueProblem import LeagueProblem
+from Model.PlayerPool import as_player_pool
+from Model.Population import evaluate_population
+from Model.genetic_algorithm import SportsLeagueGASolution, get_best_ind, next_generation
+from Operators.Selection import tournament_selection
+
+
+def migration_targets(topology, num_islands):
+    """
+    Lists, for every island, the islands it sends its emigrants to.
+
+    Args:
+        topology (str or dict): 'ring' (island i sends to i + 1), 'fully_connected'
+                                (every island sends to every other one), or an explicit
+                                {island: [target islands]} mapping.
+        num_islands (int): Number of islands.
+
+    Returns:
+        list[list[int]]: Targets of each island.
+    """
+    if isinstance(topology, dict):
+        return [list(topology.get(i, [])) for i in range(num_islands)]
+    if num_islands < 2:
+        return [[] for _ in range(num_islands)]
+    if topology == "ring":
+        return [[(i + 1) % num_islands] for i in range(num_islands)]
+    if topology == "fully_connected":
+        return [[j for j in range(num_islands) if j != i] for i in range(num_islands)]
+    raise ValueError(f"Unknown topology: {topology}")
+
+
+class Island:
+    """
+    One sub-population of the island model, evolved with its own operators.
+
+    The island keeps its own `random`/NumPy generator states and swaps them in
+    while it evolves, so its trajectory depends only on its seed and on the
+    migrants it receives, whether it runs in its own process or not.
+    """
+
+    def __init__(self, index, config, player_pool, pop_size, seed, maximization=False, salary_cap=750):
+        """
+        Args:
+            index (int): Position of the island.
+            config (dict): Island settings: 'mutation_function', 'crossover_function' and optionally
+                           'selection_algorithm' (default tournament_selection), 'xo_prob' (0.9),
+                           'mut_prob' (0.2) and 'elitism' (True).
+            player_pool (PlayerPool): The players, shared read-only.
+            pop_size (int): Number of individuals on the island.
+            seed (int): Seed of the island's random generators.
+            maximization (bool, optional): If True, maximizes the fitness. Defaults to False.
+            salary_cap (float, optional): Maximum total salary of a team. Defaults to 750.
+        """
+        self.index = index
+        self.selection_algorithm = config.get("selection_algorithm", tournament_selection)
+        self.xo_prob = config.get("xo_prob", 0.9)
+        self.mut_prob = config.get("mut_prob", 0.2)
+        self.elitism = config.get("elitism", True)
+        self.maximization = maximization
+        self.problem = LeagueProblem(player_pool,
+                                     mutation_function=config["mutation_function"],
+                                     crossover_function=config["crossover_function"],
+                                     salary_cap=salary_cap)
+        self.best_fitness_over_gens = []
+
+        self._random_state = random.Random(seed).getstate()
+        self._np_state = np.random.RandomState(seed % 2**32).get_state()
+
+        with self._own_rng():
+            self.population = [SportsLeagueGASolution(problem=self.problem) for _ in range(pop_size)]
+        self.fitness = evaluate_population(self.population)
+
+    @contextmanager
+    def _own_rng(self):
+        # Swaps the island's generator states in for the duration of the block
+        saved = random.getstate(), np.random.get_state()
+        random.setstate(self._random_state)
+        np.random.set_state(self._np_state)
+        try:
+            yield
+        finally:
+            self._random_state, self._np_state = random.getstate(), np.random.get_state()
+            random.setstate(saved[0])
+            np.random.set_state(saved[1])
+
+    def evolve(self, generations):
+        # Runs `generations` GA generations on the island
+        with self._own_rng():
+            for _ in range(generations):
+                self.population = next_generation(self.population, self.fitness, self.selection_algorithm,
+                                                  self.maximization, self.xo_prob, self.mut_prob, self.elitism)
+                self.fitness = evaluate_population(self.population)
+                self.best_fitness_over_gens.append(float(get_best_ind(self.population, self.maximization, self.fitness).fitness()))
+
+    def _ranking(self):
+        # Indices from best to worst (stable, so ties keep population order)
+        order = np.argsort(self.fitness, kind="stable")
+        return order[::-1] if self.maximization else order
+
+    def emigrants(self, n):
+        """
+        Returns the representations of the island's n best individuals.
+
+        Returns:
+            np.ndarray: Player ids shaped (n, num_teams, team_size), in a compact integer dtype.
+        """
+        best = self._ranking()[:n]
+        return np.array([self.population[i].repr for i in best], dtype=np.int32)
+
+    def immigrate(self, leagues):
+        """
+        Replaces the island's worst individuals with incoming leagues.
+
+        Args:
+            leagues (np.ndarray): Player ids shaped (k, num_teams, team_size).
+        """
+        if len(leagues) == 0:
+            return
+        worst = self._ranking()[::-1][:len(leagues)]
+        for i, league in zip(worst, leagues.tolist()):
+            self.population[i] = SportsLeagueGASolution(repr=league, problem=self.problem)
+        self.fitness = evaluate_population(self.population)
+
+    def best(self):
+        return get_best_ind(self.population, self.maximization, self.fitness)
+
+
+def _run_epochs(islands, targets, max_gen, migration_interval, n_migrants):
+    # Evolves the islands in epochs of `migration_interval` generations, migrating in between
+    done = 0
+    while done < max_gen:
+        epoch = min(migration_interval, max_gen - done)
+        for island in islands:
+            island.evolve(epoch)
+        done += epoch
+        if done < max_gen:
+            _exchange_in_process(islands, targets, n_migrants)
+
+
+def _island_process(index, config, player_pool, settings, targets, inboxes, results):
+    # Body of one island's worker process; a failure is reported to the parent as (index, error)
+    try:
+        _evolve_island(index, config, player_pool, settings, targets, inboxes, results)
+    except Exception as error:
+        try:
+            pickle.dumps(error)
+        except Exception:
+            error = RuntimeError(f"Island {index} failed:\n{traceback.format_exc()}")
+        results.put((index, error))
+        raise
+
+
+def _evolve_island(index, config, player_pool, settings, targets, inboxes, results):
+    # Evolve, send emigrants, wait for immigrants
+    island = Island(index, config, player_pool, settings["pop_size"], settings["seeds"][index],
+                    settings["maximization"], settings["salary_cap"])
+    sources = sum(index in island_targets for island_targets in targets)
+
+    start = time.perf_counter()
+    done = 0
+    while done < settings["max_gen"]:
+        epoch = min(settings["migration_interval"], settings["max_gen"] - done)
+        island.evolve(epoch)
+        done += epoch
+        if done < settings["max_gen"]:
+            emigrants = island.emigrants(settings["n_migrants"])
+            for target in targets[index]:
+                inboxes[target].put((index, emigrants))
+            # Incoming migrants are applied in source order so the result doesn't depend on timing
+            received = sorted((inboxes[index].get() for _ in range(sources)), key=lambda item: item[0])
+            for _, leagues in received:
+                island.immigrate(leagues)
+
+    best = island.best()
+    results.put((index, np.array(best.repr, dtype=np.int32), best.fitness(),
+                 island.best_fitness_over_gens, time.perf_counter() - start))
+
+
+def _collect_outcomes(workers, results, poll=0.1):
+    # Results of every island; raises the first island error, or if a worker dies without reporting
+    outcomes = []
+    while len(outcomes) < len(workers):
+        try:
+            outcome = results.get(timeout=poll)
+        except queue.Empty:
+            dead = [i for i, worker in enumerate(workers) if worker.exitcode not in (None, 0)]
+            if not dead:
+                continue
+            # Give the dead island's error report a moment to arrive before giving up on it
+            try:
+                outcome = results.get(timeout=1.0)
+            except queue.Empty:
+                raise RuntimeError(f"Island {dead[0]} exited with code {workers[dead[0]].exitcode}") from None
+        if len(outcome) == 2:
+            index, error = outcome
+            raise error
+        outcomes.append(outcome)
+    return outcomes
+
+
+def _exchange_in_process(islands, targets, n_migrants):
+    # Same migration as the worker processes: all islands emigrate, then immigrate in source order
+    outgoing = [island.emigrants(n_migrants) for island in islands]
+    for target, island in enumerate(islands):
+        for source in range(len(islands)):
+            if target in targets[source]:
+                island.immigrate(outgoing[source])
+
+
+def island_genetic_algorithm(
+    players,
+    island_configs: list[dict],
+    pop_size: int,
+    max_gen: int,
+    migration_interval: int = 10,
+    n_migrants: int = 1,
+    topology="ring",
+    seed: int = 0,
+    maximization: bool = False,
+    salary_cap: float = 750,
+    processes: bool = True,
+):
+    """
+    Island-model genetic algorithm: several sub-populations evolve in parallel and
+    periodically exchange their best individuals.
+
+    Each island runs `genetic_algorithm`'s generation step with its own operators in its
+    own process. Every `migration_interval` generations each island sends copies of its
+    `n_migrants` best leagues to its targets in the topology, and replaces its worst
+    individuals with the leagues it receives. The player pool is sent once per island and
+    migrants travel as compact integer arrays. If an island fails, the other islands are
+    stopped and its error is raised here.
+
+    Args:
+        players (pd.DataFrame or PlayerPool): The players table.
+        island_configs (list[dict]): One config per island, see Island.
+        pop_size (int): Number of individuals per island.
+        max_gen (int): Number of generations each island evolves.
+        migration_interval (int, optional): Generations between migrations. Defaults to 10.
+        n_migrants (int, optional): Individuals sent per migration. Defaults to 1.
+        topology (str or dict, optional): Migration topology, see migration_targets. Defaults to 'ring'.
+        seed (int, optional): Seed from which every island's seed is derived. Defaults to 0.
+        maximization (bool, optional): If True, maximizes the fitness. Defaults to False.
+        salary_cap (float, optional): Maximum total salary of a team. Defaults to 750.
+        processes (bool, optional): If False, islands run in turn in this process, with identical results. Defaults to True.
+
+    Returns:
+        Solution: The best solution over all islands' last populations.
+        list[float]: The best fitness over all islands at each generation.
+        list[list[float]]: The best fitness of each island at each generation.
+    """
+    pool = as_player_pool(players)
+    num_islands = len(island_configs)
+    targets = migration_targets(topology, num_islands)
+    seeds = [int(s) for s in np.random.SeedSequence(seed).generate_state(num_islands)]
+
+    if processes:
+        context = mp.get_context()
+        inboxes = [context.Queue() for _ in range(num_islands)]
+        results = context.Queue()
+        settings = {
+            "pop_size": pop_size, "max_gen": max_gen, "migration_interval": migration_interval,
+            "n_migrants": n_migrants, "seeds": seeds, "maximization": maximization, "salary_cap": salary_cap,
+        }
+        workers = [
+            context.Process(target=_island_process,
+                            args=(i, island_configs[i], pool, settings, targets, inboxes, results))
+            for i in range(num_islands)
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            outcomes = sorted(_collect_outcomes(workers, results), key=lambda item: item[0])
+        finally:
+            # On failure the other islands may wait forever for migrants: stop them
+            for worker in workers:
+                if worker.exitcode is None and worker.is_alive():
+                    worker.terminate()
+            for worker in workers:
+                worker.join()
+        best_leagues = [outcome[1].tolist() for outcome in outcomes]
+        histories = [outcome[3] for outcome in outcomes]
+    else:
+        islands = [Island(i, island_configs[i], pool, pop_size, seeds[i], maximization, salary_cap)
+                   for i in range(num_islands)]
+        _run_epochs(islands, targets, max_gen, migration_interval, n_migrants)
+        best_leagues = [island.best().repr for island in islands]
+        histories = [island.best_fitness_over_gens for island in islands]
+
+    # Rebuild the islands' champions here and keep the overall best
+    champions = []
+    for config, league in zip(island_configs, best_leagues):
+        problem = LeagueProblem(pool, mutation_function=config["mutation_function"],
+                                crossover_function=config["crossover_function"], salary_cap=salary_cap)
+        champions.append(SportsLeagueGASolution(repr=league, problem=problem))
+    best = get_best_ind(champions, maximization)
+
+    pick = max if maximization else min
+    best_fitness_over_gens = [pick(gen_values) for gen_values in zip(*histories)]
+    return best, best_fitness_over_gens, histories
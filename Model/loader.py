@@ -0,0 +1,155 @@
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from Model.PlayerPool import POSITION_CODES, POSITIONS, PlayerPool
+
+DEFAULT_PLAYERS_CSV = "Data/players(in).csv"
+
+# Columns of the raw CSV and the names used throughout the code
+COLUMN_NAMES = {
+    "Name": "name",
+    "Position": "position",
+    "Skill": "skill",
+    "Salary (€M)": "salary"
+}
+
+# Version of the binary cache layout; part of the cache key, so a new layout never reads an old cache
+PLAYER_CACHE_FORMAT = 1
+# Arrays of a cache directory, one .npy file each, indexed by player id
+PLAYER_CACHE_COLUMNS = ("skill", "salary", "position")
+
+
+def load_players_df(path=DEFAULT_PLAYERS_CSV):
+    """
+    Loads the players CSV the way main.ipynb does.
+
+    Columns are renamed to lowercase, players are sorted by position
+    (GK, DEF, MID, FWD) and an 'id' column is set to the new row number.
+
+    Args:
+        path (str, optional): Path of the players CSV. Defaults to DEFAULT_PLAYERS_CSV.
+
+    Returns:
+        pd.DataFrame: The players table.
+    """
+    import pandas as pd
+
+    df = pd.read_csv(path, index_col=0)
+    df.rename(columns=COLUMN_NAMES, inplace=True)
+
+    position_rank = {pos: i for i, pos in enumerate(POSITIONS)}
+    df_sorted = df.sort_values(by="position", key=lambda x: x.map(position_rank)).reset_index(drop=True)
+    df_sorted["id"] = df_sorted.index
+    return df_sorted
+
+
+def player_cache_dir(path=DEFAULT_PLAYERS_CSV, cache_dir=None):
+    """
+    Returns the directory holding the binary cache of a players CSV.
+
+    The directory name is a hash of the CSV's content (and of PLAYER_CACHE_FORMAT),
+    so editing the file never serves stale players.
+
+    Args:
+        path (str, optional): Path of the players CSV. Defaults to DEFAULT_PLAYERS_CSV.
+        cache_dir (str, optional): Where caches are kept. Defaults to a '.players_cache' folder
+                                   next to the CSV.
+
+    Returns:
+        str: The cache directory of this CSV content (it may not exist yet).
+    """
+    digest = hashlib.sha256(f"player-cache-v{PLAYER_CACHE_FORMAT}\n".encode())
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), ".players_cache")
+    return os.path.join(cache_dir, digest.hexdigest()[:32])
+
+
+def build_player_cache(path=DEFAULT_PLAYERS_CSV, cache_dir=None):
+    """
+    Parses a players CSV (with load_players_df) and writes its binary cache.
+
+    The arrays are written to a temporary directory that is then renamed into place,
+    so concurrent workers never see a half-written cache; if another process wins the
+    race, its cache is kept.
+
+    Args:
+        path (str, optional): Path of the players CSV. Defaults to DEFAULT_PLAYERS_CSV.
+        cache_dir (str, optional): Where caches are kept (see player_cache_dir).
+
+    Returns:
+        str: The cache directory.
+    """
+    target = player_cache_dir(path, cache_dir)
+    df = load_players_df(path)
+    columns = {
+        "skill": df["skill"].to_numpy(),
+        "salary": df["salary"].to_numpy(),
+        "position": np.array([POSITION_CODES[pos] for pos in df["position"]], dtype=np.int8),
+    }
+
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=os.path.dirname(target), prefix=".tmp-")
+    try:
+        for name in PLAYER_CACHE_COLUMNS:
+            with open(os.path.join(tmp, f"{name}.npy"), "wb") as f:
+                np.save(f, np.ascontiguousarray(columns[name]))
+                f.flush()
+                os.fsync(f.fileno())
+        os.chmod(tmp, 0o755)  # mkdtemp makes it private
+        os.rename(tmp, target)
+    except OSError:
+        if not os.path.isdir(target):
+            raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return target
+
+
+def open_player_cache(directory):
+    """
+    Opens a binary player cache as a PlayerPool, zero-copy.
+
+    The columns are read-only memory maps, so every process opening the same cache
+    shares the operating system's copy of it and startup costs no parsing.
+
+    Args:
+        directory (str): The cache directory (see player_cache_dir).
+
+    Returns:
+        PlayerPool: The pool, with the same ids as load_players_df.
+    """
+    # Plain ndarray views of the maps: memmap results of fancy indexing would be memmaps too, and slower
+    columns = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r").view(np.ndarray)
+               for name in PLAYER_CACHE_COLUMNS}
+    return PlayerPool.from_columns(columns["skill"], columns["salary"], columns["position"])
+
+
+def load_player_pool(path=DEFAULT_PLAYERS_CSV, cache_dir=None, use_cache=True):
+    """
+    Loads the players CSV straight into a PlayerPool.
+
+    By default the parsed players are kept in a binary cache keyed by the CSV's content
+    (see build_player_cache): the first call parses the CSV with pandas, later calls, in
+    any process, memory-map the cache without importing pandas.
+
+    Args:
+        path (str, optional): Path of the players CSV. Defaults to DEFAULT_PLAYERS_CSV.
+        cache_dir (str, optional): Where caches are kept (see player_cache_dir).
+        use_cache (bool, optional): If False, always parses the CSV. Defaults to True.
+
+    Returns:
+        PlayerPool: The compiled pool, with the same ids as load_players_df.
+    """
+    if not use_cache:
+        return PlayerPool.from_dataframe(load_players_df(path))
+    directory = player_cache_dir(path, cache_dir)
+    if not os.path.isdir(directory):
+        directory = build_player_cache(path, cache_dir)
+    return open_player_cache(directory)
@@ -0,0 +1,252 @@
+import math
+from functools import lru_cache
+
+import numpy as np
+
+from Model.Solution import INFEASIBLE_FITNESS, Solution
+from Model.termination import LOCAL_OPTIMUM, Termination
+from Operators.rng import default_rng
+
+# Acceptance rules of local_search
+STRATEGIES = ("steepest", "first", "annealing")
+
+# Moves scored per vectorized call while first improvement scans the neighbourhood
+FIRST_IMPROVEMENT_CHUNK = 16
+
+
+@lru_cache(maxsize=32)
+def swap_moves(num_teams, team_size):
+    """
+    Lists every same-slot swap between two teams, the moves player_swap_mutation samples from.
+
+    Args:
+        num_teams (int): Number of teams.
+        team_size (int): Number of slots per team.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: First team, second team (always greater) and slot
+                                                   of each of the C(num_teams, 2) * team_size moves.
+    """
+    first, second = np.triu_indices(num_teams, 1)
+    moves = (np.repeat(first, team_size), np.repeat(second, team_size),
+             np.tile(np.arange(team_size), len(first)))
+    for column in moves:
+        column.setflags(write=False)
+    return moves
+
+
+def score_swaps(league, team_salaries, team_skills, player_pool, spec, moves):
+    """
+    Computes the fitness of the leagues one swap away, from the team aggregates alone.
+
+    A swap only changes the sums of its two teams, and the mean team skill stays the
+    same, so each neighbour's std follows from the current squared deviations in O(1):
+    all moves are scored with a few array operations instead of one full evaluation each.
+
+    Args:
+        league (np.ndarray): Player ids, shaped (num_teams, team_size).
+        team_salaries (np.ndarray): Total salary of each team.
+        team_skills (np.ndarray): Total skill of each team.
+        player_pool (PlayerPool): The players.
+        spec (LeagueSpec): Team size and salary cap.
+        moves (tuple[np.ndarray, np.ndarray, np.ndarray]): First team, second team and slot of each move
+                                                           (see swap_moves).
+
+    Returns:
+        np.ndarray: Fitness of each neighbour, as league_fitness would compute it.
+    """
+    first, second, slot = moves
+    leaving, arriving = league[first, slot], league[second, slot]
+    # What the first team gains (and the second team loses)
+    skill_change = (player_pool.skill[arriving] - player_pool.skill[leaving]) / spec.team_size
+    salary_change = player_pool.salary[arriving] - player_pool.salary[leaving]
+
+    over_cap = team_salaries > spec.salary_cap
+    others_over = over_cap.sum() - over_cap[first].astype(int) - over_cap[second] > 0
+    infeasible = (others_over
+                  | (team_salaries[first] + salary_change > spec.salary_cap)
+                  | (team_salaries[second] - salary_change > spec.salary_cap))
+
+    deviation = team_skills / spec.team_size
+    deviation = deviation - deviation.mean()
+    squares = (deviation ** 2).sum() + 2 * skill_change * (deviation[first] - deviation[second] + skill_change)
+    balance = np.sqrt(np.maximum(squares, 0.0) / len(team_skills))
+    return np.where(infeasible, INFEASIBLE_FITNESS, balance)
+
+
+def local_search(
+    solution,
+    strategy="steepest",
+    max_steps=1000,
+    maximization=False,
+    termination: Termination = None,
+    temperature=None,
+    cooling=0.995,
+    rng=None,
+    verbose=False,
+):
+    """
+    Improves one league by swapping players of the same slot between teams.
+
+    Every step scores the whole swap neighbourhood (C(num_teams, 2) * team_size moves)
+    in one vectorized call on the team aggregates, then moves according to the strategy:
+        steepest: the best neighbour, while it improves on the current league.
+        first: the first improving neighbour in a random scan order; moves are scored
+               FIRST_IMPROVEMENT_CHUNK at a time and the scan stops at the chunk holding it.
+        annealing: one random neighbour (only that one is scored), accepted if it is not worse,
+                   else with probability exp(-worsening / temperature); the temperature is
+                   multiplied by `cooling` after every step.
+    Steepest and first improvement stop at a local optimum. Every neighbour scored counts
+    as one fitness evaluation, so runs can be compared with the GA by evaluations.
+
+    Args:
+        solution (SportsLeagueSolution): The starting league; it is not modified.
+        strategy (str, optional): One of STRATEGIES. Defaults to 'steepest'.
+        max_steps (int, optional): Most moves made. Defaults to 1000.
+        maximization (bool, optional): If True, maximizes the fitness. Defaults to False.
+        termination (Termination, optional): Early-stopping criteria checked after every step, on top
+                                             of max_steps (see Model/termination.py); the criterion that
+                                             stopped the search is then its `fired` (LOCAL_OPTIMUM when no
+                                             neighbour improves, MAX_GEN when max_steps ran out).
+                                             Defaults to None.
+        temperature (float, optional): Initial annealing temperature, positive. Defaults to the mean
+                                       worsening among the starting league's feasible neighbours.
+        cooling (float, optional): Temperature factor per annealing step. Defaults to 0.995.
+        rng (np.random.Generator, optional): Random generator. Defaults to one seeded from np.random.
+        verbose (bool, optional): If True, prints every improvement. Defaults to False.
+
+    Returns:
+        SportsLeagueSolution: The best league found (a new solution on the same problem).
+        list[float]: The best fitness after every step.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown local search strategy: {strategy} (expected one of {STRATEGIES})")
+    rng = rng if rng is not None else default_rng()
+    spec, pool = solution.problem.spec, solution.player_pool
+    # Minimize sign * fitness
+    sign = -1.0 if maximization else 1.0
+
+    league = np.array(solution.repr, dtype=np.int64)
+    team_salaries, team_skills = (np.array(totals) for totals in solution.team_totals())
+    current = solution.fitness()
+    moves = swap_moves(spec.num_teams, spec.team_size)
+    best_league, best_fitness = league.copy(), current
+    history = []
+    local_optimum = False
+    if termination is not None:
+        termination.start(maximization)
+
+    if strategy == "annealing" and temperature is not None and temperature <= 0:
+        raise ValueError(f"The annealing temperature must be positive, got {temperature}")
+    if strategy == "annealing" and temperature is None:
+        worsening = sign * (score_swaps(league, team_salaries, team_skills, pool, spec, moves) - current)
+        worsening = worsening[(worsening > 0) & (worsening < INFEASIBLE_FITNESS / 10)]
+        temperature = float(worsening.mean()) if len(worsening) else 1.0
+        Solution.fitness_evaluations += len(moves[0])
+
+    for step in range(1, max_steps + 1):
+        if strategy == "annealing":
+            move = int(rng.integers(len(moves[0])))
+            candidate = float(score_swaps(league, team_salaries, team_skills, pool, spec,
+                                          tuple(column[move:move + 1] for column in moves))[0])
+            Solution.fitness_evaluations += 1
+            change = sign * (candidate - current)
+            # Once cooling underflows the temperature to 0, only non-worsening moves pass
+            accepted = change <= 0 or (temperature > 0 and rng.random() < math.exp(-change / temperature))
+            temperature *= cooling
+        elif strategy == "steepest":
+            scores = score_swaps(league, team_salaries, team_skills, pool, spec, moves)
+            Solution.fitness_evaluations += len(scores)
+            # The tolerance keeps float noise from passing for an improvement
+            improving = np.flatnonzero(sign * (scores - current) < -1e-12)
+            if len(improving) == 0:
+                local_optimum = True
+                break
+            move = int(improving[np.argmin(sign * scores[improving])])
+            candidate = float(scores[move])
+            accepted = True
+        else:
+            move = None
+            order = rng.permutation(len(moves[0]))
+            for chunk_start in range(0, len(order), FIRST_IMPROVEMENT_CHUNK):
+                chunk = order[chunk_start:chunk_start + FIRST_IMPROVEMENT_CHUNK]
+                scores = score_swaps(league, team_salaries, team_skills, pool, spec,
+                                     tuple(column[chunk] for column in moves))
+                Solution.fitness_evaluations += len(scores)
+                improving = np.flatnonzero(sign * (scores - current) < -1e-12)
+                if len(improving):
+                    move, candidate = int(chunk[improving[0]]), float(scores[improving[0]])
+                    break
+            if move is None:
+                local_optimum = True
+                break
+            accepted = True
+
+        if accepted:
+            first, second, slot = (int(column[move]) for column in moves)
+            leaving, arriving = league[first, slot], league[second, slot]
+            league[first, slot], league[second, slot] = arriving, leaving
+            team_salaries[first] += pool.salary[arriving] - pool.salary[leaving]
+            team_salaries[second] -= pool.salary[arriving] - pool.salary[leaving]
+            team_skills[first] += pool.skill[arriving] - pool.skill[leaving]
+            team_skills[second] -= pool.skill[arriving] - pool.skill[leaving]
+            current = candidate
+            if sign * (current - best_fitness) < 0:
+                best_league[:], best_fitness = league, current
+                if verbose:
+                    print(f'Step {step}: {best_fitness}')
+
+        history.append(best_fitness)
+        if termination is not None and termination.check(step, best_fitness):
+            break
+
+    # The best league as a solution of the same problem, scored by the usual fitness
+    best = solution.copy()
+    best.repr = best_league.tolist()
+    best.fitness()
+
+    if termination is not None:
+        if local_optimum and termination.fired is None:
+            termination.fired = LOCAL_OPTIMUM
+        history = termination.finish(history, max_steps)
+    return best, history
+
+
+class MemeticRefinement:
+    """
+    Refines the best individuals of every generation with local_search.
+
+    Given to genetic_algorithm as `refine`, it replaces each of the `n_elite` best
+    individuals by the best league local search finds from it, and updates the
+    generation's fitness vector, before the best individual is picked.
+    """
+
+    def __init__(self, n_elite=1, strategy="steepest", max_steps=50, **kwargs):
+        """
+        Args:
+            n_elite (int, optional): Individuals refined per generation. Defaults to 1.
+            strategy (str, optional): Local search strategy (see STRATEGIES). Defaults to 'steepest'.
+            max_steps (int, optional): Most moves per refinement. Defaults to 50.
+            **kwargs: Other arguments of local_search (e.g. temperature, cooling).
+        """
+        self.n_elite = n_elite
+        self.strategy = strategy
+        self.max_steps = max_steps
+        self.kwargs = kwargs
+
+    def __call__(self, population, fitness, maximization=False):
+        """
+        Args:
+            population (list[SportsLeagueSolution]): The generation; refined individuals are replaced in place.
+            fitness (np.ndarray): Fitness of each individual, updated in place.
+            maximization (bool, optional): If True, higher fitness is better. Defaults to False.
+
+        Returns:
+            np.ndarray: The updated fitness vector.
+        """
+        order = np.argsort(-fitness if maximization else fitness, kind="stable")
+        for i in order[:self.n_elite].tolist():
+            refined, _ = local_search(population[i], self.strategy, self.max_steps, maximization, **self.kwargs)
+            population[i] = refined
+            fitness[i] = refined.fitness()
+        return fitness
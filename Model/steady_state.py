@@ -0,0 +1,235 @@
+import heapq
+import inspect
+import random
+from copy import deepcopy
+from typing import Callable
+
+import numpy as np
+
+from Model.Population import evaluate_population
+from Model.Solution import Solution
+from Model.termination import MAX_EVALUATIONS, Termination
+from Operators.Selection import linear_ranking
+
+# Replacement policies of steady_state_ga
+REPLACEMENTS = ("worst", "tournament", "crowding")
+
+
+class FitnessIndex:
+    """
+    Keeps the best and the worst individual of a population known under replacements.
+
+    Two heaps (best first, worst first) hold (fitness, index, version) entries. A
+    replacement bumps the slot's version and pushes new entries; entries of replaced
+    individuals are discarded lazily when they reach the top. Replacing and querying
+    cost O(log N) amortized instead of a scan of the whole population, and ties go to
+    the lowest index, as with get_best_ind.
+    """
+
+    def __init__(self, fitness, maximization=False):
+        """
+        Args:
+            fitness (sequence of float): Fitness of each individual.
+            maximization (bool, optional): If True, higher fitness is better. Defaults to False.
+        """
+        self.sign = -1.0 if maximization else 1.0
+        self.fitness = [float(value) for value in fitness]
+        self.versions = [0] * len(self.fitness)
+        self._rebuild()
+
+    def _rebuild(self):
+        self._best = [(self.sign * value, i, self.versions[i]) for i, value in enumerate(self.fitness)]
+        self._worst = [(-self.sign * value, i, self.versions[i]) for i, value in enumerate(self.fitness)]
+        heapq.heapify(self._best)
+        heapq.heapify(self._worst)
+
+    def _top(self, heap):
+        # Drops the entries of replaced individuals until the top one is current
+        while heap[0][2] != self.versions[heap[0][1]]:
+            heapq.heappop(heap)
+        return heap[0][1]
+
+    def best(self):
+        # Index of the best individual
+        return self._top(self._best)
+
+    def worst(self):
+        # Index of the worst individual
+        return self._top(self._worst)
+
+    def replace(self, index, value):
+        """
+        Records that the individual at `index` now has fitness `value`.
+
+        Args:
+            index (int): Position of the replaced individual.
+            value (float): Fitness of the new individual.
+        """
+        value = float(value)
+        self.fitness[index] = value
+        self.versions[index] += 1
+        heapq.heappush(self._best, (self.sign * value, index, self.versions[index]))
+        heapq.heappush(self._worst, (-self.sign * value, index, self.versions[index]))
+        # Stale entries are only popped from the tops; rebuild once they dominate
+        if len(self._best) > 4 * len(self.fitness):
+            self._rebuild()
+
+
+def _slot_distance(first, second):
+    # Number of slots holding different players, the distance behind population_diversity
+    return int((np.asarray(first.repr) != np.asarray(second.repr)).sum())
+
+
+def steady_state_ga(
+    initial_population: list[Solution],
+    max_evaluations: int,
+    selection_algorithm: Callable,
+    maximization: bool = False,
+    xo_prob: float = 0.9,
+    mut_prob: float = 0.2,
+    offspring_per_step: int = 2,
+    replacement: str = "worst",
+    tournament_size: int = 4,
+    verbose: bool = False,
+    termination: Termination = None,
+):
+    """
+    Executes a steady-state genetic algorithm: a few offspring per step replace members of one population.
+
+    Each step selects parents from the current population, builds `offspring_per_step`
+    children with crossover/replication and mutation (as next_generation does), scores
+    only those children, and inserts them with the replacement policy:
+        worst: a child replaces the worst individual, unless it is worse than it.
+        tournament: a child replaces the worst of `tournament_size` individuals drawn at random.
+        crowding: children are paired with the parent they are closest to (deterministic
+                  crowding, by number of slots holding different players) and replace it
+                  unless they are worse.
+    The best and worst individuals are tracked by a FitnessIndex, and nobody else is
+    copied or re-scored, so the run is budgeted in fitness evaluations rather than
+    generations; a replicated, unmutated child keeps its parent's memoized fitness.
+
+    Args:
+        initial_population (list[Solution]): The starting population of solutions.
+        max_evaluations (int): Fitness evaluations allowed, the initial population's included. The run
+                               also stops once it has created that many children.
+        selection_algorithm (Callable): Function used for selecting individuals, or a SelectionEngine.
+        maximization (bool, optional): If True, maximizes the fitness function; otherwise, minimizes. Defaults to False.
+        xo_prob (float, optional): Probability of applying crossover. Defaults to 0.9.
+        mut_prob (float, optional): Probability of applying mutation. Defaults to 0.2.
+        offspring_per_step (int, optional): Children created and inserted per step (lambda). Defaults to 2.
+        replacement (str, optional): One of REPLACEMENTS. Defaults to 'worst'.
+        tournament_size (int, optional): Individuals per replacement tournament. Defaults to 4.
+        verbose (bool, optional): If True, prints every new best fitness. Defaults to False.
+        termination (Termination, optional): Early-stopping criteria checked after every step, on top of
+                                             max_evaluations (see Model/termination.py); the criterion that
+                                             stopped the run is then its `fired` (MAX_EVALUATIONS if none did
+                                             before the budget ran out). Defaults to None.
+
+    Returns:
+        Solution: The best solution of the final population.
+        list[tuple[int, float]]: (fitness evaluations so far, best fitness) after every step.
+    """
+    if replacement not in REPLACEMENTS:
+        raise ValueError(f"Unknown replacement policy: {replacement} (expected one of {REPLACEMENTS})")
+    if offspring_per_step < 1:
+        raise ValueError("offspring_per_step must be at least 1")
+    parameters = inspect.signature(selection_algorithm).parameters
+    selection_takes_fitness = "fitness" in parameters
+    selection_takes_ranking = "ranking" in parameters
+    sign = -1.0 if maximization else 1.0
+
+    population = list(initial_population)
+    evaluations_before = Solution.fitness_evaluations
+    if termination is not None:
+        termination.start(maximization)
+    fitness = evaluate_population(population)
+    index = FitnessIndex(fitness, maximization)
+    # Position of every member, to find the parents a crowding child competes with
+    position = {id(ind): i for i, ind in enumerate(population)}
+    history = []
+    step = created = 0
+
+    def select_parents(count):
+        # A new view per call: rankers that cache by fitness vector must see the replacements
+        view = fitness[:]
+        if hasattr(selection_algorithm, "select"):
+            return selection_algorithm.select(population, maximization, view, count)
+        if selection_takes_ranking:
+            # Drawn like ranking_selection, but as the members themselves rather than copies:
+            # crowding finds the parents a child competes with by identity
+            sorted_indices, cum_weights = linear_ranking(view, maximization)
+            return [population[i] for i in random.choices(sorted_indices, cum_weights=cum_weights, k=count)]
+        if selection_takes_fitness:
+            return [selection_algorithm(population, maximization, fitness=view) for _ in range(count)]
+        return [selection_algorithm(population, maximization) for _ in range(count)]
+
+    def insert(slot, child, value):
+        del position[id(population[slot])]
+        population[slot] = child
+        position[id(child)] = slot
+        fitness[slot] = value
+        index.replace(slot, value)
+
+    # Children served from memo are free, so the number created also bounds the run
+    while Solution.fitness_evaluations - evaluations_before < max_evaluations and created < max_evaluations:
+        step += 1
+
+        # Build lambda children from pairs of parents
+        pairs = (offspring_per_step + 1) // 2
+        parents = iter(select_parents(2 * pairs))
+        children = []
+        for _ in range(pairs):
+            first_ind, second_ind = next(parents), next(parents)
+            if random.random() < xo_prob:
+                offspring1, offspring2 = first_ind.crossover(second_ind)
+            else:
+                offspring1, offspring2 = deepcopy(first_ind), deepcopy(second_ind)
+            children.append((offspring1.mutation(mut_prob), first_ind, second_ind))
+            if len(children) < offspring_per_step:
+                children.append((offspring2.mutation(mut_prob), second_ind, first_ind))
+
+        # Only the children are scored, in one batched call
+        values = evaluate_population([child for child, _, _ in children]).tolist()
+        created += len(children)
+
+        # Insert them
+        if replacement == "crowding":
+            for k in range(0, len(children), 2):
+                group = children[k:k + 2]
+                if len(group) == 2:
+                    (child1, parent1, parent2), (child2, _, _) = group
+                    # Pair each child with its closest parent
+                    if (_slot_distance(child1, parent2) + _slot_distance(child2, parent1)
+                            < _slot_distance(child1, parent1) + _slot_distance(child2, parent2)):
+                        group = [(child1, parent2, parent1), (child2, parent1, parent2)]
+                for (child, parent, _), value in zip(group, values[k:k + 2]):
+                    slot = position.get(id(parent))
+                    if slot is None:
+                        slot = index.worst()  # the parent was already replaced this step
+                    if sign * (value - fitness[slot]) <= 0:
+                        insert(slot, child, value)
+        else:
+            for (child, _, _), value in zip(children, values):
+                if replacement == "worst":
+                    slot = index.worst()
+                    if sign * (value - fitness[slot]) > 0:
+                        continue
+                else:
+                    contestants = random.sample(range(len(population)), tournament_size)
+                    slot = max(contestants, key=lambda i: sign * fitness[i])
+                insert(slot, child, value)
+
+        best_fitness = fitness[index.best()]
+        evaluations = Solution.fitness_evaluations - evaluations_before
+        if verbose and (not history or sign * (best_fitness - history[-1][1]) < 0):
+            print(f'Step {step} ({evaluations} evaluations): {best_fitness}')
+        history.append((evaluations, float(best_fitness)))
+
+        if termination is not None and termination.check(step, best_fitness):
+            break
+
+    best = population[index.best()]
+    if termination is not None:
+        if termination.fired is None:
+            termination.fired = MAX_EVALUATIONS
+    return best, history
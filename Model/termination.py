@@ -0,0 +1,147 @@
+import time
+
+from Model.Solution import Solution
+
+# Reasons a run can stop for, as left in Termination.fired
+MAX_GEN = "max_gen"
+STAGNATION = "stagnation"
+TARGET_FITNESS = "target_fitness"
+MAX_EVALUATIONS = "max_evaluations"
+TIME_BUDGET = "time_budget"
+# Only set by local_search: no neighbour improves on the current league
+LOCAL_OPTIMUM = "local_optimum"
+
+
+class Termination:
+    """
+    Early-stopping criteria for genetic_algorithm, combined with OR.
+
+    The run stops after the first generation at which any criterion holds; the
+    criteria are checked in the order stagnation, target fitness, evaluations,
+    time budget. A criterion left as None is not checked. The object keeps the
+    state of the run it is attached to, and is reset at the start of every run.
+
+    Attributes:
+        fired (str or None): The criterion that stopped the last run (MAX_GEN if none did).
+        generation (int): Last generation evolved by the last run.
+    """
+
+    def __init__(self, stagnation=None, target_fitness=None, max_evaluations=None, time_budget=None,
+                 tolerance=0.0, pad_history=True):
+        """
+        Args:
+            stagnation (int, optional): Stops when the best fitness has not improved for that many generations.
+            target_fitness (float, optional): Stops once the best fitness reaches this value (e.g. 0 std).
+            max_evaluations (int, optional): Stops once the run has made that many fitness evaluations,
+                                             the initial population's included.
+            time_budget (float, optional): Stops once the run has lasted that many seconds.
+            tolerance (float, optional): Smallest change of the best fitness that counts as an improvement,
+                                         and slack when comparing with target_fitness. Defaults to 0.
+            pad_history (bool, optional): If True, the fitness history of a stopped run is padded to
+                                          max_gen entries by repeating its last value, so runs of different
+                                          lengths stay aligned. Defaults to True.
+        """
+        self.stagnation = stagnation
+        self.target_fitness = target_fitness
+        self.max_evaluations = max_evaluations
+        self.time_budget = time_budget
+        self.tolerance = tolerance
+        self.pad_history = pad_history
+        self.fired = None
+        self.generation = 0
+        self._restored = None
+
+    def start(self, maximization=False):
+        # Resets the state for a new run; called by genetic_algorithm before the initial evaluation
+        self.maximization = maximization
+        self.fired = None
+        self.generation = 0
+        self._best = None
+        self._since_improvement = 0
+        self._evaluations = Solution.fitness_evaluations
+        self._start = time.perf_counter()
+        restored, self._restored = self._restored, None
+        if restored is not None:
+            # Continue the counters of a checkpointed run (see Model/checkpoint.py)
+            self.generation = restored["generation"]
+            self._best = restored["best"]
+            self._since_improvement = restored["since_improvement"]
+            self._evaluations -= restored["evaluations"]
+            self._start -= restored["seconds"]
+
+    def state(self):
+        """
+        Returns the progress of the current run as plain numbers, e.g. for a checkpoint.
+
+        Returns:
+            dict: 'generation', 'best', 'since_improvement', 'evaluations' and 'seconds' so far.
+        """
+        return {
+            "generation": self.generation,
+            "best": self._best,
+            "since_improvement": self._since_improvement,
+            "evaluations": Solution.fitness_evaluations - self._evaluations,
+            "seconds": time.perf_counter() - self._start,
+        }
+
+    def restore(self, state):
+        """
+        Makes the next run continue from a state returned by state() instead of starting from scratch.
+
+        Args:
+            state (dict): The saved state.
+        """
+        self._restored = dict(state)
+
+    def _better(self, a, b):
+        # True if fitness a improves on b by more than the tolerance
+        return a > b + self.tolerance if self.maximization else a < b - self.tolerance
+
+    def check(self, generation, best_fitness):
+        """
+        Updates the state with a generation's best fitness and tells whether to stop.
+
+        Args:
+            generation (int): The generation just evolved.
+            best_fitness (float): Its best fitness.
+
+        Returns:
+            str or None: The criterion that holds (STAGNATION, TARGET_FITNESS, MAX_EVALUATIONS
+                         or TIME_BUDGET), or None to continue.
+        """
+        self.generation = generation
+        if self._best is None or self._better(best_fitness, self._best):
+            self._best = best_fitness
+            self._since_improvement = 0
+        else:
+            self._since_improvement += 1
+
+        if self.stagnation is not None and self._since_improvement >= self.stagnation:
+            self.fired = STAGNATION
+        elif self.target_fitness is not None and (
+                best_fitness >= self.target_fitness - self.tolerance if self.maximization
+                else best_fitness <= self.target_fitness + self.tolerance):
+            self.fired = TARGET_FITNESS
+        elif (self.max_evaluations is not None
+              and Solution.fitness_evaluations - self._evaluations >= self.max_evaluations):
+            self.fired = MAX_EVALUATIONS
+        elif self.time_budget is not None and time.perf_counter() - self._start >= self.time_budget:
+            self.fired = TIME_BUDGET
+        return self.fired
+
+    def finish(self, history, max_gen):
+        """
+        Records the end of a run and pads its fitness history.
+
+        Args:
+            history (list[float]): Best fitness of each evolved generation.
+            max_gen (int): Number of generations the run was allowed.
+
+        Returns:
+            list[float]: The history, padded to max_gen entries when pad_history is set.
+        """
+        if self.fired is None:
+            self.fired = MAX_GEN
+        if self.pad_history and history and len(history) < max_gen:
+            history = history + [history[-1]] * (max_gen - len(history))
+        return history
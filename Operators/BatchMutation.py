@@ -0,0 +1,148 @@
+import numpy as np
+from Model.LeagueSpec import DEFAULT_FORMATION
+from Operators.rng import default_rng
+
+# Position expected at each slot of a team (same default layout as the scalar operators)
+POSITION_SLOTS = list(DEFAULT_FORMATION)
+
+
+def _role_groups(position_slots):
+    # Slot indices of each role, in formation order: [[0], [1, 2], [3, 4], [5, 6]]
+    groups = {}
+    for slot, pos in enumerate(position_slots):
+        groups.setdefault(pos, []).append(slot)
+    return [np.array(slots) for slots in groups.values()]
+
+
+def _draw_roles(rng, n, position_slots):
+    """
+    Draws the role affected in each of n mutations.
+
+    A slot is drawn uniformly and mapped to its role, exactly like `randint(0, 6)` followed by
+    the role lookup in role_shuffle_mutation and player_role_left_shift_mutation, so a role
+    with two slots is twice as likely as the goalkeeper.
+
+    Returns:
+        np.ndarray: Index into _role_groups(position_slots) for each mutation.
+    """
+    groups = _role_groups(position_slots)
+    role_of_slot = np.empty(len(position_slots), dtype=np.int64)
+    for role, slots in enumerate(groups):
+        role_of_slot[slots] = role
+    return role_of_slot[rng.integers(0, len(position_slots), size=n)], groups
+
+
+def batch_player_swap_mutation(leagues, mask, rng=None):
+    """
+    Vectorized player_swap_mutation over a population array.
+
+    For every selected league a slot is drawn uniformly, then a first team uniformly and a
+    second team uniformly among the remaining ones, and the two players in that slot are
+    swapped. Drawing the second team as `u + (u >= first)` with `u` uniform over num_teams - 1
+    values gives the same distribution as the scalar operator's redraw-until-different loop.
+
+    Args:
+        leagues (np.ndarray): Player ids shaped (pop_size, num_teams, team_size).
+        mask (np.ndarray of bool): Which leagues to mutate, shaped (pop_size,).
+        rng (np.random.Generator, optional): Random generator. Defaults to one seeded from np.random.
+
+    Returns:
+        np.ndarray: A mutated copy of `leagues`; rows outside `mask` are unchanged.
+    """
+    rng = rng if rng is not None else default_rng()
+    mutated = np.array(leagues, copy=True)
+    rows = np.flatnonzero(mask)
+    num_teams, team_size = mutated.shape[1], mutated.shape[2]
+
+    slot = rng.integers(0, team_size, size=len(rows))
+    team_1 = rng.integers(0, num_teams, size=len(rows))
+    team_2 = rng.integers(0, num_teams - 1, size=len(rows))
+    team_2 += team_2 >= team_1
+
+    pid_1 = mutated[rows, team_1, slot]
+    pid_2 = mutated[rows, team_2, slot]
+    mutated[rows, team_1, slot] = pid_2
+    mutated[rows, team_2, slot] = pid_1
+    return mutated
+
+
+def batch_role_shuffle_mutation(leagues, mask, rng=None, position_slots=POSITION_SLOTS):
+    """
+    Vectorized role_shuffle_mutation over a population array.
+
+    For every selected league a role is drawn (see _draw_roles) and all players of that role
+    are permuted uniformly at random across the teams. Leagues are grouped by role and each
+    group is permuted at once by sorting i.i.d. uniform keys, which yields a uniformly random
+    permutation just like `random.shuffle`.
+
+    Args:
+        leagues (np.ndarray): Player ids shaped (pop_size, num_teams, team_size).
+        mask (np.ndarray of bool): Which leagues to mutate, shaped (pop_size,).
+        rng (np.random.Generator, optional): Random generator. Defaults to one seeded from np.random.
+        position_slots (list of str, optional): Position expected at each slot of a team.
+
+    Returns:
+        np.ndarray: A mutated copy of `leagues`; rows outside `mask` are unchanged.
+    """
+    rng = rng if rng is not None else default_rng()
+    mutated = np.array(leagues, copy=True)
+    rows = np.flatnonzero(mask)
+    roles, groups = _draw_roles(rng, len(rows), position_slots)
+
+    for role, slots in enumerate(groups):
+        group_rows = rows[roles == role]
+        if len(group_rows) == 0:
+            continue
+        # Bag of the role's players in team-major order, as in the scalar operator
+        bag = mutated[group_rows][:, :, slots].reshape(len(group_rows), -1)
+        order = np.argsort(rng.random(bag.shape), axis=1)
+        bag = np.take_along_axis(bag, order, axis=1)
+        mutated[group_rows[:, None, None], np.arange(mutated.shape[1])[None, :, None], slots[None, None, :]] = \
+            bag.reshape(len(group_rows), mutated.shape[1], len(slots))
+    return mutated
+
+
+def batch_player_role_left_shift_mutation(leagues, mask, rng=None, position_slots=POSITION_SLOTS):
+    """
+    Vectorized player_role_left_shift_mutation over a population array.
+
+    For every selected league a role is drawn (see _draw_roles) and a shift uniformly in
+    [1, num_teams - 1], as `randint(1, len(new_repr) - 1)` does. The role's players, read
+    in team-major order, are rotated left by that many positions and written back.
+
+    Args:
+        leagues (np.ndarray): Player ids shaped (pop_size, num_teams, team_size).
+        mask (np.ndarray of bool): Which leagues to mutate, shaped (pop_size,).
+        rng (np.random.Generator, optional): Random generator. Defaults to one seeded from np.random.
+        position_slots (list of str, optional): Position expected at each slot of a team.
+
+    Returns:
+        np.ndarray: A mutated copy of `leagues`; rows outside `mask` are unchanged.
+    """
+    rng = rng if rng is not None else default_rng()
+    mutated = np.array(leagues, copy=True)
+    rows = np.flatnonzero(mask)
+    num_teams = mutated.shape[1]
+    roles, groups = _draw_roles(rng, len(rows), position_slots)
+    shifts = rng.integers(1, num_teams, size=len(rows))
+
+    for role, slots in enumerate(groups):
+        selected = roles == role
+        group_rows = rows[selected]
+        if len(group_rows) == 0:
+            continue
+        bag = mutated[group_rows][:, :, slots].reshape(len(group_rows), -1)
+        # new[j] = old[(j + shift) % len], i.e. role_players[shift:] + role_players[:shift]
+        order = (np.arange(bag.shape[1])[None, :] + shifts[selected][:, None]) % bag.shape[1]
+        bag = np.take_along_axis(bag, order, axis=1)
+        mutated[group_rows[:, None, None], np.arange(num_teams)[None, :, None], slots[None, None, :]] = \
+            bag.reshape(len(group_rows), num_teams, len(slots))
+    return mutated
+
+
+# Scalar operator -> batched counterpart
+BATCH_MUTATIONS = {
+    "player_swap_mutation": batch_player_swap_mutation,
+    "role_shuffle_mutation": batch_role_shuffle_mutation,
+    "player_role_left_shift_mutation": batch_player_role_left_shift_mutation,
+}
@@ -0,0 +1,124 @@
+import numpy as np
+
+from Operators.rng import default_rng
+
+# Selection schemes of SelectionEngine
+METHODS = ("rank", "tournament", "sus")
+
+
+class SelectionEngine:
+    """
+    Draws all the parents of a generation in one batched call.
+
+    The population is ranked once per fitness vector (one argsort), together with
+    the cumulative linear rank weights (n for the best individual down to 1 for the
+    worst). Every draw then costs O(1) or O(log n) array work, without calling
+    fitness() or copying individuals, so a generation of a 100k population is
+    selected in a few milliseconds.
+
+    Schemes:
+        rank: linear ranking, each parent drawn independently (as ranking_selection).
+        tournament: the best of `tournament_size` distinct individuals drawn uniformly
+                    (as tournament_selection); the winner is the smallest rank drawn.
+        sus: stochastic universal sampling over the rank weights, i.e. evenly spaced
+             pointers with one random offset, returned in random order.
+
+    The engine is also a drop-in selection_algorithm: next_generation calls `select`
+    once per generation, and calling the engine like tournament_selection returns a
+    single parent while reusing the ranking of the same fitness vector.
+    """
+
+    def __init__(self, method="tournament", tournament_size=4, rng=None):
+        """
+        Args:
+            method (str, optional): One of METHODS. Defaults to 'tournament'.
+            tournament_size (int, optional): Individuals per tournament. Defaults to 4.
+            rng (np.random.Generator, optional): Random generator. Defaults to one seeded from
+                                                 np.random for every batch.
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown selection method: {method} (expected one of {METHODS})")
+        if tournament_size < 1:
+            raise ValueError("tournament_size must be at least 1")
+        self.method = method
+        self.tournament_size = tournament_size
+        self.rng = rng
+        self._fitness = None
+        self._maximization = None
+
+    def prepare(self, fitness, maximization=False):
+        """
+        Ranks a population from its fitness vector.
+
+        Args:
+            fitness (sequence of float): Fitness of each individual.
+            maximization (bool, optional): If True, higher fitness is better. Defaults to False.
+        """
+        values = np.asarray(fitness, dtype=float)
+        # Position 0 holds the best individual; the stable sort keeps ties in population order
+        self.order = np.argsort(-values if maximization else values, kind="stable")
+        n = len(values)
+        self.cumulative_weights = np.cumsum(np.arange(n, 0, -1, dtype=float))
+        self._fitness = fitness
+        self._maximization = maximization
+
+    def draw(self, count):
+        """
+        Draws parents from the prepared ranking.
+
+        Args:
+            count (int): Number of parents.
+
+        Returns:
+            np.ndarray: Population index of each parent.
+        """
+        rng = self.rng if self.rng is not None else default_rng()
+        n = len(self.order)
+        if self.method == "tournament":
+            if self.tournament_size > n:
+                raise ValueError(f"Tournament of {self.tournament_size} in a population of {n}")
+            positions = rng.integers(0, n, size=(count, self.tournament_size))
+            # Redraw the tournaments that picked someone twice, so contestants are distinct
+            # as with random.sample; few are redrawn when the population is much larger than k
+            positions.sort(axis=1)
+            repeated = (positions[:, 1:] == positions[:, :-1]).any(axis=1)
+            while repeated.any():
+                redrawn = rng.integers(0, n, size=(int(repeated.sum()), self.tournament_size))
+                redrawn.sort(axis=1)
+                positions[repeated] = redrawn
+                repeated = (positions[:, 1:] == positions[:, :-1]).any(axis=1)
+            return self.order[positions[:, 0]]
+
+        total = self.cumulative_weights[-1]
+        if self.method == "rank":
+            pointers = rng.random(count) * total
+        else:
+            step = total / count
+            pointers = (rng.random() + np.arange(count)) * step
+        positions = np.searchsorted(self.cumulative_weights, pointers, side="right")
+        selected = self.order[np.minimum(positions, n - 1)]
+        return rng.permutation(selected) if self.method == "sus" else selected
+
+    def select(self, population, maximization=False, fitness=None, count=1):
+        """
+        Selects `count` parents of a population.
+
+        Args:
+            population (list): The individuals.
+            maximization (bool, optional): If True, higher fitness is better. Defaults to False.
+            fitness (sequence of float, optional): Precomputed fitness of each individual, aligned
+                                                   with the population. The ranking is reused as long
+                                                   as the same vector object is passed.
+            count (int, optional): Number of parents. Defaults to 1.
+
+        Returns:
+            list: The selected individuals (references, not copies).
+        """
+        if fitness is None:
+            fitness = [ind.fitness() for ind in population]
+        if fitness is not self._fitness or maximization != self._maximization:
+            self.prepare(fitness, maximization)
+        return [population[i] for i in self.draw(count).tolist()]
+
+    def __call__(self, population, maximization=False, fitness=None):
+        return self.select(population, maximization, fitness)[0]
@@ -1,5 +1,9 @@
 import random
-from collections import defaultdict, Counter
+import weakref
+from collections import Counter
+import numpy as np
+from Model.PlayerPool import POSITIONS, POSITION_CODES, as_player_pool
+from Model.LeagueSpec import DEFAULT_FORMATION
 
 def get_position_map(players_df):
     
@@ -20,21 +24,75 @@ def get_position_map(players_df):
     """
     return dict(zip(players_df['id'], players_df['position']))
 
-def standard_crossover_with_position_repair(parent1, parent2, players_df, verbose=False):
+class PositionIndex:
+    """
+    Position lookups of a player pool, precomputed once and shared by every crossover call.
+
+    Attributes:
+        pool (PlayerPool): The indexed pool.
+        position_of (list[int]): Position code of each player id (-1 for unused ids).
+        ids_by_position (list[list[int]]): Player ids of each position code, in table order.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.position_of = pool.position.tolist()
+        self.ids_by_position = [ids.tolist() for ids in pool.ids_by_position]
+
+    def missing_by_position(self, league_ids):
+        """
+        Lists, per position code, the players of the pool that do not appear in a league.
+
+        Uses a boolean mask over player ids (a bitset of used players) and each position's
+        id array, so no set of all players has to be built.
+
+        Args:
+            league_ids (np.ndarray): Every player id used in the league.
+
+        Returns:
+            list[np.ndarray]: Unused player ids of each position code, in table order.
+        """
+        used = np.zeros(len(self.position_of), dtype=bool)
+        used[league_ids] = True
+        return [ids[~used[ids]] for ids in self.pool.ids_by_position]
+
+
+# One PositionIndex per pool, dropped with the pool
+_position_indexes = weakref.WeakKeyDictionary()
+
+
+def get_position_index(players_df):
+    """
+    Returns the PositionIndex of a players table, building it on first use.
+
+    Args:
+        players_df (pd.DataFrame or PlayerPool): The players table.
+
+    Returns:
+        PositionIndex: The index.
+    """
+    pool = as_player_pool(players_df)
+    index = _position_indexes.get(pool)
+    if index is None:
+        index = _position_indexes[pool] = PositionIndex(pool)
+    return index
+
+
+def standard_crossover_with_position_repair(parent1, parent2, players_df, verbose=False, spec=None):
     crossover_point=random.randint(1, len(parent1) - 1)
     if verbose:
         print(f"[Crossover] Crossover point at team index {crossover_point}")
 
-    position_map = get_position_map(players_df) # creates a mapping from player ID to their position
-    all_players = set(players_df['id']) # creates a set of all players
+    index = get_position_index(players_df) # position lookups, precomputed once per player pool
 
     # Crossover on team level by the crossover point defined on the arguments
     offspring1 = parent1[:crossover_point] + parent2[crossover_point:]
     offspring2 = parent2[:crossover_point] + parent1[crossover_point:]
 
     # Position slots by index inside each team
-    # we want to always keep the [GK, DEF, DEF, MID, MID, FWD, FWD] formatation
-    position_slots = ["GK", "DEF", "DEF", "MID", "MID", "FWD", "FWD"] # players are assumed to always appear in this fixed order
+    # we want to always keep the formation of the league spec, by default [GK, DEF, DEF, MID, MID, FWD, FWD]
+    position_slots = list(spec.formation if spec is not None else DEFAULT_FORMATION) # players are assumed to always appear in this fixed order
+    slot_code_array = np.array([POSITION_CODES[pos] for pos in position_slots])
 
     def repair_offspring(offspring):
 
@@ -48,8 +106,7 @@ def standard_crossover_with_position_repair(parent1, parent2, players_df, verbos
             - All players from the original player pool are used exactly once.
 
         The function relies on two external variables:
-            - `all_players`: A set of all player IDs expected to be used in the solution.
-            - `position_map`: A dictionary mapping player IDs to their positions (e.g., 'GK', 'DEF').
+            - `index`: The PositionIndex of the player pool (all players and their positions).
             - `position_slots`: A list defining the position expected at each slot in a team.
 
         Parameters:
@@ -75,56 +132,46 @@ def standard_crossover_with_position_repair(parent1, parent2, players_df, verbos
 
 
         # Flatten all players used
-        flat = [p for team in offspring for p in team] # Flattens the list of teams into a single list of all player IDs
-        counts = Counter(flat) # Count occurrences of each player ID ( how many times each player appears in the flattened offspring)
+        flat = np.array(offspring, dtype=np.int64).ravel() # Flattens the list of teams into a single array of all player IDs
+        counts = np.bincount(flat, minlength=len(index.position_of)) # Count occurrences of each player ID ( how many times each player appears in the flattened offspring)
 
         # Find duplicates and missing players
-        duplicates = {p for p, c in counts.items() if c > 1} # get the players that appear more than once
-        used = set(flat) # get the players that are used in the offspring
-        missing = list(all_players - used) # get the players that are missing in the offspring but should be there (all players come from above code)
-        
+        duplicates = set(np.flatnonzero(counts > 1).tolist()) # get the players that appear more than once
+        if not duplicates:
+            return [list(team) for team in offspring] # nothing to repair
+
+        # Build available players by position for replacements: the players of each position missing from the offspring
+        available_by_pos = [available.tolist() for available in index.missing_by_position(flat)] # list indexed by position code, of player IDs available for that position
+        for available in available_by_pos: # for each position in the available players
+            random.shuffle(available) # shuffle the list of available players for that position
+
         if verbose:
             print("[Repair] Starting repair process")
             print(f"  Duplicates found: {sorted(duplicates)}")
-            print(f"  Missing players: {sorted(missing)}\n")
-        
-        # Build available players by position for replacements
-
-        available_by_pos = defaultdict(list)  # create a dict where the key is a position  and the value is a shuffled list of player IDs that are available for that position
-        for pid in missing: # for each player ID in the missing list
-            pos = position_map[pid] # get the position of the player
-            available_by_pos[pos].append(pid) # append the player ID to the list of available players for that position
-        for pos in available_by_pos: # for each position in the available players
-            random.shuffle(available_by_pos[pos]) # shuffle the list of available players for that position
-
-        # Track used players to avoid duplicates
-        used_players = set() #  tracks player IDs that have already been added to teams to prevent further duplicates during the repair process
-        repaired_offspring = [] 
-        for team_idx, team in enumerate(offspring): # for each team in the offspring
-            new_team = [] # create a new team
-            for idx, pid in enumerate(team): # for each player ID in the team
-                pos = position_slots[idx] # get the position of the player based on the index
-
-                # If player is duplicated or already used, replace
-                if pid in used_players or pid in duplicates: # if the player ID is already used or is a duplicate
-                    if available_by_pos[pos]: # if there are available players for that position
-                        replacement = available_by_pos[pos].pop() # get a replacement player ID from the available players for that position
-                        if verbose:
-                            print(f"  Team {team_idx}: Replacing player {pid} (pos {pos}) → {replacement}")
-                        new_team.append(replacement) # add the replacement player ID to the new team
-                        used_players.add(replacement) # add the replacement player ID to the used players
-                    else:
-                        if verbose:
-                            print(f"  Team {team_idx}: No replacement available for player {pid} in position {pos}, keeping original")
-                        # If no available players left in that position (should not happen), keep original
-                        new_team.append(pid) # add the original player ID to the new team
-                        used_players.add(pid) # add the original player ID to the used players
-                else: # if the player ID is not a duplicate and not already used
-                    new_team.append(pid) # add the original player ID to the new team
-                    used_players.add(pid) # add the original player ID to the used players
-
-            repaired_offspring.append(new_team) # add the new team to the repaired offspring
-        return repaired_offspring
+            print(f"  Missing players: {sorted(p for available in available_by_pos for p in available)}\n")
+
+        # Replace duplicated players, slot by slot in team order, with missing players of the slot's position.
+        # A player already used earlier is always a duplicate, so only the duplicated slots are visited; once a
+        # position runs out of missing players (the later occurrences of its duplicates) the original is kept
+        duplicate_slots = np.flatnonzero(counts[flat] > 1) # duplicated slots of the flattened offspring, in team order
+        duplicate_codes = slot_code_array[duplicate_slots % len(position_slots)] # expected position code of each of them
+        repaired = flat.copy()
+        for code, available in enumerate(available_by_pos):
+            slots = duplicate_slots[duplicate_codes == code]
+            replacements = available[:len(slots)] # taken in shuffled order
+            repaired[slots[:len(replacements)]] = replacements
+
+        if verbose:
+            for slot in duplicate_slots.tolist():
+                team_idx, idx = divmod(slot, len(position_slots))
+                pid, pos = flat[slot], position_slots[idx]
+                if repaired[slot] != pid:
+                    print(f"  Team {team_idx}: Replacing player {pid} (pos {pos}) → {repaired[slot]}")
+                else:
+                    # If no available players left in that position (should not happen), keep original
+                    print(f"  Team {team_idx}: No replacement available for player {pid} in position {pos}, keeping original")
+
+        return repaired.reshape(len(offspring), -1).tolist()
 
     return repair_offspring(offspring1), repair_offspring(offspring2)
 
@@ -140,7 +187,8 @@ def validate_league(league, players_df, position_slots = ["GK", "DEF", "DEF", "M
 
     Parameters:
         league (list of list of int): The league to validate, as a list of teams (each a list of player IDs).
-        players_df (pd.DataFrame): DataFrame with at least 'id' and 'position' columns.
+        players_df (pd.DataFrame or PlayerPool): DataFrame with at least 'id' and 'position' columns,
+                                                 or its compiled PlayerPool.
         position_slots (list of str): Expected position at each index of a team, e.g., 
                                       ["GK", "DEF", "DEF", "MID", "MID", "FWD", "FWD"]
 
@@ -148,7 +196,8 @@ def validate_league(league, players_df, position_slots = ["GK", "DEF", "DEF", "M
         bool: True if the league is valid. Otherwise, prints detailed issues and returns False.
     """
 
-    all_player_ids = set(players_df['id'])
+    pool = as_player_pool(players_df)
+    all_player_ids = set(pool.ids.tolist())
     expected_team_size = len(position_slots)
 
     # 1. Check total number of players
@@ -171,14 +220,13 @@ def validate_league(league, players_df, position_slots = ["GK", "DEF", "DEF", "M
         return False
 
     # 2. Check team structure and position integrity
-    position_map = dict(zip(players_df['id'], players_df['position']))
     for i, team in enumerate(league):
         if len(team) != expected_team_size:
             print(f"Team {i} has invalid size {len(team)}. Expected {expected_team_size}.")
             return False
         for idx, pid in enumerate(team):
             expected_pos = position_slots[idx]
-            actual_pos = position_map.get(pid)
+            actual_pos = POSITIONS[pool.position[pid]]
             if actual_pos != expected_pos:
                 print(f"Team {i}, player {pid} in slot {idx} expected {expected_pos}, got {actual_pos}.")
                 return False
@@ -187,17 +235,20 @@ def validate_league(league, players_df, position_slots = ["GK", "DEF", "DEF", "M
     return True
 
 
-def crossover_by_position_dual_any(parent1, parent2, players_df, keep_positions=None, verbose=False):
+def crossover_by_position_dual_any(parent1, parent2, players_df, keep_positions=None, verbose=False, spec=None):
     """
     Dual crossover with random position selection:
     - Randomly selects 2 positions if none specified
     - Preserves selected positions from each parent
     - Fills remaining slots from other parent
     - Ensures no duplicate players per team
+    - Follows the formation of `spec` (LeagueSpec), by default [GK, DEF, DEF, MID, MID, FWD, FWD]
     """
-    position_map = dict(zip(players_df['id'], players_df['position']))
-    position_slots = ["GK", "DEF", "DEF", "MID", "MID", "FWD", "FWD"]
-    unique_positions = list(set(position_slots))  # ['GK', 'DEF', 'MID', 'FWD']
+    index = get_position_index(players_df) # position lookups, precomputed once per player pool
+    position_slots = list(spec.formation if spec is not None else DEFAULT_FORMATION)
+    slot_codes = [POSITION_CODES[pos] for pos in position_slots]
+    # dict keeps first-seen order, so the sample below doesn't depend on string hash randomization
+    unique_positions = list(dict.fromkeys(position_slots))  # ['GK', 'DEF', 'MID', 'FWD']
     
     # Set random positions 
     if keep_positions is None:
@@ -209,10 +260,10 @@ def crossover_by_position_dual_any(parent1, parent2, players_df, keep_positions=
     def make_offspring(primary, secondary):
         offspring = []
         
-        for team_idx in range(5):
+        for team_idx in range(len(primary)):
             # Track used players PER TEAM
             used_players = set()
-            new_team = [None] * 7
+            new_team = [None] * len(position_slots)
             
             
             # 1. Preserve selected positions from primary parent
@@ -230,7 +281,7 @@ def crossover_by_position_dual_any(parent1, parent2, players_df, keep_positions=
                 
                 # Find first available player in secondary team with correct position
                 for player_id in secondary[team_idx]:
-                    if (position_map[player_id] == slot and 
+                    if (index.position_of[player_id] == slot_codes[i] and 
                         player_id not in used_players and 
                         slot not in keep_positions):
                         new_team[i] = player_id
@@ -240,13 +291,12 @@ def crossover_by_position_dual_any(parent1, parent2, players_df, keep_positions=
             # 3. Fallback: fill from global pool if needed
             for i, slot in enumerate(position_slots):
                 if new_team[i] is None:
-                    available = players_df[
-                        (players_df["position"] == slot) & 
-                        (~players_df["id"].isin(used_players))
-                    ].id.values
-                    if len(available) > 0:
-                        new_team[i] = available[0]
-                        used_players.add(new_team[i])
+                    # First player of that position (in table order) not yet in this team
+                    for player_id in index.ids_by_position[slot_codes[i]]:
+                        if player_id not in used_players:
+                            new_team[i] = player_id
+                            used_players.add(player_id)
+                            break
 
             offspring.append(new_team)
             
@@ -1,6 +1,21 @@
-from abc import ABC, abstractmethod
-from random import randint, shuffle, choice
+from random import randint, shuffle
 from copy import deepcopy
+from Model.LeagueSpec import LeagueSpec
+
+
+def _update_team_totals(solution, mutated, changes):
+    # Solutions that track per-team aggregates derive the mutated ones from the parent's
+    # in O(number of changed players), so only the touched teams are re-scored
+    if hasattr(mutated, "derive_team_totals"):
+        mutated.derive_team_totals(solution, changes)
+
+
+def _league_spec(solution):
+    # Shape of the solution's league: its problem's spec, or the default formation for bare solutions
+    problem = getattr(solution, "problem", None)
+    if problem is not None:
+        return problem.spec
+    return LeagueSpec(num_teams=len(solution.repr))
 
 
 def player_swap_mutation(solution, verbose=False):
@@ -18,16 +33,20 @@ def player_swap_mutation(solution, verbose=False):
         object: A mutated copy of the solution.
     """
 
-    new_repr = deepcopy(solution.repr)
+    # Copy the solution once (solutions copy only their representation) and edit the copy's teams
+    mutated = deepcopy(solution)
+    new_repr = mutated.repr
+
+    spec = _league_spec(solution)
 
     # Choose the id within the team of the player that will be swapped
-    player_to_swap = randint(0, 6)
+    player_to_swap = randint(0, spec.team_size - 1)
 
     # Choose the teams where the players will be swapped. Make sure they are different
-    team_to_swap_1 = randint(0, 4)
-    team_to_swap_2 = randint(0, 4)
+    team_to_swap_1 = randint(0, spec.num_teams - 1)
+    team_to_swap_2 = randint(0, spec.num_teams - 1)
     while team_to_swap_1 == team_to_swap_2:
-        team_to_swap_2 = randint(0, 4)
+        team_to_swap_2 = randint(0, spec.num_teams - 1)
 
     # Extract player IDs before swap for accurate logging
     pid1 = new_repr[team_to_swap_1][player_to_swap]
@@ -39,8 +58,9 @@ def player_swap_mutation(solution, verbose=False):
     # Swap players at the chosen index
     new_repr[team_to_swap_1][player_to_swap], new_repr[team_to_swap_2][player_to_swap] = pid2, pid1
 
-    mutated = deepcopy(solution)
+    # Reassigning repr invalidates the cached fitness of the copy
     mutated.repr = new_repr
+    _update_team_totals(solution, mutated, [(team_to_swap_1, pid1, pid2), (team_to_swap_2, pid2, pid1)])
     return mutated
 
 
@@ -55,30 +75,19 @@ def role_shuffle_mutation(solution, verbose=False):
     Returns:
         object: A mutated copy of the solution.
     """
-    new_repr = deepcopy(solution.repr)
+    # Copy the solution once (solutions copy only their representation) and edit the copy's teams
+    mutated = deepcopy(solution)
+    new_repr = mutated.repr
 
     # Choose the role that will be affected
-    # Remembering that the player IDs withing the team correspond to {"GK": 0, "DEF": [1, 2], "MID": [3, 4], "FWD": [5, 6]}
-    i = randint(0, 6)
-    if i in [1, 2]:
-        i = [1, 2]
-    elif i in [3, 4]:
-        i = [3, 4]
-    elif i in [5, 6]:
-        i = [5, 6]
-    else:
-        i = [0]
+    # Remembering that the slots of each role come from the formation, e.g. {"GK": 0, "DEF": [1, 2], "MID": [3, 4], "FWD": [5, 6]}
+    spec = _league_spec(solution)
+    i = randint(0, spec.team_size - 1)
+    i = list(spec.role_slots[spec.role_of_slot[i]])
 
     # If verbose, print the role and indexes being shuffled
     if verbose:
-        role_map = {
-            "GK": [0],
-            "DEF": [1, 2],
-            "MID": [3, 4],
-            "FWD": [5, 6]
-        }
-        inv_map = {tuple(v): k for k, v in role_map.items()}
-        role_name = inv_map[tuple(i)]
+        role_name = spec.formation[i[0]]
         print(f"Shuffling players in role {role_name}, corresponding to indexes {i}")
 
     # Remove all the players from the selected role and shuffle them
@@ -89,14 +98,18 @@ def role_shuffle_mutation(solution, verbose=False):
     shuffle(bag_of_players)
 
     # Once shuffled, put them back in the teams
+    changes = []
     index = 0
-    for team in new_repr:
+    for team_idx, team in enumerate(new_repr):
         for j in i:
+            if team[j] != bag_of_players[index]:
+                changes.append((team_idx, team[j], bag_of_players[index]))
             team[j] = bag_of_players[index]
             index += 1
 
-    mutated = deepcopy(solution)
+    # Reassigning repr invalidates the cached fitness of the copy
     mutated.repr = new_repr
+    _update_team_totals(solution, mutated, changes)
     return mutated
 
 
@@ -112,18 +125,14 @@ def player_role_left_shift_mutation(solution, verbose=False):
         object: A mutated copy of the solution.
 
     """
-    new_repr = deepcopy(solution.repr)
+    # Copy the solution once (solutions copy only their representation) and edit the copy's teams
+    mutated = deepcopy(solution)
+    new_repr = mutated.repr
     # Choose the role that will be affected
-    # Remembering that the player IDs withing the team correspond to {"GK": 0, "DEF": [1, 2], "MID": [3, 4], "FWD": [5, 6]}
-    i = randint(0, 6)
-    if i in [1, 2]:
-        i = [1, 2]
-    elif i in [3, 4]:
-        i = [3, 4]
-    elif i in [5, 6]:
-        i = [5, 6]
-    else:
-        i = [0]
+    # Remembering that the slots of each role come from the formation, e.g. {"GK": 0, "DEF": [1, 2], "MID": [3, 4], "FWD": [5, 6]}
+    spec = _league_spec(solution)
+    i = randint(0, spec.team_size - 1)
+    i = list(spec.role_slots[spec.role_of_slot[i]])
     
     # Get all the players from the selected role
     role_players = []
@@ -132,29 +141,26 @@ def player_role_left_shift_mutation(solution, verbose=False):
             role_players.append(team[idx])
 
     # Shift left 
-    shift_amount = randint(1, len(new_repr) - 1)
+    shift_amount = randint(1, spec.num_teams - 1)
     role_players = role_players[shift_amount:] + role_players[:shift_amount]
     
     # If verbose, print the role and indexes being shifted
     if verbose:
-        role_map = {
-            "GK": [0],
-            "DEF": [1, 2],
-            "MID": [3, 4],
-            "FWD": [5, 6]
-        }
-        inv_map = {tuple(v): k for k, v in role_map.items()}
-        role_name = inv_map[tuple(i)]
+        role_name = spec.formation[i[0]]
         print(f"Shifting role group {role_name}, corresponding to indexes {i}, by {shift_amount} positions")
 
     # Reassign to teams
+    changes = []
     index = 0
-    for team in new_repr:
+    for team_idx, team in enumerate(new_repr):
         for idx in i:
+            if team[idx] != role_players[index]:
+                changes.append((team_idx, team[idx], role_players[index]))
             team[idx] = role_players[index]
             index += 1
 
 
-    mutated = deepcopy(solution)
+    # Reassigning repr invalidates the cached fitness of the copy
     mutated.repr = new_repr
+    _update_team_totals(solution, mutated, changes)
     return mutated
\ No newline at end of file
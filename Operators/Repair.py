@@ -0,0 +1,73 @@
+import numpy as np
+
+from Model.PlayerPool import as_player_pool
+from Model.LeagueSpec import LeagueSpec
+
+
+def salary_cap_repair(league, players_df, spec=None, max_swaps=None, verbose=False):
+    """
+    Brings the teams of a league under the salary cap by swapping same-slot players between teams.
+
+    Repeatedly takes the team furthest over the cap and makes, among the swaps of one of
+    its players with the player in the same slot of another team, the one that removes
+    the most salary above the cap over both teams (ties go to the swap that moves the
+    least skill). Swapping within a slot keeps the formation and every player once.
+    Stops when every team fits, or when no swap helps any more, so a league may remain
+    infeasible when the players cannot be split under the cap.
+
+    Args:
+        league (list[list[int]]): One list of player ids per team, in formation order.
+        players_df (pd.DataFrame or PlayerPool): The players table.
+        spec (LeagueSpec, optional): Salary cap of the league. Defaults to the default spec for the
+                                     league's number of teams.
+        max_swaps (int, optional): Most swaps made. Defaults to the number of slots of the league.
+        verbose (bool, optional): If True, prints every swap. Defaults to False.
+
+    Returns:
+        list[list[int]]: The repaired league (a new list), or `league` itself when no team is over the cap.
+    """
+    pool = as_player_pool(players_df)
+    if spec is None:
+        spec = LeagueSpec(num_teams=len(league))
+    cap = spec.salary_cap
+
+    teams = np.asarray(league)
+    salaries = pool.salary[teams]
+    team_salaries = salaries.sum(axis=1)
+    if (team_salaries <= cap).all():
+        return league
+    teams = teams.copy()
+    skills = pool.skill[teams]
+
+    if max_swaps is None:
+        max_swaps = teams.size
+    for _ in range(max_swaps):
+        over = np.flatnonzero(team_salaries > cap)
+        if len(over) == 0:
+            break
+        worst = over[np.argmax(team_salaries[over])]
+
+        # Salary the worst team gains by taking the player in each (team, slot)
+        gained = salaries - salaries[worst]
+        excess_before = np.maximum(team_salaries[worst] - cap, 0) + np.maximum(team_salaries - cap, 0)[:, None]
+        excess_after = (np.maximum(team_salaries[worst] + gained - cap, 0)
+                        + np.maximum(team_salaries[:, None] - gained - cap, 0))
+        relief = (excess_before - excess_after).astype(float)
+        relief[worst] = -np.inf
+        disruption = np.abs(skills - skills[worst])
+        # Most relief first, then least skill moved
+        order = np.lexsort((disruption.ravel(), -relief.ravel()))
+        other, slot = divmod(int(order[0]), teams.shape[1])
+        if relief[other, slot] <= 0:
+            break
+
+        if verbose:
+            print(f"Swapping player {teams[worst, slot]} of team {worst} with player {teams[other, slot]} "
+                  f"of team {other}")
+        teams[[worst, other], slot] = teams[[other, worst], slot]
+        salaries[[worst, other], slot] = salaries[[other, worst], slot]
+        skills[[worst, other], slot] = skills[[other, worst], slot]
+        team_salaries[worst] += gained[other, slot]
+        team_salaries[other] -= gained[other, slot]
+
+    return teams.tolist()
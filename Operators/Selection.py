@@ -1,32 +1,59 @@
 import random
 from copy import deepcopy
+from itertools import accumulate
 
 
-def tournament_selection(population, maximization = False):
+def tournament_selection(population, maximization = False, fitness=None, tournament_size=4):
 
-    tournament_size = 4  # for now, it's just a fixed size of 5
+    # Use the generation's precomputed fitness vector when available
+    if fitness is None:
+        fitness = [ind.fitness() for ind in population]
 
-    # Randomly sample individuals from population
-    sample_population = random.sample(population, tournament_size)
-    # Sort by fitness (lowest for minimization)
-    sample_population.sort(key=lambda x: x.fitness(), reverse=maximization)
+    # Randomly sample individuals from population (as indices)
+    sample = random.sample(range(len(population)), tournament_size)
+    # First best of the sample (lowest for minimization), as sorting it would give
+    if maximization:
+        return population[max(sample, key=fitness.__getitem__)]
+    return population[min(sample, key=fitness.__getitem__)]
 
-    return sample_population[0]
 
+def linear_ranking(fitness, maximization=False):
+    """
+    Ranks a population for ranking_selection.
+
+    Args:
+        fitness (sequence of float): Fitness of each individual.
+        maximization (bool, optional): If True, higher fitness is better. Defaults to False.
+
+    Returns:
+        tuple[list[int], list[int]]: Indices from the worst individual to the best, and the
+                                     cumulative linear rank weights (1 for the worst).
+    """
+    sorted_indices = sorted(range(len(fitness)), key=lambda i: fitness[i], reverse=not maximization)
+    cum_weights = list(accumulate(range(1, len(fitness) + 1)))  # linear rank
+    return sorted_indices, cum_weights
 
-def ranking_selection(population, maximization=False):
+
+def ranking_selection(population, maximization=False, fitness=None, ranking=None):
     """
     Ranking selection based on linear rank probabilities.
     
     Args:
         population (list): A list of individuals in the population
+        maximization (bool): If True, higher fitness is better
+        fitness (sequence of float, optional): Precomputed fitness of each individual,
+                                               aligned with the population
+        ranking (tuple, optional): The population's linear_ranking (with the same maximization),
+                                   so that several draws from one generation sort it only once
     
     Returns:
-        list or individual: The selected individual
+        list or individual: A copy of the selected individual
     """
-    sorted_population = sorted(population, key=lambda x: x.fitness(), reverse=True)
-    n = len(population)
-    ranks = list(range(1, n + 1))  # linear rank
-
-    selected = random.choices(sorted_population, weights=ranks, k=1)
-    return deepcopy(selected[0])
\ No newline at end of file
+    if ranking is None:
+        if fitness is None:
+            fitness = [ind.fitness() for ind in population]
+        ranking = linear_ranking(fitness, maximization)
+    sorted_indices, cum_weights = ranking
+
+    selected = random.choices(sorted_indices, cum_weights=cum_weights, k=1)
+    return deepcopy(population[selected[0]])
@@ -0,0 +1,14 @@
+import numpy as np
+
+
+def default_rng():
+    """
+    Returns a NumPy generator for batched operators that were not given one.
+
+    It is seeded from NumPy's global state, so np.random.seed() makes batched
+    mutations, selections and local search reproducible.
+
+    Returns:
+        np.random.Generator: A new generator.
+    """
+    return np.random.default_rng(np.random.randint(0, 2**63, dtype=np.int64))
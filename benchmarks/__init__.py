@@ -0,0 +1,71 @@
+"""
+Micro-benchmarks for the league GA.
+
+Run a benchmark module directly, e.g. `python -m benchmarks.delta_evaluation`.
+`python -m benchmarks.suite` times everything at several scales, writes JSON and
+checks for regressions against a previous run.
+"""
+import time
+import numpy as np
+
+from Model.PlayerPool import POSITIONS, PlayerPool
+
+# Players per position in one team: 1 GK, 2 DEF, 2 MID, 2 FWD
+TEAM_FORMATION = {"GK": 1, "DEF": 2, "MID": 2, "FWD": 2}
+
+
+def synthetic_pool(num_teams, seed=0):
+    """
+    Generates a random player pool with exactly enough players for `num_teams` teams.
+
+    Skills and salaries are drawn from the ranges seen in `Data/players(in).csv`
+    (skill 79-95, salary 65-150), with salary correlated to skill.
+
+    Args:
+        num_teams (int): Number of teams the pool must fill.
+        seed (int, optional): Seed of the generator. Defaults to 0.
+
+    Returns:
+        PlayerPool: The pool, with players sorted by position and ids 0..n-1.
+    """
+    rng = np.random.default_rng(seed)
+    positions = [pos for pos in POSITIONS for _ in range(TEAM_FORMATION[pos] * num_teams)]
+    skill = rng.integers(79, 96, size=len(positions))
+    salary = np.clip(65 + (skill - 79) * 5 + rng.integers(-10, 11, size=len(positions)), 65, 150)
+    return PlayerPool(ids=np.arange(len(positions)), skill=skill, salary=salary, position=positions)
+
+
+def random_league(pool, num_teams, rng):
+    """
+    Builds a random valid league by shuffling each position's players once.
+
+    Args:
+        pool (PlayerPool): The players.
+        num_teams (int): Number of teams.
+        rng (np.random.Generator): Random generator.
+
+    Returns:
+        list[list[int]]: The league, one list of 7 player ids per team.
+    """
+    columns = []
+    for code, pos in enumerate(POSITIONS):
+        ids = rng.permutation(pool.ids_by_position[code])[:TEAM_FORMATION[pos] * num_teams]
+        columns.append(ids.reshape(num_teams, TEAM_FORMATION[pos]))
+    return np.hstack(columns).tolist()
+
+
+def time_per_call(function, min_time=0.2):
+    """
+    Times repeated calls of `function` until at least `min_time` seconds have passed.
+
+    Returns:
+        float: Mean seconds per call.
+    """
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        function()
+        calls += 1
+        elapsed = time.perf_counter() - start
+    return elapsed / calls
@@ -0,0 +1,81 @@
+"""
+Batched mutation operators vs. their scalar counterparts: speed and distribution check.
+
+Usage:
+    python -m benchmarks.batch_mutation [--pop-sizes 1000 10000] [--samples 20000]
+"""
+import argparse
+import random
+from collections import Counter
+import numpy as np
+
+from Model.LeagueProblem import LeagueProblem
+from Model.Population import LeaguePopulation
+from Model.Solution import SportsLeagueSolution
+from Operators.BatchMutation import BATCH_MUTATIONS
+from Operators.Mutation import player_swap_mutation, role_shuffle_mutation, player_role_left_shift_mutation
+from benchmarks import synthetic_pool, random_league, time_per_call
+
+MUTATIONS = [player_swap_mutation, role_shuffle_mutation, player_role_left_shift_mutation]
+
+
+def placement_counts(leagues):
+    # How often each player ends up in each team (the marginal every operator must match)
+    counts = Counter()
+    for league in leagues:
+        for team_idx, team in enumerate(league):
+            for slot, pid in enumerate(team):
+                counts[(pid, team_idx, slot)] += 1
+    return counts
+
+
+def distribution_gap(mutation, league, problem, samples, rng):
+    """
+    Compares the scalar and batched operators on `samples` mutations of the same league.
+
+    Returns:
+        float: Largest absolute difference between the two empirical frequencies of
+               (player, team, slot) placements and of whole resulting leagues.
+    """
+    parent = SportsLeagueSolution(repr=league, problem=problem)
+    scalar = [mutation(parent).repr for _ in range(samples)]
+    batch = BATCH_MUTATIONS[mutation.__name__](
+        np.repeat(np.array([league]), samples, axis=0), np.ones(samples, dtype=bool), rng).tolist()
+
+    gap = 0.0
+    for count in (placement_counts, lambda ls: Counter(str(l) for l in ls)):
+        a, b = count(scalar), count(batch)
+        gap = max(gap, max(abs(a[k] - b[k]) / samples for k in set(a) | set(b)))
+    return gap
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pop-sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--samples", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    random.seed(0)
+    rng = np.random.default_rng(0)
+    problem = LeagueProblem(synthetic_pool(5))
+    league = random_league(problem.player_pool, 5, rng)
+
+    print("Distribution check (max frequency gap, expect ~1/sqrt(samples)):")
+    for mutation in MUTATIONS:
+        print(f"  {mutation.__name__:<34} {distribution_gap(mutation, league, problem, args.samples, rng):.4f}")
+
+    print(f"\n{'pop':>7} {'mutation':<34} {'scalar/s':>12} {'batch/s':>12} {'speedup':>8}")
+    for pop_size in args.pop_sizes:
+        population = LeaguePopulation([random_league(problem.player_pool, 5, rng) for _ in range(pop_size)], problem)
+        solutions = [SportsLeagueSolution(repr=l, problem=problem) for l in population.leagues.tolist()]
+        mask = np.ones(pop_size, dtype=bool)
+        for mutation in MUTATIONS:
+            batch_mutation = BATCH_MUTATIONS[mutation.__name__]
+            scalar_time = time_per_call(lambda: [mutation(s) for s in solutions])
+            batch_time = time_per_call(lambda: batch_mutation(population.leagues, mask, rng))
+            print(f"{pop_size:>7} {mutation.__name__:<34} {pop_size / scalar_time:>12.0f} "
+                  f"{pop_size / batch_time:>12.0f} {scalar_time / batch_time:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
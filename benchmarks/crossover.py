@@ -0,0 +1,54 @@
+"""
+Crossovers per second for both crossover operators at several pool sizes.
+
+Every pool holds exactly the players of its league (7 per team), so 35, 1k and
+10k players correspond to 5, 143 and 1429 teams.
+
+Usage:
+    python -m benchmarks.crossover [--players 35 1000 10000]
+"""
+import argparse
+import random
+import numpy as np
+
+from Operators.Crossover import standard_crossover_with_position_repair, crossover_by_position_dual_any
+from benchmarks import synthetic_pool, random_league, time_per_call
+
+CROSSOVERS = [standard_crossover_with_position_repair, crossover_by_position_dual_any]
+
+
+def run(n_players):
+    """
+    Times every crossover on two random parents drawn from a pool of about `n_players` players.
+
+    Returns:
+        list[dict]: One row per crossover with crossovers per second.
+    """
+    num_teams = max(2, round(n_players / 7))
+    rng = np.random.default_rng(n_players)
+    pool = synthetic_pool(num_teams)
+    parent1 = random_league(pool, num_teams, rng)
+    parent2 = random_league(pool, num_teams, rng)
+
+    rows = []
+    for crossover in CROSSOVERS:
+        seconds = time_per_call(lambda: crossover(parent1, parent2, pool))
+        rows.append({"players": len(pool), "teams": num_teams, "crossover": crossover.__name__,
+                     "crossovers_per_s": 1 / seconds})
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--players", type=int, nargs="+", default=[35, 1000, 10000])
+    args = parser.parse_args(argv)
+
+    random.seed(0)
+    print(f"{'players':>8} {'teams':>6} {'crossover':<42} {'per s':>10}")
+    for n_players in args.players:
+        for row in run(n_players):
+            print(f"{row['players']:>8} {row['teams']:>6} {row['crossover']:<42} {row['crossovers_per_s']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
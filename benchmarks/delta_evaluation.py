@@ -0,0 +1,82 @@
+"""
+Evaluations per second of mutated offspring: full re-evaluation vs. incremental team aggregates.
+
+Usage:
+    python -m benchmarks.delta_evaluation [--teams 5 50 200] [--check]
+"""
+import argparse
+import itertools
+import random
+import numpy as np
+
+from Model.LeagueProblem import LeagueProblem
+from Model.Solution import SportsLeagueSolution
+from Operators.Mutation import player_swap_mutation, role_shuffle_mutation, player_role_left_shift_mutation
+from benchmarks import synthetic_pool, random_league, time_per_call
+
+MUTATIONS = [player_swap_mutation, role_shuffle_mutation, player_role_left_shift_mutation]
+
+# Distinct offspring scored in turn by each arm
+OFFSPRING = 256
+
+
+def run(num_teams, check=False):
+    """
+    Benchmarks every mutation operator on a random league of `num_teams` teams.
+
+    Returns:
+        list[dict]: One row per operator with evaluations per second before and after.
+    """
+    rng = np.random.default_rng(num_teams)
+    problem = LeagueProblem(synthetic_pool(num_teams), salary_cap=float("inf"))
+    parent = SportsLeagueSolution(repr=random_league(problem.player_pool, num_teams, rng), problem=problem)
+    parent.fitness()
+
+    SportsLeagueSolution.delta_check = check
+    rows = []
+    for mutation in MUTATIONS:
+        # Offspring are mutated beforehand, so each arm times only its own evaluation path:
+        # a fresh solution summing every team, or one deriving its aggregates from the parent's
+        offspring = []
+        for _ in range(OFFSPRING):
+            league = mutation(parent).repr
+            changes = [(team, old, new) for team, (old_team, new_team) in enumerate(zip(parent.repr, league))
+                       for old, new in zip(old_team, new_team) if old != new]
+            offspring.append((league, changes))
+        full_offspring, delta_offspring = itertools.cycle(offspring), itertools.cycle(offspring)
+
+        def full():
+            league, _ = next(full_offspring)
+            return SportsLeagueSolution(repr=league, problem=problem).fitness()
+
+        def delta():
+            league, changes = next(delta_offspring)
+            child = SportsLeagueSolution(repr=league, problem=problem)
+            child.derive_team_totals(parent, changes)
+            return child.fitness()
+
+        before = 1 / time_per_call(full)
+        after = 1 / time_per_call(delta)
+        rows.append({"teams": num_teams, "mutation": mutation.__name__,
+                     "full_evals_per_s": before, "delta_evals_per_s": after, "speedup": after / before})
+    SportsLeagueSolution.delta_check = False
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--teams", type=int, nargs="+", default=[5, 50, 200])
+    parser.add_argument("--check", action="store_true",
+                        help="compare every incremental update with a full re-evaluation")
+    args = parser.parse_args(argv)
+
+    random.seed(0)
+    print(f"{'teams':>6} {'mutation':<34} {'full/s':>10} {'delta/s':>10} {'speedup':>8}")
+    for num_teams in args.teams:
+        for row in run(num_teams, check=args.check):
+            print(f"{row['teams']:>6} {row['mutation']:<34} {row['full_evals_per_s']:>10.0f} "
+                  f"{row['delta_evals_per_s']:>10.0f} {row['speedup']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Benchmark suite: fitness, league generation, every operator and one GA generation at several scales.
+
+Each scale is a synthetic pool holding exactly the players of its league (see
+benchmarks.synthetic_pool). 5, 143 and 1429 teams are the 35, 1k and 10k player
+pools. Operators are discovered by name in Operators/Mutation.py ("*_mutation"),
+Operators/Crossover.py ("*crossover*") and Operators/Selection.py ("*_selection"),
+so new operators are picked up automatically; every SelectionEngine scheme is timed
+drawing a whole generation's parents, and local search scoring a league's whole swap
+neighbourhood.
+
+Results are written as JSON. Given a previous results file, the run fails (exit
+code 1) when any benchmark got slower by more than the threshold.
+
+Usage:
+    python -m benchmarks.suite [--teams 5 143 200 1429] [--out results.json]
+                               [--baseline old.json] [--threshold 0.2]
+"""
+import argparse
+import inspect
+import json
+import platform
+import random
+import sys
+import time
+import numpy as np
+
+from Model.LeagueProblem import LeagueProblem
+from Model.Population import evaluate_population
+from Model.Solution import SportsLeagueSolution, generate_league
+from Model.genetic_algorithm import SportsLeagueGASolution, genetic_algorithm
+from Model.local_search import score_swaps, swap_moves
+from Operators import Crossover, Mutation, Selection
+from Operators.BatchSelection import METHODS, SelectionEngine
+from Operators.Selection import tournament_selection
+from benchmarks import synthetic_pool, time_per_call
+
+DEFAULT_TEAMS = [5, 143, 200, 1429]
+
+
+def discover(module, matches):
+    # Public functions defined in `module` whose name satisfies `matches`, in definition order
+    functions = [f for name, f in inspect.getmembers(module, inspect.isfunction)
+                 if f.__module__ == module.__name__ and not name.startswith("_") and matches(name)]
+    return sorted(functions, key=lambda f: f.__code__.co_firstlineno)
+
+
+MUTATIONS = discover(Mutation, lambda name: name.endswith("_mutation"))
+CROSSOVERS = discover(Crossover, lambda name: "crossover" in name)
+SELECTIONS = discover(Selection, lambda name: name.endswith("_selection"))
+
+
+def best_time(function, min_time, repeat):
+    # Fastest of `repeat` timings, the least noisy estimate of the cost of a call
+    return min(time_per_call(function, min_time) for _ in range(repeat))
+
+
+def run_scale(num_teams, pop_size=50, min_time=0.2, repeat=3):
+    """
+    Times every benchmark on a league of `num_teams` teams.
+
+    Args:
+        num_teams (int): Number of teams of the league.
+        pop_size (int, optional): Population size for selection and the GA generation. Defaults to 50.
+        min_time (float, optional): Minimum seconds per timing. Defaults to 0.2.
+        repeat (int, optional): Timings per benchmark; the fastest is kept. Defaults to 3.
+
+    Returns:
+        list[dict]: One row per benchmark with 'name', 'teams', 'players' and 'seconds' per call.
+    """
+    random.seed(num_teams)
+    np.random.seed(num_teams)
+    pool = synthetic_pool(num_teams)
+    problem = LeagueProblem(pool)
+    league = generate_league(pool, problem.spec)
+    other = generate_league(pool, problem.spec)
+    solution = SportsLeagueSolution(repr=league, problem=problem)
+    population = [SportsLeagueGASolution(problem=problem.with_operators(Mutation.player_swap_mutation,
+                                                                        Crossover.standard_crossover_with_position_repair))
+                  for _ in range(pop_size)]
+    fitness = evaluate_population(population)
+
+    timed = {
+        # A fresh solution per call, so the memoized fitness and team aggregates are really computed
+        "fitness": lambda: SportsLeagueSolution(repr=league, problem=problem).fitness(),
+        "generate_league": lambda: generate_league(pool, problem.spec),
+        # Population is pre-scored, so one call evolves exactly one generation
+        "genetic_algorithm_generation": lambda: genetic_algorithm(population, 1, tournament_selection),
+    }
+    for mutation in MUTATIONS:
+        timed[f"mutation.{mutation.__name__}"] = lambda mutation=mutation: mutation(solution)
+    for crossover in CROSSOVERS:
+        kwargs = {"spec": problem.spec} if "spec" in inspect.signature(crossover).parameters else {}
+        timed[f"crossover.{crossover.__name__}"] = \
+            lambda crossover=crossover, kwargs=kwargs: crossover(league, other, pool, **kwargs)
+    for selection in SELECTIONS:
+        timed[f"selection.{selection.__name__}"] = \
+            lambda selection=selection: selection(population, False, fitness=fitness)
+    for method in METHODS:
+        # All the parents of one generation, ranking included (a fresh vector defeats its reuse)
+        engine = SelectionEngine(method)
+        timed[f"selection_engine.{method}"] = \
+            lambda engine=engine: engine.select(population, False, fitness.copy(), pop_size)
+    # Every same-slot swap between two teams, scored from the team aggregates
+    moves = swap_moves(problem.spec.num_teams, problem.spec.team_size)
+    league_array = np.array(league)
+    team_salaries, team_skills = solution.team_totals()
+    timed["local_search.swap_neighbourhood"] = \
+        lambda: score_swaps(league_array, team_salaries, team_skills, pool, problem.spec, moves)
+
+    return [{"name": name, "teams": num_teams, "players": len(pool),
+             "seconds": best_time(function, min_time, repeat)}
+            for name, function in timed.items()]
+
+
+def compare(results, baseline, threshold):
+    """
+    Lists the benchmarks that got slower than the baseline by more than `threshold`.
+
+    Args:
+        results (list[dict]): Rows of this run.
+        baseline (list[dict]): Rows of a previous run; benchmarks missing from either side are skipped.
+        threshold (float): Allowed relative slowdown, e.g. 0.2 for 20%.
+
+    Returns:
+        list[dict]: One row per regression with both timings and the ratio.
+    """
+    before = {(row["name"], row["teams"]): row["seconds"] for row in baseline}
+    regressions = []
+    for row in results:
+        old = before.get((row["name"], row["teams"]))
+        if old and row["seconds"] > old * (1 + threshold):
+            regressions.append({**row, "baseline_seconds": old, "ratio": row["seconds"] / old})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--teams", type=int, nargs="+", default=DEFAULT_TEAMS)
+    parser.add_argument("--pop-size", type=int, default=50)
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per timing")
+    parser.add_argument("--repeat", type=int, default=3, help="timings per benchmark, the fastest is kept")
+    parser.add_argument("--out", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative slowdown (default 0.2)")
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f"{'teams':>6} {'players':>8} {'benchmark':<56} {'per s':>12}")
+    for num_teams in args.teams:
+        for row in run_scale(num_teams, args.pop_size, args.min_time, args.repeat):
+            print(f"{row['teams']:>6} {row['players']:>8} {row['name']:<56} {1 / row['seconds']:>12.1f}")
+            results.append(row)
+
+    if args.out:
+        report = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "settings": {"pop_size": args.pop_size, "min_time": args.min_time, "repeat": args.repeat},
+            "results": results,
+        }
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.threshold)
+        for row in regressions:
+            print(f"REGRESSION {row['name']} ({row['teams']} teams): "
+                  f"{row['baseline_seconds']:.3g}s -> {row['seconds']:.3g}s ({row['ratio']:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f"No regression above {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()